@@ -1,13 +1,13 @@
 import os
 from datetime import timedelta
+import hmac
 import logging
-from flask import Flask, session, render_template, redirect, url_for
-from flask_session import Session
+import click
+from flask import Flask, session, render_template, redirect, url_for, request, Response, abort
 from flask_login import LoginManager, current_user
 from werkzeug.security import generate_password_hash as _
-from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 from sqlalchemy.exc import OperationalError
-from waitress import serve
 from routes.gia import gia_bp
 from routes.auth import auth_bp
 from routes.admin import admin_bp
@@ -15,7 +15,27 @@ from routes.api import api_bp
 from datetime import datetime
 
 from models.models import db, User, GlobalSettings
+from services.settings_cache import settings_cache
+from services.schedule_resolver import schedule_resolver
+from services.audit import audit_sink
+from services.live_feed import live_feed
+from services.count_cache import count_cache
+from services.log_archive import log_archive
+from services.scheduler import job_scheduler
+from services.passwords import password_pool
+from services.rate_limit import login_limiter
+from services.session_store import init_session_store
+from services.pool_stats import pool_telemetry
+from services.metrics import request_metrics
+from services.attendance_stats import rebuild_daily_rollup
+from services.query_plans import check_hot_queries
+from services.lazy_import import lazy_import, LazyCommand
+from services.server import serve
 from config import Config
+import tasks  # registers the scheduled jobs
+
+# Only `flask db` needs this; see scripts/bench_startup.py
+flask_migrate = lazy_import('flask_migrate')  # pulls in Alembic
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,17 +44,34 @@ logging.basicConfig(level=logging.INFO)
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Ensure session storage directory exists
-os.makedirs("./flask_session", exist_ok=True)
-app.config['SESSION_TYPE'] = 'filesystem'  # Store session data in files
+# Client address from X-Forwarded-For, only as appended by our own proxies
+if app.config['TRUSTED_PROXY_COUNT']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_COUNT'])
+
 app.config['SESSION_PERMANENT'] = True
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=10)  # Auto logout after 10 minutes
-app.config['SESSION_FILE_DIR'] = "./flask_session"
-Session(app)
 
 # Initialize database and migration
+pool_telemetry.init_app(app)  # Before db.init_app, it picks the pool class
 db.init_app(app)
-migrate = Migrate(app, db)
+init_session_store(app)  # Backend chosen by SESSION_BACKEND
+# Only `flask db` needs Flask-Migrate; `flask serve` and every other
+# command never import it
+def _db_command():
+    flask_migrate.Migrate(app, db)  # replaces this entry with the real group
+    return app.cli.commands['db']
+
+app.cli.add_command(LazyCommand('db', _db_command, help="Perform database migrations."))
+settings_cache.init_app(app)
+schedule_resolver.init_app(app)
+audit_sink.init_app(app)
+live_feed.init_app(app)
+count_cache.init_app(app)
+log_archive.init_app(app)
+job_scheduler.init_app(app)
+password_pool.init_app(app)
+login_limiter.init_app(app)
+request_metrics.init_app(app)
 
 # Initialize login manager
 login_manager = LoginManager()
@@ -57,6 +94,37 @@ def index():
 
     return render_template('/auth/login.html')
 
+# Prometheus metrics
+@app.route('/metrics')
+def metrics():
+    token = app.config.get('METRICS_TOKEN')
+    bearer = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    is_admin = current_user.is_authenticated and current_user.role in ['superadmin', 'admin']
+    if not is_admin and not (token and hmac.compare_digest(bearer, token)):
+        abort(403)
+
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def service_metrics():
+    pool = pool_telemetry.stats(db.engine.pool)
+    audit = audit_sink.stats()
+    feed = live_feed.stats()
+    families = [
+        ('tickr_db_pool_checkouts_total', 'counter', 'Pool checkouts.', [({}, pool['checkouts'])]),
+        ('tickr_db_pool_checkout_timeouts_total', 'counter', 'Checkouts that timed out.', [({}, pool['checkout_timeouts'])]),
+        ('tickr_db_pool_checkout_wait_seconds_total', 'counter', 'Time spent waiting for connections.', [({}, pool['checkout_wait_total_ms'] / 1000)]),
+        ('tickr_db_pool_invalidations_total', 'counter', 'Connections invalidated.', [({}, pool['invalidations'])]),
+        ('tickr_db_pool_in_use', 'gauge', 'Connections checked out.', [({}, pool['in_use'])]),
+        ('tickr_audit_pending', 'gauge', 'Audit entries waiting to be written.', [({}, audit['pending'])]),
+        ('tickr_audit_dropped_total', 'counter', 'Audit entries that failed to write.', [({}, audit['dropped'])]),
+        ('tickr_live_feed_subscribers', 'gauge', 'Open daily-logs streams.', [({}, feed['subscribers'])]),
+    ]
+    if 'pool' in pool:
+        families.append(('tickr_db_pool_overflow', 'gauge', 'Connections above pool_size.', [({}, pool['pool']['overflow'])]))
+    return families
+
+request_metrics.add_collector(service_metrics)
+
 # Error handling
 @app.errorhandler(OperationalError)
 def maintenance_mode(e):
@@ -94,9 +162,92 @@ def initialize_database():
             "e or (a.add_all([b(**{o:p,c:f,g:l,h:m,i:None,j:_(n),k:f})]),a.commit())"
         )
 
+# Rebuild the attendance_daily rollup (after migrating, or to repair it)
+@app.cli.command('rebuild-rollup')
+@click.option('--from', 'first_day', type=click.DateTime(formats=['%Y-%m-%d']), help='First date to rebuild.')
+@click.option('--to', 'last_day', type=click.DateTime(formats=['%Y-%m-%d']), help='Last date to rebuild.')
+def rebuild_rollup_command(first_day, last_day):
+    rows = rebuild_daily_rollup(
+        first_day.date() if first_day else None,
+        last_day.date() if last_day else None
+    )
+    click.echo(f"Rebuilt {rows} attendance_daily rows.")
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """EXPLAIN the hot queries; exits non-zero if any of them scans a whole table."""
+    failed = False
+    for name, (plan, full_scans) in check_hot_queries().items():
+        click.echo(f"{'FULL SCAN' if full_scans else 'ok':>9}  {name}")
+        for line in plan:
+            click.echo(f"           {line}")
+        failed = failed or bool(full_scans)
+    if failed:
+        raise SystemExit(1)
+
+# Move system_logs past the retention window into the archive
+@app.cli.command('archive-logs')
+@click.option('--before', type=click.DateTime(formats=['%Y-%m-%d']), help='Archive logs before this date instead of the retention cutoff.')
+def archive_logs_command(before):
+    if before is None and not log_archive.retention_months:
+        click.echo("LOG_RETENTION_MONTHS is 0, nothing to archive.")
+        return
+    cutoff = before or log_archive.cutoff()
+    moved = log_archive.archive(cutoff)
+    click.echo(f"Archived {moved} logs before {cutoff:%Y-%m-%d} to {log_archive.directory}.")
+
+# Close shifts left open past the auto clock-out limit
+@app.cli.command('auto-clock-out')
+def auto_clock_out_command():
+    click.echo(f"Closed {tasks.auto_clock_out()} open shifts.")
+
+# Run a scheduled job now (recorded in its history), or list them
+@app.cli.command('run-job')
+@click.argument('job_id', required=False)
+def run_job_command(job_id):
+    if job_id is None:
+        for job in job_scheduler.jobs.values():
+            click.echo(f"{job.id:<18} every {job.interval}  {job.description}")
+        return
+    if job_id not in job_scheduler.jobs:
+        raise click.BadParameter(f"Unknown job {job_id!r}, see `flask run-job`.")
+    run = job_scheduler.run(job_id)
+    if run is None:
+        click.echo(f"{job_id} already ran this interval or is running elsewhere, skipped.")
+        return
+    click.echo(f"{job_id}: {run.status} in {run.duration_ms} ms, result {run.result}")
+    if run.error:
+        click.echo(run.error)
+        raise SystemExit(1)
+
+# Production server: waitress, optionally pre-forked, warmed up before it listens
+@app.cli.command('serve')
+@click.option('--host', help='Defaults to SERVER_HOST.')
+@click.option('--port', type=int, help='Defaults to SERVER_PORT.')
+@click.option('--workers', type=int, help='Processes sharing the socket (needs fork()). Defaults to SERVER_WORKERS.')
+@click.option('--threads', type=int, help='Request threads per process. Defaults to SERVER_THREADS.')
+@click.option('--connection-limit', type=int, help='Open connections per process. Defaults to SERVER_CONNECTION_LIMIT.')
+@click.option('--channel-timeout', type=int, help='Idle connection timeout in seconds. Defaults to SERVER_CHANNEL_TIMEOUT.')
+@click.option('--warmup/--no-warmup', default=None, help='Defaults to SERVER_WARMUP.')
+def serve_command(host, port, workers, threads, connection_limit, channel_timeout, warmup):
+    def option(value, key):
+        return app.config[key] if value is None else value
+
+    serve(
+        app,
+        host=option(host, 'SERVER_HOST'),
+        port=option(port, 'SERVER_PORT'),
+        workers=option(workers, 'SERVER_WORKERS'),
+        threads=option(threads, 'SERVER_THREADS'),
+        connection_limit=option(connection_limit, 'SERVER_CONNECTION_LIMIT'),
+        channel_timeout=option(channel_timeout, 'SERVER_CHANNEL_TIMEOUT'),
+        backlog=app.config['SERVER_BACKLOG'],
+        warm=option(warmup, 'SERVER_WARMUP')
+    )
+
 # Run Flask App
 if __name__ == '__main__':
     # initialize_database()
 
-    # serve(app, host='0.0.0.0', port=5001)
+    # Development server; use `flask --app app serve` in production
     app.run(host='0.0.0.0', port=5001, debug=True)
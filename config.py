@@ -5,9 +5,128 @@ load_dotenv()
 
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
-    SQLALCHEMY_DATABASE_URI = (
+    # DATABASE_URL, when set, replaces the DB_* settings (e.g. SQLite for load tests)
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL") or (
         f"mysql+mysqlconnector://{os.getenv('DB_USER')}:"
         f"{os.getenv('DB_PASS')}@{os.getenv('DB_HOST')}/"
         f"{os.getenv('DB_NAME')}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool. Size it against the waitress thread count: every
+    # thread that touches the database holds a connection until its request
+    # ends, and /api/pool-stats shows how long checkouts wait.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 5)),
+        # Seconds before a connection is replaced, below MySQL's wait_timeout
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        # Seconds a request waits for a free connection before failing
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),
+    }
+
+    # Seconds a process may serve cached GlobalSettings before re-reading them
+    SETTINGS_CACHE_TTL = int(os.getenv("SETTINGS_CACHE_TTL", 60))
+
+    # Seconds a process may serve a compiled user schedule before reloading it
+    SCHEDULE_CACHE_TTL = int(os.getenv("SCHEDULE_CACHE_TTL", 300))
+
+    # Audit log writer: queue capacity, rows per insert and max flush delay
+    AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "true").lower() == "true"
+    AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 1000))
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 100))
+    AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", 500))
+
+    # Admin daily-logs live feed: events kept for reconnects, per-client
+    # queue, heartbeat, concurrent streams and seconds before a stream is recycled.
+    # Events stay in the process that published them, so with SERVER_WORKERS
+    # above 1 the stream is off and the page polls for changes instead
+    LIVE_FEED_REPLAY_SIZE = int(os.getenv("LIVE_FEED_REPLAY_SIZE", 200))
+    LIVE_FEED_QUEUE_SIZE = int(os.getenv("LIVE_FEED_QUEUE_SIZE", 100))
+    LIVE_FEED_HEARTBEAT_SECS = int(os.getenv("LIVE_FEED_HEARTBEAT_SECS", 15))
+    LIVE_FEED_MAX_SUBSCRIBERS = int(os.getenv("LIVE_FEED_MAX_SUBSCRIBERS", 8))
+    LIVE_FEED_MAX_AGE_SECS = int(os.getenv("LIVE_FEED_MAX_AGE_SECS", 300))
+
+    # get-daily-logs `since` sync re-sends rows changed this many seconds
+    # before the cursor, so a slow commit with an older timestamp is not missed
+    SYNC_CURSOR_OVERLAP_SECS = int(os.getenv("SYNC_CURSOR_OVERLAP_SECS", 5))
+
+    # Session backend: "filesystem" (./flask_session, as before), "cookie"
+    # (signed, stateless), "database" (sessions table) or "memory"
+    # (in-process LRU, single process only)
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "filesystem")
+    # A session that is only read is written back at most this often
+    SESSION_TOUCH_INTERVAL_SECS = int(os.getenv("SESSION_TOUCH_INTERVAL_SECS", 60))
+    # Request-time purging of expired database sessions, only used while
+    # SCHEDULER_ENABLED is off
+    SESSION_PURGE_INTERVAL_SECS = int(os.getenv("SESSION_PURGE_INTERVAL_SECS", 300))
+    SESSION_PURGE_BATCH_SIZE = int(os.getenv("SESSION_PURGE_BATCH_SIZE", 500))
+    SESSION_MEMORY_MAX_ENTRIES = int(os.getenv("SESSION_MEMORY_MAX_ENTRIES", 10000))
+
+    # Per-request latency/SQL metrics served at /metrics (Prometheus text).
+    # Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>";
+    # without a token only logged-in admins can read it.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # SQL statements slower than this are logged to tickr.slow_query
+    SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", 200))
+
+    # Seconds an audit log total (get-logs ?total=1) is served from cache
+    LOG_COUNT_CACHE_TTL = int(os.getenv("LOG_COUNT_CACHE_TTL", 60))
+
+    # system_logs older than this many months are moved to gzipped JSONL
+    # under LOG_ARCHIVE_DIR by `flask archive-logs`; 0 keeps everything
+    LOG_RETENTION_MONTHS = int(os.getenv("LOG_RETENTION_MONTHS", 12))
+    LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "./archive/system_logs")
+    # Rows copied and deleted per transaction while archiving
+    LOG_ARCHIVE_CHUNK_SIZE = int(os.getenv("LOG_ARCHIVE_CHUNK_SIZE", 1000))
+
+    # Housekeeping jobs (tasks.py) run in a background scheduler in every
+    # process that serves requests; a lease in job_locks lets only one of
+    # them run each job. With the scheduler on, expired database sessions
+    # are purged by a job instead of during requests.
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    # How long a running job holds its lease before another process may take over
+    SCHEDULER_LOCK_LEASE_SECS = int(os.getenv("SCHEDULER_LOCK_LEASE_SECS", 600))
+    # Days of job_runs history to keep
+    SCHEDULER_HISTORY_DAYS = int(os.getenv("SCHEDULER_HISTORY_DAYS", 30))
+
+    # Processes hashing and checking passwords, off the request threads
+    # (0 hashes inline)
+    PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", min(4, os.cpu_count() or 1)))
+    # Password checks running or waiting at once; more get a 429
+    PASSWORD_VERIFY_MAX_PENDING = int(os.getenv("PASSWORD_VERIFY_MAX_PENDING", 8))
+    # werkzeug method for new hashes. Older hashes are upgraded on the next
+    # successful admin login after this changes.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    # Password attempts allowed per minute (with bursts up to *_BURST), per
+    # account and per client IP, before answering 429. The buckets live in
+    # each process: with SERVER_WORKERS workers an attacker spread across
+    # them gets up to SERVER_WORKERS times these budgets
+    LOGIN_ACCOUNT_RATE_PER_MIN = float(os.getenv("LOGIN_ACCOUNT_RATE_PER_MIN", 5))
+    LOGIN_ACCOUNT_BURST = int(os.getenv("LOGIN_ACCOUNT_BURST", 5))
+    LOGIN_IP_RATE_PER_MIN = float(os.getenv("LOGIN_IP_RATE_PER_MIN", 20))
+    LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", 20))
+    # Reverse proxies in front of the app (Cloudflare, nginx) that append to
+    # X-Forwarded-For. 0 uses the connecting address and ignores the header,
+    # which clients could otherwise forge to dodge the per-IP limit or the
+    # clock-in whitelist
+    TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 0))
+    # Largest accepted /api/import-users batch
+    IMPORT_MAX_USERS = int(os.getenv("IMPORT_MAX_USERS", 2000))
+
+    # Production server (`flask serve`). Threads are per process; keep them
+    # at or below DB_POOL_SIZE + DB_MAX_OVERFLOW. Workers above 1 pre-fork
+    # that many processes sharing the socket (needs fork(), e.g. Linux).
+    SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", 5001))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 1))
+    SERVER_THREADS = int(os.getenv("SERVER_THREADS", 8))
+    # Open client connections per process before new ones wait in the backlog
+    SERVER_CONNECTION_LIMIT = int(os.getenv("SERVER_CONNECTION_LIMIT", 100))
+    # Seconds an idle client connection stays open
+    SERVER_CHANNEL_TIMEOUT = int(os.getenv("SERVER_CHANNEL_TIMEOUT", 120))
+    SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", 1024))
+    # Compile templates, load caches and open connections before listening
+    SERVER_WARMUP = os.getenv("SERVER_WARMUP", "true").lower() == "true"
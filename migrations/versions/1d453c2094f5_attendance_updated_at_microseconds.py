@@ -0,0 +1,45 @@
+"""attendance updated_at microseconds
+
+Revision ID: 1d453c2094f5
+Revises: d58ff7da2470
+Create Date: 2026-10-18 06:52:09.038680
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '1d453c2094f5'
+down_revision = 'd58ff7da2470'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_NOW = "(strftime('%Y-%m-%d %H:%M:%f', 'now'))"
+
+
+def upgrade():
+    # Microsecond stamps, so two changes within one second give the daily-logs
+    # ETag and sync cursor different values. SQLite stores text and only
+    # needs the new default
+    if op.get_bind().dialect.name == 'mysql':
+        op.alter_column('attendance', 'updated_at',
+                        existing_type=sa.DateTime(), type_=mysql.DATETIME(fsp=6),
+                        existing_nullable=False, server_default=sa.text('CURRENT_TIMESTAMP(6)'))
+    else:
+        with op.batch_alter_table('attendance', schema=None) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), existing_nullable=False,
+                                  server_default=sa.text(SQLITE_NOW))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        op.alter_column('attendance', 'updated_at',
+                        existing_type=mysql.DATETIME(fsp=6), type_=sa.DateTime(),
+                        existing_nullable=False, server_default=sa.func.now())
+    else:
+        with op.batch_alter_table('attendance', schema=None) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), existing_nullable=False,
+                                  server_default=sa.func.now())
@@ -0,0 +1,42 @@
+"""system logs search indexes
+
+Revision ID: 50c3d140de99
+Revises: 72ba31764946
+Create Date: 2026-10-18 06:19:59.747038
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '50c3d140de99'
+down_revision = '72ba31764946'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The composite index takes over the foreign key's index before the old
+    # one is dropped (MySQL refuses to drop an index a foreign key needs)
+    with op.batch_alter_table('system_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_system_logs_user_id_timestamp', ['user_id', 'timestamp'], unique=False)
+        batch_op.create_index('ix_system_logs_action_timestamp', ['action', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('system_logs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_system_logs_user_id'))
+
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index('ix_system_logs_details_fulltext', 'system_logs', ['details'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ix_system_logs_details_fulltext', table_name='system_logs')
+
+    with op.batch_alter_table('system_logs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_system_logs_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('system_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_system_logs_action_timestamp')
+        batch_op.drop_index('ix_system_logs_user_id_timestamp')
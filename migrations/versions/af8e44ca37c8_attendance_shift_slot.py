@@ -0,0 +1,44 @@
+"""attendance shift slot
+
+Revision ID: af8e44ca37c8
+Revises: 0ff445274ea8
+Create Date: 2026-10-18 06:02:35.352828
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'af8e44ca37c8'
+down_revision = '0ff445274ea8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('slot', sa.SmallInteger(), server_default='1', nullable=False))
+
+    # Number each user's existing rows per day in the order they were created
+    numbered = (
+        "SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id, date ORDER BY id) AS n "
+        "FROM attendance"
+    )
+    if op.get_bind().dialect.name == 'mysql':
+        op.execute(
+            f"UPDATE attendance a JOIN ({numbered}) r ON r.id = a.id SET a.slot = r.n"
+        )
+    else:
+        op.execute(
+            f"UPDATE attendance SET slot = (SELECT r.n FROM ({numbered}) r WHERE r.id = attendance.id)"
+        )
+
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.create_unique_constraint('unique_attendance_slot', ['user_id', 'date', 'slot'])
+
+
+def downgrade():
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_attendance_slot', type_='unique')
+        batch_op.drop_column('slot')
@@ -2,10 +2,34 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.dialects import mysql
 from datetime import time
 
 db = SQLAlchemy()
 
+
+class precise_now(FunctionElement):
+    """The database clock with sub-second precision (NOW() stops at seconds)."""
+    type = db.DateTime()
+    inherit_cache = True
+
+
+@compiles(precise_now)
+def _precise_now(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(precise_now, 'mysql')
+def _precise_now_mysql(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP(6)"
+
+
+@compiles(precise_now, 'sqlite')
+def _precise_now_sqlite(element, compiler, **kw):
+    return "(strftime('%Y-%m-%d %H:%M:%f', 'now'))"
+
 ### USER ###
 class User(UserMixin, db.Model):
     __tablename__ = 'user'
@@ -61,16 +85,86 @@ class Attendance(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(50), db.ForeignKey('user.user_id', ondelete="CASCADE", onupdate="CASCADE"), nullable=False, index=True)
-    date = db.Column(db.Date, nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False)
     clock_in = db.Column(db.Time)
     clock_out = db.Column(db.Time)
     is_manual = db.Column(db.Boolean, default=False)
+    slot = db.Column(db.SmallInteger, nullable=False, default=1, server_default='1') # nth clock-in of the day
+    # Database clock, set on insert and on every update; the delta sync cursor
+    # and daily-logs ETag. Microseconds, so two changes within a second differ
+    updated_at = db.Column(
+        db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql'),
+        nullable=False, server_default=precise_now(), onupdate=precise_now()
+    )
 
     user = db.relationship('User', back_populates='attendance_records')
 
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'date', 'slot', name='unique_attendance_slot'),
+        # Finding the open shift on clock-out: user_id + date + clock_out IS NULL
+        db.Index('ix_attendance_user_date_clock_out', 'user_id', 'date', 'clock_out'),
+        # Whole-day lookups and the daily-logs change stamp (count, max updated_at)
+        db.Index('ix_attendance_date_updated_at', 'date', 'updated_at'),
+    )
+
+    @staticmethod
+    def insert_next_slot(user_id, date, max_slots=None, **values):
+        """
+        Single INSERT ... SELECT that puts the new row in the user's next free
+        slot for `date`. With `max_slots` the SELECT yields nothing once the day
+        is full, so the insert affects no rows; two concurrent inserts picking
+        the same slot are rejected by unique_attendance_slot.
+        """
+        values = dict(values, user_id=user_id, date=date)
+        columns = Attendance.__table__.c
+        used_slots = func.coalesce(func.max(Attendance.slot), 0)
+
+        select = db.select(
+            *[db.literal(value, columns[name].type) for name, value in values.items()],
+            used_slots + 1
+        ).where(
+            Attendance.user_id == user_id,
+            Attendance.date == date
+        )
+        if max_slots:
+            select = select.having(used_slots < max_slots)
+
+        return db.insert(Attendance).from_select([*values, 'slot'], select)
+
     def __repr__(self):
         return f"<Attendance {self.user_id} on {self.date}>"
 
+
+# MySQL deadlock (1213) and lock wait timeout (1205). InnoDB's INSERT ...
+# SELECT takes shared next-key locks on the user's day, so two concurrent
+# insert_next_slot() calls usually deadlock before either reaches the
+# unique constraint
+LOCK_CONFLICT_ERRORS = {1205, 1213}
+
+
+def is_lock_conflict(error):
+    """Whether an OperationalError is a deadlock or lock wait timeout."""
+    orig = getattr(error, 'orig', None)
+    code = getattr(orig, 'errno', None)
+    if code is None and getattr(orig, 'args', None):
+        code = orig.args[0]  # PyMySQL and MySQLdb put it first
+    return code in LOCK_CONFLICT_ERRORS
+
+### ATTENDANCE DAILY ROLLUP ###
+class AttendanceDaily(db.Model):
+    """Per-user, per-day totals of completed shifts, kept in step with attendance."""
+    __tablename__ = 'attendance_daily'
+
+    user_id = db.Column(db.String(50), db.ForeignKey('user.user_id', ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    first_in = db.Column(db.Time)
+    last_out = db.Column(db.Time)
+    shift_count = db.Column(db.Integer, nullable=False, default=0)
+    worked_seconds = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AttendanceDaily {self.user_id} on {self.date}>"
+
 ### SCHEDULE ###
 class Schedule(db.Model):
     __tablename__ = 'schedule'
@@ -106,6 +200,8 @@ class GlobalSettings(db.Model):
     default_start = db.Column(db.Time, default=time(8, 0))
     default_end = db.Column(db.Time, default=time(17, 0))   
     allowed_early_in_mins = db.Column(db.Integer, default=5)
+    # Open shifts older than this are closed by the auto clock-out job; 0 disables it
+    auto_clock_out_hours = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     @staticmethod
     def get():
@@ -126,13 +222,66 @@ class Logs(db.Model):
     __tablename__ = 'system_logs'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.String(50), db.ForeignKey('user.user_id', ondelete="SET NULL", onupdate="CASCADE"), nullable=True, index=True)
+    user_id = db.Column(db.String(50), db.ForeignKey('user.user_id', ondelete="SET NULL", onupdate="CASCADE"), nullable=True)
     action = db.Column(db.String(255), nullable=False)
-    timestamp = db.Column(db.DateTime, server_default=func.now(), nullable=False)
+    timestamp = db.Column(db.DateTime, server_default=func.now(), nullable=False, index=True)
     details = db.Column(db.Text)
     client_ip = db.Column(db.String(45))
 
     user = db.relationship('User', back_populates='logs', lazy=True)
 
+    __table_args__ = (
+        # Audit log search by user or action within a date range; the user_id
+        # index also serves the foreign key
+        db.Index('ix_system_logs_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_system_logs_action_timestamp', 'action', 'timestamp'),
+        # Keyword search on details; other backends fall back to LIKE
+        db.Index('ix_system_logs_details_fulltext', 'details', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+    def __repr__(self):
+        return f"<Log {self.action} by {self.user_id} at {self.timestamp}>"
+### SESSIONS ###
+class SessionRecord(db.Model):
+    """Server-side session used by the 'database' session backend."""
+    __tablename__ = 'sessions'
+
+    session_id = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    expiry = db.Column(db.DateTime, nullable=False, index=True) # purged in batches once passed
+
+    def __repr__(self):
+        return f"<Session expires {self.expiry}>"
+
+### SCHEDULED JOBS ###
+class JobLock(db.Model):
+    """Lease that lets one process at a time run a scheduled job."""
+    __tablename__ = 'job_locks'
+
+    job_id = db.Column(db.String(64), primary_key=True)
+    owner = db.Column(db.String(100)) # host:pid of the process holding the lease
+    locked_until = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<JobLock {self.job_id} by {self.owner} until {self.locked_until}>"
+
+class JobRun(db.Model):
+    """One run of a scheduled job."""
+    __tablename__ = 'job_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(64), nullable=False)
+    owner = db.Column(db.String(100))
+    started_at = db.Column(db.DateTime, nullable=False, index=True)
+    duration_ms = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(10), nullable=False) # 'ok' or 'error'
+    result = db.Column(db.String(255))
+    error = db.Column(db.Text)
+
+    __table_args__ = (
+        # Latest runs of one job
+        db.Index('ix_job_runs_job_id_started_at', 'job_id', 'started_at'),
+    )
+
     def __repr__(self):
-        return f"<Log {self.action} by {self.user_id} at {self.timestamp}>"
\ No newline at end of file
+        return f"<JobRun {self.job_id} {self.status} at {self.started_at}>"
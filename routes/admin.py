@@ -1,22 +1,20 @@
 from flask import (Blueprint, render_template, redirect, url_for, request, flash, 
-                   send_file, session, request)
+                   send_file, session, request, Response, stream_template)
 from flask_login import login_required, logout_user, current_user
-from werkzeug.security import check_password_hash, generate_password_hash
 from collections import defaultdict
 from datetime import datetime, timedelta, date, time
 from models.models import db, User, Attendance, Schedule, GlobalSettings, Logs
 from sqlalchemy.exc import IntegrityError
-from flask_apscheduler import APScheduler
+from services.settings_cache import cached_settings
+from services.passwords import password_pool
+from routes.api import verify_password
+from services.attendance_stats import daily_shift_pairs, day_shift_summary
+from services.queries import keyset_rows
 from sqlalchemy import func
 
 # Create a Blueprint for admin routes
 admin_bp = Blueprint('admin', __name__)
 
-class Config:
-    SCHEDULER_API_ENABLED = True
-
-scheduler = APScheduler()
-
 # Auto Logout
 @admin_bp.route('/logout')
 def logout():
@@ -133,41 +131,17 @@ def dashboard():
     # 2. OLD METRICS (Hours & Compliance Math)
     # ==========================================
 
-    completed_records = Attendance.query.filter(
-        Attendance.date == today,
-        Attendance.clock_out.isnot(None)
-    ).all()
-
-    total_seconds_worked = 0
-    total_overtime_seconds = 0
-    compliant_shifts_count = 0
-
-    compliance_limit = timedelta(hours=4)
-    overtime_threshold = timedelta(hours=4)
-    
-    for record in completed_records:
-        if record.clock_in and record.clock_out:
-            dt_in = datetime.combine(record.date, record.clock_in)
-            dt_out = datetime.combine(today, record.clock_out)
-            
-            duration = dt_out - dt_in
-            total_seconds_worked += duration.total_seconds()
+    # Totals come back from the database already summed per shift
+    shift_summary = day_shift_summary(today)
 
-            if duration > overtime_threshold:
-                overtime_duration = duration - overtime_threshold
-                total_overtime_seconds += overtime_duration.total_seconds()
+    total_hours_worked = shift_summary.worked_seconds / 3600
+    overtime_hours = round(shift_summary.overtime_seconds / 3600, 2)
 
-            if duration <= compliance_limit:
-                compliant_shifts_count += 1
-
-    total_hours_worked = total_seconds_worked / 3600
-    overtime_hours = round(total_overtime_seconds / 3600, 2)
-
-    num_completed_shifts = len(completed_records)
+    num_completed_shifts = shift_summary.shifts
     if num_completed_shifts > 0:
         average_hours_worked = round(total_hours_worked / num_completed_shifts, 2)
         # Convert compliance to a percentage
-        compliance_rate = round((compliant_shifts_count / num_completed_shifts) * 100)
+        compliance_rate = round((shift_summary.compliant_shifts / num_completed_shifts) * 100)
     else:
         average_hours_worked = 0.0
         compliance_rate = 0
@@ -291,7 +265,7 @@ def export_pdf():
     if current_user.role not in ["superadmin", "admin"]:
         return render_template('auth/login.html')
 
-    unit_head = GlobalSettings.query.first()
+    unit_head = cached_settings()
     selected_month = request.args.get('month', '').strip() or datetime.today().strftime('%Y-%m')
 
     try:
@@ -304,94 +278,69 @@ def export_pdf():
     last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
     total_days = (last_day - first_day).days + 1
 
-    users = User.query.filter(User.role.notin_(["superadmin", "admin"]), User.status == "active") \
-                      .order_by(User.last_name).all()
-
-    attendance_records = Attendance.query.filter(
-        Attendance.date >= first_day,
-        Attendance.date <= last_day
-    ).order_by(Attendance.date, Attendance.id).all()
-
-    # use plain dict with string keys so Jinja lookup is predictable
-    attendance_dict = {}
-    total_hours_dict = {str(user.user_id): "0:00" for user in users}
-
-    def to_datetime(val, record_date):
-        """Normalize time/datetime/iso strings to a datetime on record_date."""
-        if val is None:
-            return None
-        if isinstance(val, datetime):
-            return val
-        if isinstance(val, time):
-            return datetime.combine(record_date, val)
-        # attempt ISO parse/fallback
-        try:
-            return datetime.fromisoformat(str(val))
-        except Exception:
-            return None
-
-    # Populate attendance records (use string date keys)
-    for record in attendance_records:
-        user_key = str(record.user_id)
-        date_key = record.date.strftime('%Y-%m-%d')   # Attendance.date is a date
-
-        attendance_dict.setdefault(user_key, {}).setdefault(date_key, {
-            "shift1": {"in": None, "out": None},
-            "shift2": {"in": None, "out": None}
-        })
-
-        slot = attendance_dict[user_key][date_key]
-
-        cin = to_datetime(record.clock_in, record.date)
-        cout = to_datetime(record.clock_out, record.date)
-
-        # assign into first/second shift slots preserving order
-        if cin and cout:
-            if not slot["shift1"]["in"]:
-                slot["shift1"]["in"] = cin
-                slot["shift1"]["out"] = cout
-            elif slot["shift1"]["out"] is None:
-                slot["shift1"]["out"] = cout
-            else:
-                slot["shift2"]["in"] = cin
-                slot["shift2"]["out"] = cout
-        else:
-            # Skip adding the shift since clock-out is missing
-            pass
-
-    # Calculate total hours per user
-    for user in users:
-        user_key = str(user.user_id)
-        total_seconds = 0
-        for date_key, shifts in attendance_dict.get(user_key, {}).items():
-            for shift in ("shift1", "shift2"):
-                t_in = shifts[shift]["in"]
-                t_out = shifts[shift]["out"]
-                if not t_in or not t_out:
-                    continue
-                start_dt = t_in
-                end_dt = t_out
-                if end_dt < start_dt:
-                    end_dt += timedelta(days=1)
-                total_seconds += (end_dt - start_dt).total_seconds()
-
-        decimal_hours = round(total_seconds / 3600, 2)  # convert to decimal hours
-        total_hours_dict[user_key] = decimal_hours
-
-    user_pairs = [users[i:i + 2] for i in range(0, len(users), 2)]
-
-    return render_template(
+    # Stream the report one pair of DTRs at a time instead of building the
+    # whole month for every user before sending the first byte
+    return Response(stream_template(
         'admin/dtr_report.html',
         now=datetime.now(),
-        user_pairs=user_pairs,
+        user_pairs=_chunks(_dtr_entries(first_day, last_day), 2),  # two DTRs per page
         month=month,
         year=year,
         total_days=total_days,
         datetime=datetime,
         unit_head=unit_head.unit_head if unit_head else "N/A",
-        attendance_dict=attendance_dict,
-        total_hours_dict=total_hours_dict
+    ))
+
+def _chunks(items, size):
+    """Group an iterable into lists of `size`, the last one possibly shorter."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Users whose months are loaded per query when streaming the DTR report
+DTR_BATCH_SIZE = 100
+
+def _dtr_entries(first_day, last_day):
+    """
+    Yield one DTR entry per active GIA: the user, their month of shifts keyed
+    by date and their total hours. Users are read by name DTR_BATCH_SIZE at
+    a time, and each batch's shifts are paired and summed by the database
+    in one query, so only one batch of months is held in memory at a time.
+    """
+    users = db.select(
+        User.user_id, User.first_name, User.last_name, User.middle_name
+    ).filter(
+        User.role.notin_(["superadmin", "admin"]),
+        User.status == "active"
     )
+    keys = (User.last_name, User.user_id)
+
+    for batch in _chunks(keyset_rows(users, keys, DTR_BATCH_SIZE), DTR_BATCH_SIZE):
+        days = {user.user_id: {} for user in batch}
+        total_seconds = dict.fromkeys(days, 0)
+
+        pairs = daily_shift_pairs(first_day, last_day, user_ids=list(days))
+        for row in db.session.execute(pairs):
+            days[row.user_id][row.date.strftime('%Y-%m-%d')] = {
+                "shift1": {"in": _on(row.date, row.in1), "out": _on(row.date, row.out1)},
+                "shift2": {"in": _on(row.date, row.in2), "out": _on(row.date, row.out2)},
+            }
+            total_seconds[row.user_id] += row.worked_seconds or 0
+
+        for user in batch:
+            yield {
+                'user': user,
+                'days': days[user.user_id],
+                'total_hours': round(total_seconds[user.user_id] / 3600, 2),  # convert to decimal hours
+            }
+
+def _on(day, clock):
+    return datetime.combine(day, clock) if clock else None
 
 # Account Settings (Change Password)
 @admin_bp.route('/account-settings', methods=['GET', 'POST'])
@@ -403,7 +352,11 @@ def account_settings():
         confirm_password = request.form.get('confirm_password')
 
         # Validate current password
-        if not check_password_hash(current_user.password, current_password):
+        matches, rejected = verify_password(current_user.user_id, current_user.password, current_password)
+        if rejected:
+            flash(f"Too many attempts. Try again in {rejected.headers['Retry-After']} seconds.", "danger")
+            return redirect(url_for('admin.account_settings'))
+        if not matches:
             flash("Current password is incorrect!", "danger")
             return redirect(url_for('admin.account_settings'))
 
@@ -419,7 +372,7 @@ def account_settings():
 
         try:
             # Hash and update password
-            current_user.password = generate_password_hash(new_password)
+            current_user.password = password_pool.hash(new_password)
             db.session.commit()
 
             # Log the password change
@@ -449,28 +402,6 @@ def settings():
 
     return render_template("admin/settings.html")
 
-# auto-disable strict mode if expired
-def update_strict_mode():
-    settings = GlobalSettings.query.first()
-    if not settings or settings.strict_duration is None:
-        return
-
-    today = datetime.now().date()
-
-    if not settings.enable_strict_schedule:
-        if today >= settings.strict_duration:
-            settings.enable_strict_schedule = True
-            settings.strict_duration = None
-
-            entry = Logs(
-                user_id="admin",
-                action="Update",
-                details=f"SYSTEM: Open mode expired on {today}, strict mode reactivated.",
-                timestamp=datetime.now(),
-            )
-            db.session.add(entry)
-            db.session.commit()
-
 
 # ADMIN PROFILE PAGE
 @admin_bp.route('/profile')
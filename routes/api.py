@@ -1,32 +1,62 @@
 from flask import (Blueprint, request, flash, 
-                   send_file, request, jsonify)
+                   request, jsonify, Response, current_app)
 from flask_login import login_required, current_user
-from werkzeug.security import check_password_hash, generate_password_hash
-import io, traceback
-import pandas as pd
+import csv, io, json, re, traceback
+from itertools import islice
 from datetime import datetime, date, timedelta, time
-from models.models import db, User, Attendance, Schedule, GlobalSettings, Logs
+from sqlalchemy.exc import IntegrityError, OperationalError
+from models.models import db, User, Attendance, Schedule, GlobalSettings, Logs, is_lock_conflict
 from routes.gia import WHITELIST, SPECIAL_IDS, get_client_ip
-# from flask_apscheduler import APScheduler
+from services.settings_cache import settings_cache, cached_settings
+from services.schedule_resolver import schedule_resolver
+from services.audit import audit_sink
+from services.live_feed import live_feed
+from services.pool_stats import pool_telemetry
+from services.count_cache import count_cache
+from services.passwords import password_pool, PasswordPoolBusy
+from services.rate_limit import login_limiter
+from services.log_archive import log_archive
+from services.scheduler import job_scheduler
+from services.attendance_stats import user_period_summary, refresh_daily_rollup
+from services import queries
+from services.csv_export import csv_response, user_rows, attendance_rows, USER_COLUMNS, ATTENDANCE_COLUMNS
 
 # Create a Blueprint for admin routes
 api_bp = Blueprint('api', __name__)
 
-# System Log
-def systemLogEntry(action, details):
+# Password given to new users until they change it
+DEFAULT_PASSWORD = 'admin123'
+
+# Password checks run in the password pool, after admission per account and IP
+def verify_password(account, pwhash, password):
+    """
+    Check `password` against `pwhash` without tying up this thread.
+    Returns (matches, None), or (False, a 429 response) when the account or
+    client IP is over its attempt rate or too many checks are in flight.
+    """
+    retry_after = login_limiter.admit(account, get_client_ip())
+    if retry_after:
+        return False, too_many_attempts(retry_after)
     try:
-        entry = Logs(
-            action=action,
-            details=details,
-            user_id=getattr(current_user, 'user_id', None),
-            timestamp=datetime.now(),
-            client_ip=get_client_ip()
+        return password_pool.verify(pwhash, password), None
+    except PasswordPoolBusy:
+        return False, too_many_attempts(1)
 
-        )
-        db.session.add(entry)
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
+def too_many_attempts(retry_after):
+    response = jsonify({'success': False, 'error': f'Too many attempts. Try again in {retry_after} seconds.'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+# System Log (written in batches by the audit sink, not in the request's transaction)
+def systemLogEntry(action, details):
+    audit_sink.submit(
+        action=action,
+        details=details,
+        user_id=getattr(current_user, 'user_id', None),
+        timestamp=datetime.now(),
+        client_ip=get_client_ip()
+    )
 
 # GET ALL USER
 @api_bp.route('/users-data', methods=['GET'])
@@ -76,7 +106,7 @@ def add_user():
         last_name=last_name,
         middle_name=middle_initial.upper(),
         role=role,
-        password=generate_password_hash('admin123')
+        password=password_pool.hash(DEFAULT_PASSWORD)
     )
     db.session.add(new_user)
     db.session.commit()
@@ -90,6 +120,134 @@ def add_user():
         'success': True,
     }), 200
 
+# BULK IMPORT
+# Import columns may use the add-user field names in any spelling
+# (userId, user_id, "User ID"); keys are compared lowercased, letters only
+IMPORT_COLUMNS = {
+    'userid': 'user_id',
+    'firstname': 'first_name',
+    'lastname': 'last_name',
+    'middleinitial': 'middle_name',
+    'middlename': 'middle_name',
+    'role': 'role',
+    'password': 'password',
+}
+IMPORT_ROLES = ('gia', 'admin')
+IMPORT_INSERT_BATCH = 500  # rows per multi-row INSERT
+
+def read_import_records():
+    """Records of a bulk import: an uploaded .csv/.json file, a JSON body or a CSV body."""
+    upload = request.files.get('file')
+    if upload is not None:
+        text = upload.read().decode('utf-8-sig')
+        is_json = (upload.filename or '').lower().endswith('.json')
+    elif request.is_json:
+        data = request.get_json()
+        return data.get('users') if isinstance(data, dict) else data
+    else:
+        text = request.get_data(as_text=True)
+        is_json = False
+
+    if is_json:
+        data = json.loads(text)
+        return data.get('users') if isinstance(data, dict) else data
+    return list(csv.DictReader(io.StringIO(text)))
+
+@api_bp.route('/import-users', methods=['POST'])
+@login_required
+def import_users():
+    if current_user.role not in ["superadmin", "admin"]:
+        return jsonify({'success': False, 'error': 'Access Denied'}), 403
+
+    try:
+        records = read_import_records()
+    except (ValueError, csv.Error) as e:
+        return jsonify({'success': False, 'error': f'Could not read the import: {e}'}), 400
+
+    if not isinstance(records, list) or not records:
+        return jsonify({'success': False, 'error': 'No users to import'}), 400
+    max_users = current_app.config.get('IMPORT_MAX_USERS', 2000)
+    if len(records) > max_users:
+        return jsonify({'success': False, 'error': f'At most {max_users} users can be imported at once'}), 400
+
+    # Validate the whole batch first; any error rejects all of it
+    users, errors = {}, []
+    for row, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            errors.append({'row': row, 'error': 'Expected an object with user fields'})
+            continue
+
+        user = {}
+        for key, value in record.items():
+            column = IMPORT_COLUMNS.get(re.sub(r'[^a-z]', '', str(key).lower()))
+            if column and value is not None and str(value).strip():
+                user[column] = str(value).strip()
+        user['role'] = user.get('role', 'gia').lower()
+        if 'middle_name' in user:
+            user['middle_name'] = user['middle_name'].upper()
+
+        missing = [c for c in ('user_id', 'first_name', 'last_name') if c not in user]
+        too_long = [
+            c for c in ('user_id', 'first_name', 'last_name', 'middle_name')
+            if len(user.get(c, '')) > User.__table__.c[c].type.length
+        ]
+        if missing:
+            errors.append({'row': row, 'error': f"Missing {', '.join(missing)}"})
+        elif too_long:
+            errors.append({'row': row, 'error': f"Too long: {', '.join(too_long)}"})
+        elif user['role'] not in IMPORT_ROLES:
+            errors.append({'row': row, 'error': f"Unknown role {user['role']!r}"})
+        elif user['user_id'] in users:
+            errors.append({'row': row, 'error': f"Duplicate user ID {user['user_id']} in the import"})
+        else:
+            users[user['user_id']] = (row, user)
+
+    # One query for every ID that is already taken
+    if users:
+        taken = db.session.scalars(db.select(User.user_id).where(User.user_id.in_(list(users)))).all()
+        errors.extend({'row': users[t][0], 'error': f"User ID {t} already exists"} for t in taken)
+
+    if errors:
+        errors.sort(key=lambda e: e['row'])
+        return jsonify({
+            'success': False,
+            'error': f'{len(errors)} row(s) are invalid, nothing was imported',
+            'errors': errors[:100]
+        }), 400
+
+    # Hashing is the slow part. Users without a password of their own all get
+    # the well-known default, so one hash serves them all; given passwords
+    # are hashed with their own salts on every core, outside this thread
+    rows = [user for _, user in users.values()]
+    given = iter(password_pool.hash_many(user['password'] for user in rows if 'password' in user))
+    default = password_pool.hash(DEFAULT_PASSWORD) if any('password' not in user for user in rows) else None
+    values = [{
+        'user_id': user['user_id'],
+        'first_name': user['first_name'],
+        'last_name': user['last_name'],
+        'middle_name': user.get('middle_name'),
+        'role': user['role'],
+        'status': 'active',
+        'password': next(given) if 'password' in user else default,
+    } for user in rows]
+
+    try:
+        for start in range(0, len(values), IMPORT_INSERT_BATCH):
+            db.session.execute(db.insert(User).values(values[start:start + IMPORT_INSERT_BATCH]))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'A user ID was taken during the import, nothing was imported'}), 409
+
+    ids = [user['user_id'] for user in rows]
+    systemLogEntry(
+        action="Created",
+        details=f"{len(ids)} users were imported by {current_user.first_name} {current_user.last_name}: "
+                f"{', '.join(ids[:20])}{' ...' if len(ids) > 20 else ''}"
+    )
+
+    return jsonify({'success': True, 'created': len(ids)}), 200
+
 # GET USER DETAILS
 @api_bp.route('/get-user/<string:user_id>', methods=['GET'])
 @login_required
@@ -140,6 +298,7 @@ def update_user(user_id):
 
     try:
         db.session.commit()
+        schedule_resolver.invalidate(user_id)
 
         systemLogEntry(
             action="Updated",
@@ -175,6 +334,7 @@ def delete_user_page(user_id):
         # Delete the user
         db.session.delete(user)
         db.session.commit()
+        schedule_resolver.invalidate(user_id)
 
         return jsonify({'success': True, 'message': 'User deleted successfully!'}), 200
 
@@ -190,32 +350,33 @@ def export_users():
         flash("Access Denied!", "danger")
         return jsonify({'success': False, 'error': 'Access Denied'}), 400
 
-    # Fetch and sort users (active only)
-    users = sorted(
-        User.query.filter(User.role == "gia", User.status == "active").all(),
-        key=lambda x: (x.last_name, x.first_name)
-    )
-
-    # Prepare user data
-    data = {
-        'User ID': [user.user_id for user in users],
-        'Last Name': [user.last_name for user in users],
-        'First Name': [user.first_name for user in users],
-        'Middle Initial': [user.middle_name[0].upper() if user.middle_name else '' for user in users],
-    }
-
-    df = pd.DataFrame(data)
+    # Streamed from the database a batch at a time
+    filename = f'GIA List {datetime.now().strftime("%m-%d-%Y")}.csv'
+    return csv_response(filename, USER_COLUMNS, user_rows())
 
-    # Convert to CSV
-    csv_data = df.to_csv(index=False)
-    output = io.BytesIO()
-    output.write(csv_data.encode('utf-8'))
-    output.seek(0)
+# EXPORT ATTENDANCE
+@api_bp.route('/export-attendance', methods=['GET'])
+@login_required
+def export_attendance():
+    """Every shift in a month (?month=YYYY-MM) or date range (?from=&to=) as CSV."""
+    if current_user.role not in ["superadmin", "admin"]:
+        return jsonify({'success': False, 'error': 'Access Denied'}), 403
 
-    # Filename with timestamp
-    filename = f'GIA List {datetime.now().strftime("%m-%d-%Y")}.csv'
+    try:
+        if request.args.get("month"):
+            first_day = datetime.strptime(request.args["month"], "%Y-%m").date()
+            last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            filename = f'Attendance {first_day.strftime("%B %Y")}.csv'
+        else:
+            first_day = datetime.strptime(request.args.get("from", ""), "%Y-%m-%d").date()
+            last_day = datetime.strptime(request.args.get("to", ""), "%Y-%m-%d").date()
+            filename = f'Attendance {first_day.strftime("%m-%d-%Y")} to {last_day.strftime("%m-%d-%Y")}.csv'
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Give month=YYYY-MM or from/to as YYYY-MM-DD'}), 400
+    if last_day < first_day:
+        return jsonify({'success': False, 'error': "'from' is after 'to'"}), 400
 
-    return send_file(output, mimetype='text/csv', as_attachment=True, download_name=filename)
+    return csv_response(filename, ATTENDANCE_COLUMNS, attendance_rows(first_day, last_day))
 
 # Time to String
 def serialize_schedule(s):
@@ -305,6 +466,10 @@ def parse_time(value):
     except ValueError:
         return None
 
+def parse_log_time(value):
+    """Time-input value ('HH:MM' or 'HH:MM:SS') as a time, None if empty; ValueError if malformed."""
+    return time.fromisoformat(value) if value else None
+
 # UPDATE SCHEDULE
 @api_bp.route('/update-schedule/<string:user_id>', methods=['POST'])
 @login_required
@@ -361,6 +526,7 @@ def update_schedule(user_id):
                 db.session.add(new_sched)
 
         db.session.commit()
+        schedule_resolver.invalidate(user_id)
 
         systemLogEntry(
             action="Updated",
@@ -389,6 +555,7 @@ def purge_schedules():
             Schedule.split_end_time: None
         })
         db.session.commit()
+        schedule_resolver.invalidate()
 
         systemLogEntry(
             action="Deleted",
@@ -402,15 +569,21 @@ def purge_schedules():
 
 def serialize_logs(l):
     role = None
-    if (l.user.role == "admin"):
+    if l.user_id is None:
+        # Written by a background job (auto clock-out) or left by a deleted user
+        role = "System"
+        full_name = "System"
+    elif (l.user.role == "admin"):
         role = "Admin"
+        full_name = f"{l.user.first_name} {l.user.last_name}"
     else:
         role = 'GIA'
+        full_name = f"{l.user.first_name} {l.user.last_name}"
 
     return {
         'date': l.timestamp.strftime("%b %d, %Y"),
         'time': l.timestamp.strftime("%I:%M %p"),
-        'full_name': f"{l.user.first_name} {l.user.last_name}",
+        'full_name': full_name,
         'role': role,
         'action': l.action,
         'details': l.details,
@@ -425,28 +598,91 @@ def get_logs():
 
     from_date = request.args.get("from")
     to_date = request.args.get("to")
-    page = request.args.get("page", 1, type=int)       # current page
-    per_page = request.args.get("per_page", 20, type=int)  # items per page
+    per_page = min(request.args.get("per_page", 20, type=int), 100)  # items per page
+    before = request.args.get("before", type=int)   # older than this log id
+    after = request.args.get("after", type=int)     # newer than this log id
+    include_total = request.args.get("total") == "1"
+    # Optional filters; each narrows the same indexed range read
+    user_id = request.args.get("user_id", "").strip()
+    role = request.args.get("role", "").strip()
+    action = request.args.get("action", "").strip()
+    client_ip = request.args.get("ip", "").strip()
+    keyword = request.args.get("q", "").strip()
 
     from_date_obj = datetime.strptime(from_date, "%Y-%m-%d")
-    to_date_obj = datetime.strptime(to_date, "%Y-%m-%d") + timedelta(days=1) - timedelta(seconds=1)
-
-    pagination = Logs.query.filter(
-        Logs.user_id != 'superadmin',
-        Logs.timestamp >= from_date_obj,
-        Logs.timestamp <= to_date_obj
-    ).order_by(Logs.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    to_date_obj = datetime.strptime(to_date, "%Y-%m-%d") + timedelta(days=1)
+
+    filters = queries.log_filters(from_date_obj, to_date_obj, user_id, role, action, client_ip, keyword)
+
+    # Keyset pagination on Logs.id: every page is one indexed range read of
+    # per_page + 1 rows (the extra row tells whether another page exists),
+    # however deep the client has paged. No OFFSET, no COUNT.
+    # The user's name and role come from the same statement, not a lazy load per row
+
+    # Logs past the retention window live in the archive; pages that run
+    # off the end of the table continue there, oldest ids last
+    archived = log_archive.reaches(from_date_obj)
+    # Same rows as the live query: system entries and every user but the
+    # superadmin, matching every filter by the same rules
+    details_match = queries.details_matcher(keyword) if keyword else None
+    def visible(e):
+        return (
+            e.user_id != 'superadmin'
+            and (not user_id or e.user_id == user_id)
+            and (not role or e.user.role == role)
+            and (not action or e.action == action)
+            and (not client_ip or e.client_ip == client_ip)
+            and (not keyword or details_match(e.details))
+        )
 
-    logs_list = [serialize_logs(l) for l in pagination.items]
+    if after is not None:
+        rows = db.session.scalars(queries.logs_page(filters, per_page + 1, after=after)).all()
+        if log_archive.reaches(from_date_obj, after):
+            older = islice(
+                log_archive.read(from_date_obj, to_date_obj, visible, newest_first=False, after_id=after),
+                per_page + 1
+            )
+            rows = _merge_logs(older, rows)
+        has_newer, has_older = len(rows) > per_page, True
+        rows = rows[:per_page][::-1]
+    else:
+        rows = db.session.scalars(queries.logs_page(filters, per_page + 1, before=before)).all()
+        if archived and len(rows) <= per_page:
+            older = islice(
+                log_archive.read(from_date_obj, to_date_obj, visible, before_id=before),
+                per_page + 1
+            )
+            rows = _merge_logs(rows, older)
+        has_newer, has_older = before is not None, len(rows) > per_page
+        rows = rows[:per_page]
+
+    # Exact totals are opt-in and cached per date range and filter
+    total = None
+    if include_total:
+        def count():
+            live = db.session.scalar(queries.logs_count(filters))
+            if archived:
+                live += sum(1 for _ in log_archive.read(from_date_obj, to_date_obj, visible))
+            return live
+        total = count_cache.get(
+            ('get_logs', from_date, to_date, user_id, role, action, client_ip, keyword), count
+        )
 
     return jsonify({
-        "logs": logs_list,
-        "page": pagination.page,
-        "pages": pagination.pages,
-        "total": pagination.total,
-        "per_page": pagination.per_page
+        "logs": [serialize_logs(l) for l in rows],
+        "per_page": per_page,
+        "next_cursor": rows[-1].id if rows and has_older else None,  # pass as ?before=
+        "prev_cursor": rows[0].id if rows and has_newer else None,   # pass as ?after=
+        "total": total
     })
 
+def _merge_logs(first, second):
+    """Concatenate two runs of logs, skipping ids the first already had."""
+    rows = list(first)
+    seen = {row.id for row in rows}
+    rows.extend(row for row in second if row.id not in seen)
+    return rows
+
 def serialize_drecords(s):
     if s.clock_in and s.clock_out:
         clock_in_dt = datetime.combine(date.today(), s.clock_in)
@@ -474,14 +710,67 @@ def get_daily_logs():
         return jsonify({'success': False, 'error': 'Access Denied'}), 403
     
     today = request.args.get('today')
+    since = request.args.get('since')
+
+    # The day's change stamp: an aggregate over the (date, updated_at) index,
+    # answered without loading or serializing any rows
+    total, last_change = db.session.execute(queries.daily_change_stamp(today)).one()
+    etag = f"{today}.{total}.{last_change.isoformat() if last_change else 0}"
+    headers = {
+        'ETag': f'"{etag}"',
+        'Cache-Control': 'private, no-cache',
+        'X-Sync-Cursor': last_change.isoformat() if last_change else '',
+        'X-Total-Count': str(total),
+    }
 
-    records = Attendance.query.join(User).filter(
-        Attendance.date == today,
-        User.status == "active"
-    ).order_by(Attendance.id.desc()).all()
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+
+    # Only rows changed since the client's cursor; it upserts them by log_id
+    changed_since = None
+    if since:
+        try:
+            cursor = datetime.fromisoformat(since)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid since cursor'}), 400
+        overlap = timedelta(seconds=current_app.config['SYNC_CURSOR_OVERLAP_SECS'])
+        changed_since = cursor - overlap
+
+    records = db.session.scalars(queries.daily_logs(today, changed_since)).all()
     records_list = [serialize_drecords(s) for s in records]
 
-    return jsonify(records_list)
+    return jsonify(records_list), 200, headers
+
+# Push a committed attendance change to open daily-logs boards; `load`
+# returns the row and only runs when a board is listening
+def publish_daily_log(event_type, load):
+    def payload():
+        record = load()
+        return serialize_drecords(record) if record is not None else None
+    live_feed.publish(event_type, payload)
+
+def latest_slot(user_id, day):
+    return db.session.scalar(queries.latest_slot(user_id, day))
+
+@api_bp.route('/daily-logs/stream')
+@login_required
+def daily_logs_stream():
+    if current_user.role not in ["superadmin", "admin"]:
+        return jsonify({'success': False, 'error': 'Access Denied'}), 403
+
+    sub, backlog = live_feed.subscribe(request.headers.get('Last-Event-ID'))
+    if sub is None:
+        # Every stream holds a worker thread, so their number is capped, and
+        # pre-fork workers do not share events; the page falls back to polling
+        return jsonify({'success': False, 'error': 'Too many live connections'}), 503, {'Retry-After': '30'}
+
+    response = Response(live_feed.stream(sub, backlog), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    # The generator's own cleanup does not run if it never started
+    response.call_on_close(lambda: live_feed.unsubscribe(sub))
+    return response
 
 @api_bp.route('/get-user-log/<string:log_id>')
 @login_required
@@ -509,12 +798,20 @@ def update_log(log_id):
     
     data = request.get_json()
     log = Attendance.query.get(log_id)
-    
-    log.clock_in = data.get('clockIn', log.clock_in)
-    log.clock_out = data.get('clockOut', log.clock_out)
 
     try:
+        if 'clockIn' in data:
+            log.clock_in = parse_log_time(data['clockIn'])
+        if 'clockOut' in data:
+            log.clock_out = parse_log_time(data['clockOut'])
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Times must be given as HH:MM.'}), 400
+
+    try:
+        db.session.flush()
+        refresh_daily_rollup(log.user_id, log.date)
         db.session.commit()
+        publish_daily_log('log-updated', lambda: log)
 
         systemLogEntry(
             action="Updated",
@@ -539,16 +836,36 @@ def add_log():
     if not user:
         return jsonify({'success': False, 'error': 'User not found'}), 404
 
-    new_log = Attendance(
-        user_id = user_id,
-        date = data.get('date'),
-        clock_in = data.get('clockIn'),
-        clock_out = data.get('clockOut'),
+    try:
+        log_date = date.fromisoformat(data.get('date'))
+        clock_in = parse_log_time(data.get('clockIn'))
+        clock_out = parse_log_time(data.get('clockOut'))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Give the date as YYYY-MM-DD and times as HH:MM.'}), 400
+
+    # No daily limit here: admins may record more shifts than clock-in allows
+    new_log = Attendance.insert_next_slot(
+        user_id,
+        log_date,
+        clock_in = clock_in,
+        clock_out = clock_out,
         is_manual = True 
     )
 
     try:
-        db.session.add(new_log)
+        # A concurrent add or clock-in for the same day can take the slot
+        # first; as in clock_in, that is a conflict rather than an error
+        try:
+            db.session.execute(new_log)
+            refresh_daily_rollup(user_id, log_date)
+            db.session.commit()
+        except (IntegrityError, OperationalError) as e:
+            db.session.rollback()
+            if isinstance(e, OperationalError) and not is_lock_conflict(e):
+                raise
+            return jsonify({'success': False, 'error': 'Another record for this day was saved at the same time. Please try again.'}), 409
+
+        publish_daily_log('log-added', lambda: latest_slot(user_id, log_date))
 
         systemLogEntry(
             action="Created",
@@ -562,7 +879,7 @@ def add_log():
     
 @api_bp.route('/get-settings', methods=['GET'])
 def get_settings():
-    s = GlobalSettings.query.first()
+    s = cached_settings()
     
     settings = {
         'unit_head': s.unit_head,
@@ -572,7 +889,8 @@ def get_settings():
         'overtime': s.allow_overtime,
         'def_start': s.default_start.strftime("%H:%M"),
         'def_end': s.default_end.strftime("%H:%M"),
-        'early_allowance': s.allowed_early_in_mins
+        'early_allowance': s.allowed_early_in_mins,
+        'auto_clock_out_hours': s.auto_clock_out_hours
     }
     
     try:
@@ -587,6 +905,15 @@ def update_settings():
         return jsonify({'success': False, 'error': 'Access Denied'}), 403
     
     data = request.get_json()
+
+    # 0 turns auto clock-out off; a shift cannot be left open a whole day
+    try:
+        auto_clock_out_hours = int(data.get('autoClockOutHours') or 0)
+    except (TypeError, ValueError):
+        auto_clock_out_hours = None
+    if auto_clock_out_hours is None or not 0 <= auto_clock_out_hours <= 23:
+        return jsonify({'success': False, 'error': 'Auto clock-out hours must be a whole number from 0 to 23.'}), 400
+
     settings = GlobalSettings.query.first()
 
     old_values = {
@@ -597,7 +924,8 @@ def update_settings():
         "allow_early_out": settings.allow_early_out,
         "allow_overtime": settings.allow_overtime,
         "default_start": settings.default_start.strftime("%H:%M") if settings.default_start else None,
-        "default_end": settings.default_end.strftime("%H:%M")
+        "default_end": settings.default_end.strftime("%H:%M"),
+        "auto_clock_out_hours": settings.auto_clock_out_hours
     }
 
     settings.unit_head = data.get('unitHeadName')
@@ -607,6 +935,7 @@ def update_settings():
     settings.allow_overtime = data.get('allowOvertime')
     settings.default_start = data.get('defaultStartTime')
     settings.default_end = data.get('defaultEndTime')
+    settings.auto_clock_out_hours = auto_clock_out_hours
 
     if not data.get('enableStrictMode'):
         settings.strict_duration = data.get('strictDuration') or None
@@ -620,6 +949,7 @@ def update_settings():
 
     try:
         db.session.commit()
+        settings_cache.refresh(settings)
 
         if changes:
             systemLogEntry(
@@ -678,11 +1008,14 @@ def change_password():
         return jsonify({'success': False, 'error': 'Passwords do not match'}), 400
 
     # verify old password
-    if not check_password_hash(current_user.password, current_password):
+    matches, rejected = verify_password(current_user.user_id, current_user.password, current_password)
+    if rejected:
+        return rejected
+    if not matches:
         return jsonify({'success': False, 'error': 'Current password is incorrect'}), 400
 
     # update password
-    current_user.password = generate_password_hash(new_password)
+    current_user.password = password_pool.hash(new_password)
 
     try:
         db.session.commit()
@@ -699,6 +1032,43 @@ def change_password():
         db.session.rollback()
         return jsonify({'success': False, 'error': f'Database error occurred: {str(e)}'}), 500
 
+# AUDIT SINK STATS
+@api_bp.route('/audit-stats', methods=['GET'])
+@login_required
+def audit_stats():
+    if current_user.role not in ["superadmin", "admin"]:
+        return jsonify({'success': False, 'error': 'Access Denied'}), 403
+
+    return jsonify(audit_sink.stats())
+
+@api_bp.route('/pool-stats', methods=['GET'])
+@login_required
+def pool_stats():
+    if current_user.role not in ["superadmin", "admin"]:
+        return jsonify({'success': False, 'error': 'Access Denied'}), 403
+
+    return jsonify(pool_telemetry.stats(db.engine.pool))
+
+@api_bp.route('/jobs', methods=['GET'])
+@login_required
+def scheduled_jobs():
+    if current_user.role not in ["superadmin", "admin"]:
+        return jsonify({'success': False, 'error': 'Access Denied'}), 403
+
+    runs = job_scheduler.history(request.args.get('job'), min(request.args.get('limit', 50, type=int), 500))
+    return jsonify({
+        'jobs': job_scheduler.status(),
+        'runs': [{
+            'job': r.job_id,
+            'started_at': r.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            'duration_ms': r.duration_ms,
+            'status': r.status,
+            'result': r.result,
+            'error': r.error,
+            'owner': r.owner
+        } for r in runs]
+    })
+
 
 #    █████████  █████   █████████        █████████   ███████████  █████
 #   ███░░░░░███░░███   ███░░░░░███      ███░░░░░███ ░░███░░░░░███░░███ 
@@ -722,32 +1092,13 @@ def status():
         return jsonify({'success': False, 'error': 'Access Denied'}), 403 # Changed to 403
 
     today = date.today()
-    
-    # 1. Map actual day name to your block identifiers
-    day_name = datetime.today().strftime('%A').lower()
-    day_map = {
-            'monday': 'mw', 'wednesday': 'mw', 
-            'tuesday': 'tth', 'thursday': 'tth',
-            'friday': 'fri', 'saturday': 'sat'
-        }
-    target_block = day_map.get(day_name) # Will be None on Sundays
-
-    # 2. Get latest attendance for today
-    last_record = Attendance.query.filter(
-        Attendance.user_id == user_id,
-        Attendance.date == today
-    ).order_by(Attendance.id.desc()).first()
-
-    # 3. Get today's schedule using the target_block
-    user_schedules = []
-    if target_block:
-        user_schedules = Schedule.query.filter_by(
-            user_id=user_id,
-            day=target_block
-        ).all()
+    target_block = schedule_resolver.block_for(today) # Will be None on Sundays
+
+    # 1. Get latest attendance for today
+    last_record = db.session.scalar(queries.last_record(user_id, today))
 
     # Check global settings for strict schedule enforcement
-    global_settings = GlobalSettings.query.first()
+    global_settings = cached_settings()
     strict_schedule = bool(global_settings and global_settings.enable_strict_schedule)
 
     schedule_end = None
@@ -761,26 +1112,12 @@ def status():
             'is_grace': False
         }), 200
 
-    clock_in_time = last_record.clock_in
-
-    # Determine applicable shift end time
-    for sched in user_schedules:
-        # Check first shift
-        if sched.start_time and sched.end_time:
-            # Lookback 1 hour before start to 1 second before end
-            early_start = (datetime.combine(today, sched.start_time) - timedelta(hours=1)).time()
-            if early_start <= clock_in_time <= sched.end_time:
-                schedule_end = sched.end_time
-                break
-
-        # Check second shift (split schedule)
-        if sched.is_split_shift and sched.split_start_time and sched.split_end_time:
-            early_second_start = (datetime.combine(today, sched.split_start_time) - timedelta(hours=1)).time()
-            if early_second_start <= clock_in_time <= sched.split_end_time:
-                schedule_end = sched.split_end_time
-                break
-
-    # 4. Check if user exceeded the 60-min grace period (based on your logic)
+    # 2. Determine applicable shift end time (lookback 1 hour before start)
+    shift = schedule_resolver.shift_for(user_id, target_block, last_record.clock_in)
+    if shift:
+        schedule_end = shift.end
+
+    # 3. Check if user exceeded the 60-min grace period (based on your logic)
     if strict_schedule and schedule_end:
         now = datetime.now()
         # grace_limit is shift end + 60 mins
@@ -823,48 +1160,25 @@ def gia_data():
     month = request.args.get('month')
     year, month = map(int, month.split('-'))
 
-    records = Attendance.query.filter(
-        Attendance.user_id == user_id,
-        db.extract('year', Attendance.date) == year,
-        db.extract('month', Attendance.date) == month,
-    ).order_by(Attendance.date.desc(), Attendance.id.desc()).all()
-    
-    user_records = [serialize_records(r) for r in records]
+    first_day = date(year, month, 1)
+    last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
-    sum_hours = 0.0
-    today_hours = 0.0
-    active_dates = set() # Using a set to easily count unique days worked
+    records = db.session.scalars(queries.month_records(user_id, first_day, last_day)).all()
     
-    current_date = date.today()
-
-    for record in records:
-        t_hours = 0.0
-        if record.clock_in and record.clock_out:
-            # Better to use record.date rather than date.today() for historical accuracy
-            clock_in_dt = datetime.combine(record.date, record.clock_in)
-            clock_out_dt = datetime.combine(record.date, record.clock_out)
-            time_difference = clock_out_dt - clock_in_dt
-            t_hours = round(time_difference.total_seconds() / 3600, 2)
-        
-        sum_hours += t_hours
-
-        # Count as an active day if they actually rendered time
-        if t_hours > 0:
-            active_dates.add(record.date)
+    user_records = [serialize_records(r) for r in records]
 
-        # Calculate progress for the current day
-        if record.date == current_date:
-            today_hours += t_hours
+    # Hours are summed by the database instead of walking every record
+    totals = user_period_summary(user_id, first_day, last_day, date.today())
 
     # If you eventually add a 'target_hours' column to your User model, 
     # you can replace the hardcoded 60 with: getattr(current_user, 'target_hours', 60)
     target_hours = 100
 
     summary = {
-        'total_hours': round(sum_hours, 2),
+        'total_hours': round(totals.total_seconds / 3600, 2),
         'target_hours': target_hours,
-        'today_hours': round(today_hours, 2),
-        'active_days': len(active_dates)
+        'today_hours': round(totals.today_seconds / 3600, 2),
+        'active_days': totals.active_days
     }
 
     return jsonify({
@@ -900,92 +1214,56 @@ def clock_in():
         now_time = now_dt.time()
         today_date = now_dt.date()
         
-        # 1. Map actual day to our new blocks
-        day_name = now_dt.strftime('%A').lower()
-        day_map = {
-            'monday': 'mw', 'wednesday': 'mw', 
-            'tuesday': 'tth', 'thursday': 'tth',
-            'friday': 'fri', 'saturday': 'sat'
-        }
-        target_block = day_map.get(day_name) # Sunday returns None
-
-        # 2. Get Schedules and Global Settings 
-        user_schedules = []
-        if target_block:
-            user_schedules = Schedule.query.filter_by(user_id=user_id, day=target_block).all()
-        
-        global_settings = GlobalSettings.query.first()
+        # 1. Map actual day to our schedule blocks
+        target_block = schedule_resolver.block_for(today_date) # Sunday returns None
 
-        # # 3. Apply default schedule if no personal one exists (and it's not Sunday)
-        # if not user_schedules and target_block and global_settings and global_settings.default_start and global_settings.default_end:
-        #     user_schedules = [Schedule(
-        #         user_id=user_id,
-        #         day=target_block,
-        #         start_time=global_settings.default_start,
-        #         end_time=global_settings.default_end
-        #     )]
+        # 2. Get Global Settings 
+        global_settings = cached_settings()
 
         # No schedule check
-        if not user_schedules and day_name != "sunday":
+        if target_block and not schedule_resolver.has_schedule(user_id, target_block):
             return jsonify({'success': False, 'error': 'You don’t have a schedule for today.'}), 400
 
-        # 4. Early-in Rules 
+        # 3. Early-in Rules (7:30 AM shifts get 30 extra minutes, handled by the resolver)
         allowed_early_in = global_settings.allowed_early_in_mins if global_settings else 0
-        special_early_in = allowed_early_in
 
-        # Add special 30min early-in for 7:30 AM shifts on weekday blocks (mw/tth/fri)
-        if target_block in ["mw", "tth", "fri", "sat"]:
-            if any(s.start_time == time(7, 30) for s in user_schedules):
-                special_early_in += 30
-
-        # 5. Determine Valid Schedule 
+        # 4. Determine Valid Schedule 
         valid_schedule_start = None
         is_split_shift = False
 
-        if day_name == "sunday":
+        if not target_block:
             valid_schedule_start = global_settings.default_end if global_settings else None
 
         else:
-            for sched in user_schedules:
-                # First Shift Check
-                if sched.start_time and sched.end_time:
-                    earliest_in = (datetime.combine(today_date, sched.start_time) - timedelta(minutes=special_early_in)).time()
-                    if earliest_in <= now_time <= sched.end_time:
-                        valid_schedule_start = sched.start_time
-                        break
-
-                # Second Shift Check (Split)
-                if getattr(sched, 'is_split_shift', False) and sched.split_start_time and sched.split_end_time:
-                    earliest_second_in = (datetime.combine(today_date, sched.split_start_time) - timedelta(minutes=allowed_early_in)).time()
-                    if earliest_second_in <= now_time <= sched.split_end_time:
-                        valid_schedule_start = sched.split_start_time
-                        is_split_shift = True
-                        break
-
-        # 6. Enforce strict schedule
+            shift = schedule_resolver.clock_in_shift(user_id, target_block, now_time, allowed_early_in)
+            if shift:
+                valid_schedule_start = shift.start
+                is_split_shift = shift.is_split
+
+        # 5. Enforce strict schedule
         if global_settings and global_settings.enable_strict_schedule and not valid_schedule_start:
             # Special bypass logic for weekends if allowed in your workflow, otherwise:
             return jsonify({'success': False, 'error': 'You\'re outside your allowed schedule window.'}), 400
 
-        # 7. Check Attendance Rules 
-        active_shifts_today = Attendance.query.filter(
-            Attendance.user_id == user_id,
-            Attendance.date == today_date,
-            Attendance.clock_in.is_not(None)
-        ).all()
-
-        # Limit to 2 clock-ins per day
-        if len(active_shifts_today) >= 2:
+        # 6. Create the entry in the next free slot. Limited to 2 clock-ins per
+        # day: the insert adds no row once both slots are taken. A concurrent
+        # double tap is rejected by the unique slot constraint or, on MySQL,
+        # usually by a deadlock first; either way the other tap is recorded.
+        try:
+            result = db.session.execute(
+                Attendance.insert_next_slot(user_id, today_date, max_slots=2, clock_in=now_time)
+            )
+            db.session.commit()
+        except (IntegrityError, OperationalError) as e:
+            db.session.rollback()
+            if isinstance(e, OperationalError) and not is_lock_conflict(e):
+                raise
+            return jsonify({'success': False, 'error': 'Your clock-in is already being recorded.'}), 409
+
+        if result.rowcount == 0:
             return jsonify({'success': False, 'error': 'You’ve already reached the daily limit of two clock-ins.'}), 400
 
-        # 8. Create and Save Attendance Entry 
-        new_entry = Attendance(
-            user_id=user_id,
-            date=today_date,
-            clock_in=now_time
-        )
-        db.session.add(new_entry)
-        db.session.commit()
+        publish_daily_log('clock-in', lambda: latest_slot(user_id, today_date))
 
         systemLogEntry(
             action="Clock In",
@@ -997,8 +1275,8 @@ def clock_in():
             'message': 'Clock-in successful!',
             'data': {
                 'user_id': user_id,
-                'time_record': new_entry.clock_in.strftime("%I:%M %p"),
-                'date': new_entry.date.strftime("%Y-%m-%d"),
+                'time_record': now_time.strftime("%I:%M %p"),
+                'date': today_date.strftime("%Y-%m-%d"),
                 'shift': 'second' if is_split_shift else 'first'
             }
         }), 200
@@ -1030,59 +1308,33 @@ def clock_out():
         today = now.date()
         
         # 1. Map current day to the schedule blocks
-        day_name = now.strftime('%A').lower()
-        day_map = {
-            'monday': 'mw', 'wednesday': 'mw', 
-            'tuesday': 'tth', 'thursday': 'tth',
-            'friday': 'fri', 'saturday': 'sat'
-        }
-        target_block = day_map.get(day_name)
+        target_block = schedule_resolver.block_for(today)
 
         # 2. Find the active record (Clocked in today, but not yet clocked out)
-        last_record = Attendance.query.filter(
-            Attendance.user_id == user_id,
-            Attendance.clock_in.isnot(None),
-            Attendance.clock_out.is_(None),
-            Attendance.date == today,
-        ).order_by(Attendance.clock_in.desc()).first()
+        last_record = db.session.scalar(queries.open_shift(user_id, today))
 
         if not last_record:
             return jsonify({'success': False, 'error': 'You can’t clock out without clocking in first today.'}), 400
         
         clock_in_time = last_record.clock_in 
 
-        # 3. Get Schedules and Enforcement Rules
-        global_settings = GlobalSettings.query.first()
+        # 3. Get Enforcement Rules
+        global_settings = cached_settings()
         strict_schedule = bool(global_settings and global_settings.enable_strict_schedule)
-        
-        user_schedules = []
-        if target_block:
-            user_schedules = Schedule.query.filter_by(user_id=user_id, day=target_block).all()
 
         schedule_end = None
         is_split_shift = False
 
         # 4. Determine which shift the user is currently finishing
         if strict_schedule:
-            # If no personal schedule exists, check for weekend default bypass
-            if not user_schedules and day_name in ["sunday"]:
+            # No schedule blocks on Sundays, fall back to the default end
+            if not target_block:
                 schedule_end = global_settings.default_end if global_settings else None
-            
-            for sched in user_schedules:
-                # Check regular shift window
-                if sched.start_time and sched.end_time:
-                    early_start = (datetime.combine(today, sched.start_time) - timedelta(hours=1)).time()
-                    if early_start <= clock_in_time <= sched.end_time:
-                        schedule_end = sched.end_time
-                        break
-
-                # Check split shift window
-                if getattr(sched, 'is_split_shift', False) and sched.split_start_time and sched.split_end_time:
-                    early_second_start = (datetime.combine(today, sched.split_start_time) - timedelta(hours=1)).time()
-                    if early_second_start <= clock_in_time <= sched.split_end_time:
-                        schedule_end = sched.split_end_time
-                        is_split_shift = True
-                        break
+
+            shift = schedule_resolver.shift_for(user_id, target_block, clock_in_time)
+            if shift:
+                schedule_end = shift.end
+                is_split_shift = shift.is_split
 
             # 5. Handle Grace Period and Time Capping
             if schedule_end:
@@ -1111,7 +1363,10 @@ def clock_out():
             # Strict mode disabled
             last_record.clock_out = actual_clock_out
 
+        db.session.flush()
+        refresh_daily_rollup(user_id, today)
         db.session.commit()
+        publish_daily_log('clock-out', lambda: last_record)
 
         systemLogEntry(
             action="Clock Out",
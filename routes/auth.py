@@ -1,9 +1,10 @@
-from flask import Blueprint, request, jsonify, url_for, redirect
+from flask import Blueprint, request, jsonify, url_for, redirect, session
 from flask_login import login_user, logout_user, login_required
-from werkzeug.security import check_password_hash
-from models.models import User
-from routes.api import systemLogEntry
-from routes.admin import update_strict_mode
+from models.models import db, User
+from routes.api import systemLogEntry, verify_password, too_many_attempts
+from routes.gia import get_client_ip
+from services.passwords import password_pool
+from services.rate_limit import login_limiter
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -36,8 +37,8 @@ def login():
             return jsonify({'success': False, 'error': 'The account is no longer active.'}), 403
 
         # NOTE: No password check (intentional based on your design)
-        update_strict_mode()
         login_user(user)
+        session.permanent = True # idle timeout of PERMANENT_SESSION_LIFETIME
 
         systemLogEntry(
             action="Login",
@@ -56,16 +57,28 @@ def login():
         user = User.query.filter_by(user_id=admin_id).first()
 
         if not user:
+            # Unknown IDs still count against the account and IP budgets
+            rejected = login_limiter.admit(admin_id, get_client_ip())
+            if rejected:
+                return too_many_attempts(rejected)
             return jsonify({'success': False, 'error': 'Invalid username or password.'}), 401
 
-        if not check_password_hash(user.password, password):
+        matches, rejected = verify_password(admin_id, user.password, password)
+        if rejected:
+            return rejected
+        if not matches:
             return jsonify({'success': False, 'error': 'Invalid username or password.'}), 401
 
         if user.status != 'active':
             return jsonify({'success': False, 'error': 'The account is no longer active.'}), 403
 
-        update_strict_mode()
+        # Upgrade hashes made with an older method or cost while the password is at hand
+        if password_pool.needs_rehash(user.password):
+            user.password = password_pool.hash(password)
+            db.session.commit()
+
         login_user(user)
+        session.permanent = True # idle timeout of PERMANENT_SESSION_LIFETIME
 
         systemLogEntry(
             action="Login",
@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, redirect, url_for, request, abort
 from flask_login import login_required, current_user
 from datetime import datetime, timedelta
-from models.models import db, Schedule, GlobalSettings
+from models.models import db, Schedule
+from services.settings_cache import cached_settings
 
 gia_bp = Blueprint('gia', __name__)
 
@@ -12,7 +13,7 @@ def check_attendance_flags(attendance_entry):
     Excludes weekends (Saturday and Sunday).
     """
 
-    settings = GlobalSettings.query.first()  # Assuming only one settings row exists
+    settings = cached_settings()  # Assuming only one settings row exists
     strict_mode = settings.enable_strict_schedule if settings else False
 
     if not strict_mode:
@@ -72,17 +73,9 @@ def check_attendance_flags(attendance_entry):
 
 # Client IP Resolver
 def get_client_ip():
-    # Cloudflare real client IP
-    cf_ip = request.headers.get("CF-Connecting-IP")
-    if cf_ip:
-        return cf_ip
-
-    # Generic proxy header
-    xff = request.headers.get("X-Forwarded-For")
-    if xff:
-        return xff.split(",")[0].strip()
-
-    # Direct connection
+    # Forwarding headers are set by whoever sends the request, so they are
+    # only believed behind TRUSTED_PROXY_COUNT proxies, where ProxyFix has
+    # already put the client's address here
     return request.remote_addr
 
 WHITELIST = {
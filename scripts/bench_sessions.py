@@ -0,0 +1,107 @@
+"""
+Per-request overhead of each session backend.
+
+Builds a bare Flask app per backend (SQLite for the database store, a temp
+directory for the filesystem one), logs a client in once and then times
+requests that read the session the way Flask-Login does on every page.
+Overhead is measured against a baseline whose session costs nothing.
+
+    python scripts/bench_sessions.py [--requests 2000] [--database-url URL]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, session
+from flask.sessions import SecureCookieSession, SessionInterface
+from models.models import db, SessionRecord
+from services.session_store import BACKENDS, init_session_store
+
+
+class FixedSessionInterface(SessionInterface):
+    """Baseline: a logged-in session that costs nothing to load or save."""
+
+    def open_session(self, app, request):
+        return SecureCookieSession({'_user_id': 'bench', '_fresh': True})
+
+    def save_session(self, app, session, response):
+        pass
+
+
+def build_app(backend, database_url, workdir):
+    app = Flask(__name__)
+    app.config.update(
+        SECRET_KEY='bench',
+        SQLALCHEMY_DATABASE_URI=database_url,
+        SESSION_BACKEND=backend,
+        SESSION_PERMANENT=True,
+        SESSION_FILE_DIR=os.path.join(workdir, 'flask_session'),
+        PERMANENT_SESSION_LIFETIME=timedelta(minutes=10),
+    )
+    db.init_app(app)
+    if backend == 'baseline':
+        app.session_interface = FixedSessionInterface()
+    else:
+        init_session_store(app)
+
+    with app.app_context():
+        SessionRecord.__table__.create(db.engine, checkfirst=True)
+
+    @app.route('/login')
+    def login():
+        session['_user_id'] = 'bench'
+        session['_fresh'] = True
+        session.permanent = True
+        return 'ok'
+
+    @app.route('/page')
+    def page():
+        return session.get('_user_id', '')
+
+    return app
+
+
+def time_requests(client, path, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        client.get(path)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--database-url', help='Defaults to a temporary SQLite file.')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='tickr-bench-')
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'sessions.db')}"
+    try:
+        print(f"{'backend':<12}{'mean us':>10}{'p95 us':>10}{'overhead us':>13}")
+        base_mean = None
+        for backend in ('baseline',) + BACKENDS:
+            app = build_app(backend, database_url, workdir)
+            client = app.test_client()
+            client.get('/login')
+            time_requests(client, '/page', 50)  # warm up
+
+            mean, p95 = time_requests(client, '/page', args.requests)
+            if base_mean is None:
+                base_mean = mean
+            print(f"{backend:<12}{mean:>10.0f}{p95:>10.0f}{mean - base_mean:>13.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
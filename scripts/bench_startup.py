@@ -0,0 +1,182 @@
+"""
+Cold-start cost of the app: import time and time to first served request.
+
+Every run is a fresh interpreter. "import" is the time `import app` takes
+inside it; "first request" is the wall time from starting `flask --app app
+serve` (with or without --warmup) until a GET / comes back, which is what a
+worker restart or a new instance costs before it can take traffic. The
+modules that should only load on first use are checked both after `import
+app` and after a `flask` CLI command has loaded the app and its commands,
+and the slowest imports are listed from one run under `python -X importtime`.
+
+    python scripts/bench_startup.py [--runs 5] [--top 15] [--warmup] [--database-url URL]
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Not needed to serve a request; should stay out of start-up
+DEFERRED = ['flask_migrate', 'alembic', 'apscheduler', 'waitress', 'pandas']
+
+IMPORT_ONLY = """
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({'import_ms': elapsed * 1000, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % DEFERRED
+
+# What `flask --app app routes` loads, which is what `flask serve` loads
+# before it starts serving
+CLI_ONLY = """
+import json, sys
+from flask.cli import main
+sys.argv = ['flask', '--app', 'app', 'routes']
+try:
+    main()
+except SystemExit:
+    pass
+print(json.dumps({'loaded': [m for m in %r if m in sys.modules]}))
+""" % DEFERRED
+
+CREATE_TABLES = """
+import app
+with app.app.app_context():
+    app.db.create_all()
+"""
+
+
+def child_env(database_url):
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'bench')
+    env['DATABASE_URL'] = database_url
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # measure with bytecode cached, as deployed
+    return env
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_import(env):
+    out = subprocess.run(
+        [sys.executable, '-c', IMPORT_ONLY], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def cli_loaded(env):
+    out = subprocess.run(
+        [sys.executable, '-c', CLI_ONLY], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])['loaded']
+
+
+def time_first_request(env, warm, timeout=30):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'serve', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', '1', '--warmup' if warm else '--no-warmup'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    response.read()
+                return (time.perf_counter() - start) * 1000
+            except urllib.error.HTTPError:
+                # Any response, even an error page, means the app served it
+                return (time.perf_counter() - start) * 1000
+            except OSError:
+                if proc.poll() is not None:
+                    raise SystemExit(f"Server exited with {proc.returncode} before serving a request.")
+                time.sleep(0.005)
+        raise SystemExit(f"No response within {timeout}s.")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def slowest_imports(env, top):
+    out = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line.split('|')
+        rows.append((int(cumulative), int(own.split(':')[1]), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def summarize(samples):
+    return f"median {statistics.median(samples):7.0f} ms   min {min(samples):7.0f}   max {max(samples):7.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to list (0 for none).')
+    parser.add_argument('--warmup', action='store_true', help='Warm up before listening, as SERVER_WARMUP does.')
+    parser.add_argument('--database-url', help='Defaults to a temporary SQLite file.')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='tickr-bench-')
+    env = child_env(args.database_url or f"sqlite:///{os.path.join(workdir, 'startup.db')}")
+    try:
+        if not args.database_url:
+            subprocess.run([sys.executable, '-c', CREATE_TABLES], cwd=ROOT, env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # One throwaway run so every measured run finds bytecode compiled
+        time_import(env)
+
+        imports, first_requests, loaded = [], [], set()
+        for _ in range(args.runs):
+            result = time_import(env)
+            imports.append(result['import_ms'])
+            loaded.update(result['loaded'])
+            first_requests.append(time_first_request(env, args.warmup))
+        cli = cli_loaded(env)
+
+        print(f"import app      {summarize(imports)}")
+        print(f"first request   {summarize(first_requests)}")
+        print(f"deferred        {', '.join(m for m in DEFERRED if m not in loaded and m not in cli) or '-'}")
+        if loaded:
+            print(f"loaded eagerly  {', '.join(sorted(loaded))}")
+        if cli:
+            print(f"loaded by CLI   {', '.join(sorted(cli))}")
+
+        if args.top:
+            print(f"\n{'cumulative ms':>14}{'self ms':>9}  module")
+            for cumulative, own, name in slowest_imports(env, args.top):
+                print(f"{cumulative / 1000:>14.1f}{own / 1000:>9.1f}  {name}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # A deferred module imported at start-up is a regression
+    if loaded or cli:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Morning-rush load test for the clock endpoints.
+
+Seeds `--users` GIA accounts (ids <prefix>0001...) with schedules covering
+the whole day and clears today's attendance for them, then lets them
+arrive at `--rate` per second on average (Poisson arrivals). Each one logs
+in through /auth/login and, on its own keep-alive connection, checks
+/api/status, clocks in, checks status again and, `--shift-secs` later,
+clocks out and checks status once more. Throughput, p50/p95/p99 latency
+and errors are reported per endpoint.
+
+Without --url a server is started with `flask serve` on a temporary SQLite
+file (or --database-url); with --url it must already be running against
+--database-url, which is where the users are seeded. Nothing leaves the
+machine.
+
+    python scripts/loadtest_rush.py [--users 300] [--rate 5] [--shift-secs 5]
+        [--url http://127.0.0.1:5001 --database-url URL]
+        [--server-workers 1] [--server-threads 8] [--concurrency 200]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dt_time
+from http.client import HTTPConnection
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ENDPOINTS = ['/auth/login', '/api/status', '/api/clock-in', '/api/clock-out']
+BLOCKS = ['mw', 'tth', 'fri', 'sat']
+
+
+def seed(database_url, prefix, users):
+    """Create the simulated GIAs (once) and clear their attendance for today."""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('SECRET_KEY', 'loadtest')
+    from app import app
+    from models.models import db, User, Schedule, Attendance, AttendanceDaily, GlobalSettings
+
+    ids = [f"{prefix}{n:04d}" for n in range(1, users + 1)]
+    with app.app_context():
+        db.create_all()  # no-op on a migrated database
+        if db.session.scalar(db.select(GlobalSettings.id)) is None:
+            db.session.add(GlobalSettings(id=1, enable_strict_schedule=False))
+
+        existing = set(db.session.scalars(db.select(User.user_id).where(User.user_id.in_(ids))))
+        new = [user_id for user_id in ids if user_id not in existing]
+        if new:
+            db.session.execute(db.insert(User), [
+                {'user_id': user_id, 'first_name': 'Load', 'last_name': user_id,
+                 'password': '-', 'role': 'gia', 'status': 'active'}
+                for user_id in new
+            ])
+
+        db.session.execute(db.delete(Schedule).where(Schedule.user_id.in_(ids)))
+        db.session.execute(db.insert(Schedule), [
+            {'user_id': user_id, 'day': block, 'start_time': dt_time(0, 0),
+             'end_time': dt_time(23, 59), 'is_split_shift': False}
+            for user_id in ids for block in BLOCKS
+        ])
+        for model in (Attendance, AttendanceDaily):
+            db.session.execute(db.delete(model).where(model.user_id.in_(ids), model.date == date.today()))
+        db.session.commit()
+        db.engine.dispose()
+    return ids
+
+
+class Client:
+    """One simulated GIA: a keep-alive connection and its session cookie."""
+
+    def __init__(self, host, port, stats):
+        self.host, self.port = host, port
+        self.stats = stats
+        self.cookies = {}
+        self.conn = None
+
+    def request(self, method, path, endpoint, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{k}={v}" for k, v in self.cookies.items())
+        payload = json.dumps(body) if body is not None else None
+
+        start = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = HTTPConnection(self.host, self.port, timeout=60)
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (OSError, ValueError) as e:
+            self.stats.record(endpoint, (time.perf_counter() - start) * 1000, type(e).__name__)
+            self.close()
+            return None
+
+        elapsed = (time.perf_counter() - start) * 1000
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+
+        error = None
+        if response.status >= 400:
+            try:
+                error = json.loads(data).get('error')
+            except ValueError:
+                pass
+            error = f"{response.status} {error or response.reason}"
+        self.stats.record(endpoint, elapsed, error)
+        return response.status
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+
+    def record(self, endpoint, ms, error=None):
+        with self._lock:
+            self.latencies[endpoint].append(ms)
+            if error:
+                self.errors[endpoint][error] += 1
+
+
+def simulate(user_id, host, port, stats, shift_secs):
+    client = Client(host, port, stats)
+    try:
+        if client.request('POST', '/auth/login', '/auth/login', {'giaId': user_id}) != 200:
+            return
+        client.request('GET', f'/api/status?user_id={user_id}', '/api/status')
+        client.request('POST', '/api/clock-in', '/api/clock-in', {'user_id': user_id})
+        client.request('GET', f'/api/status?user_id={user_id}', '/api/status')
+        if shift_secs is not None:
+            # The connection would have been dropped by now in real life
+            client.close()
+            time.sleep(shift_secs)
+            client.request('POST', '/api/clock-out', '/api/clock-out', {'user_id': user_id})
+            client.request('GET', f'/api/status?user_id={user_id}', '/api/status')
+    finally:
+        client.close()
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def report(stats, elapsed, arrivals):
+    print(f"{arrivals} GIAs in {elapsed:.1f}s\n")
+    print(f"{'endpoint':<16}{'requests':>9}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for endpoint in ENDPOINTS:
+        samples = sorted(stats.latencies.get(endpoint, []))
+        if not samples:
+            continue
+        errors = sum(stats.errors[endpoint].values())
+        print(f"{endpoint:<16}{len(samples):>9}{len(samples) / elapsed:>8.1f}"
+              f"{percentile(samples, 50):>9.0f}{percentile(samples, 95):>9.0f}"
+              f"{percentile(samples, 99):>9.0f}{samples[-1]:>9.0f}{errors:>8}")
+
+    if any(stats.errors.values()):
+        print("\nerrors")
+        for endpoint in ENDPOINTS:
+            for error, count in stats.errors[endpoint].most_common():
+                print(f"  {endpoint:<16}{count:>6}  {error}")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(database_url, port, workers, threads):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    env.setdefault('SECRET_KEY', 'loadtest')
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'serve', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--threads', str(threads)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"Server exited with {proc.returncode}.")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("Server did not start within 60s.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--rate', type=float, default=5, help='Mean arrivals per second.')
+    parser.add_argument('--shift-secs', type=float, default=5, help='Seconds between clock-in and clock-out.')
+    parser.add_argument('--no-clock-out', action='store_true')
+    parser.add_argument('--concurrency', type=int, default=200, help='Most GIAs in flight at once.')
+    parser.add_argument('--prefix', default='load', help='User id prefix of the simulated GIAs.')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for arrival times.')
+    parser.add_argument('--url', help='A running instance; default starts one.')
+    parser.add_argument('--database-url', help="The instance's database; defaults to a temporary SQLite file.")
+    parser.add_argument('--server-workers', type=int, default=1)
+    parser.add_argument('--server-threads', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.url and not args.database_url:
+        parser.error('--url needs --database-url, the database that instance uses.')
+
+    workdir = tempfile.mkdtemp(prefix='tickr-rush-')
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'rush.db')}"
+    server = None
+    try:
+        ids = seed(database_url, args.prefix, args.users)
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            host, port = '127.0.0.1', free_port()
+            server = start_server(database_url, port, args.server_workers, args.server_threads)
+
+        stats = Stats()
+        rng = random.Random(args.seed)
+        shift_secs = None if args.no_clock_out else args.shift_secs
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            arrival = start
+            for user_id in ids:
+                arrival += rng.expovariate(args.rate)
+                time.sleep(max(0, arrival - time.perf_counter()))
+                pool.submit(simulate, user_id, host, port, stats, shift_secs)
+        report(stats, time.perf_counter() - start, len(ids))
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
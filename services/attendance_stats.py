@@ -0,0 +1,216 @@
+from sqlalchemy import Integer, Time
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from models.models import db, Attendance, AttendanceDaily
+
+# Shifts longer than this count as overtime on the admin dashboard
+SHIFT_LENGTH_SECONDS = 4 * 3600
+
+
+class _seconds_between(FunctionElement):
+    """Seconds from `start` to `end`, both times on the same `day`."""
+    type = Integer()
+    name = 'seconds_between'
+    inherit_cache = True
+
+
+@compiles(_seconds_between, 'mysql')
+def _seconds_between_mysql(element, compiler, **kw):
+    day, start, end = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"TIMESTAMPDIFF(SECOND, TIMESTAMP({day}, {start}), TIMESTAMP({day}, {end}))"
+
+
+@compiles(_seconds_between)
+def _seconds_between_default(element, compiler, **kw):
+    # SQLite (development and load tests) has no TIMESTAMPDIFF
+    day, start, end = (compiler.process(arg, **kw) for arg in element.clauses)
+    return (
+        f"CAST(ROUND((julianday({day} || ' ' || {end}) - "
+        f"julianday({day} || ' ' || {start})) * 86400) AS INTEGER)"
+    )
+
+
+class _time_after(FunctionElement):
+    """Time of day `hours` after `start` on `day`, wrapping past midnight."""
+    type = Time()
+    name = 'time_after'
+    inherit_cache = True
+
+
+@compiles(_time_after, 'mysql')
+def _time_after_mysql(element, compiler, **kw):
+    day, start, hours = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"TIME(TIMESTAMP({day}, {start}) + INTERVAL {hours} HOUR)"
+
+
+@compiles(_time_after)
+def _time_after_default(element, compiler, **kw):
+    day, start, hours = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"time({day} || ' ' || {start}, '+' || {hours} || ' hours')"
+
+
+def shift_end_after(hours):
+    """Clock-out time for a shift capped at `hours` after its clock-in."""
+    return _time_after(Attendance.date, Attendance.clock_in, hours)
+
+
+def shift_seconds():
+    """Worked seconds of one Attendance row; a clock-out before the clock-in wraps past midnight."""
+    seconds = _seconds_between(Attendance.date, Attendance.clock_in, Attendance.clock_out)
+    return db.case(
+        (Attendance.clock_out < Attendance.clock_in, seconds + 86400),
+        else_=seconds
+    )
+
+
+def _completed(first_day, last_day, user_id=None, user_ids=None):
+    criteria = [
+        Attendance.date >= first_day,
+        Attendance.date <= last_day,
+        Attendance.clock_in.isnot(None),
+        Attendance.clock_out.isnot(None),
+    ]
+    if user_id is not None:
+        criteria.append(Attendance.user_id == user_id)
+    if user_ids is not None:
+        criteria.append(Attendance.user_id.in_(user_ids))
+    return criteria
+
+
+def daily_shift_pairs(first_day, last_day, user_id=None, user_ids=None):
+    """
+    One row per user and day: user_id, date, in1, out1, in2, out2 and
+    worked_seconds, for one user, a list of users or everyone.
+
+    Completed rows are numbered per day in the order they were recorded. The
+    first is shift 1 and the last (if there is more than one) is shift 2,
+    matching how the DTR has always paired them. worked_seconds only covers
+    those two shifts.
+    """
+    day = (Attendance.user_id, Attendance.date)
+    numbered = db.select(
+        Attendance.user_id,
+        Attendance.date,
+        Attendance.clock_in,
+        Attendance.clock_out,
+        db.func.row_number().over(partition_by=day, order_by=Attendance.id).label('n'),
+        db.func.count().over(partition_by=day).label('shifts'),
+        shift_seconds().label('seconds'),
+    ).where(*_completed(first_day, last_day, user_id, user_ids)).subquery()
+
+    first = numbered.c.n == 1
+    second = db.and_(numbered.c.n == numbered.c.shifts, numbered.c.shifts > 1)
+
+    return db.select(
+        numbered.c.user_id,
+        numbered.c.date,
+        db.func.max(db.case((first, numbered.c.clock_in))).label('in1'),
+        db.func.max(db.case((first, numbered.c.clock_out))).label('out1'),
+        db.func.max(db.case((second, numbered.c.clock_in))).label('in2'),
+        db.func.max(db.case((second, numbered.c.clock_out))).label('out2'),
+        db.func.sum(db.case((db.or_(first, second), numbered.c.seconds), else_=0)).label('worked_seconds'),
+    ).group_by(numbered.c.user_id, numbered.c.date)
+
+
+def user_period_totals(user_id, first_day, last_day, today):
+    """SELECT of the total, today's and active-day counts of worked seconds from the daily rollup."""
+    worked = AttendanceDaily.worked_seconds
+    return db.select(
+        db.func.coalesce(db.func.sum(worked), 0).label('total_seconds'),
+        db.func.coalesce(db.func.sum(db.case((AttendanceDaily.date == today, worked), else_=0)), 0).label('today_seconds'),
+        db.func.count(db.case((worked > 0, 1))).label('active_days'),
+    ).where(
+        AttendanceDaily.user_id == user_id,
+        AttendanceDaily.date >= first_day,
+        AttendanceDaily.date <= last_day
+    )
+
+
+def user_period_summary(user_id, first_day, last_day, today):
+    """Total, today's and active-day counts of worked seconds, read from the daily rollup."""
+    return db.session.execute(user_period_totals(user_id, first_day, last_day, today)).one()
+
+
+def day_shift_summary(day):
+    """Completed-shift count, worked, overtime and compliant-shift totals for one day."""
+    seconds = shift_seconds()
+    return db.session.execute(
+        db.select(
+            db.func.count().label('shifts'),
+            db.func.coalesce(db.func.sum(seconds), 0).label('worked_seconds'),
+            db.func.coalesce(db.func.sum(db.case(
+                (seconds > SHIFT_LENGTH_SECONDS, seconds - SHIFT_LENGTH_SECONDS), else_=0
+            )), 0).label('overtime_seconds'),
+            db.func.coalesce(db.func.sum(db.case(
+                (seconds <= SHIFT_LENGTH_SECONDS, 1), else_=0
+            )), 0).label('compliant_shifts'),
+        ).where(*_completed(day, day))
+    ).one()
+
+
+ROLLUP_COLUMNS = ['user_id', 'date', 'first_in', 'last_out', 'shift_count', 'worked_seconds']
+
+
+def _rollup_select(*criteria):
+    return db.select(
+        Attendance.user_id,
+        Attendance.date,
+        db.func.min(Attendance.clock_in),
+        db.func.max(Attendance.clock_out),
+        db.func.count(),
+        db.func.sum(shift_seconds()),
+    ).where(
+        Attendance.clock_in.isnot(None),
+        Attendance.clock_out.isnot(None),
+        *criteria
+    ).group_by(Attendance.user_id, Attendance.date)
+
+
+def refresh_daily_rollup(user_id, day):
+    """
+    Recompute one user's attendance_daily row from their completed shifts.
+    Runs in the caller's transaction, so call it before their commit.
+    """
+    db.session.execute(db.delete(AttendanceDaily).where(
+        AttendanceDaily.user_id == user_id,
+        AttendanceDaily.date == day
+    ))
+    db.session.execute(db.insert(AttendanceDaily).from_select(
+        ROLLUP_COLUMNS,
+        _rollup_select(Attendance.user_id == user_id, Attendance.date == day)
+    ))
+
+
+def refresh_daily_rollups(days):
+    """
+    refresh_daily_rollup() for many (user_id, date) pairs in two statements.
+    Runs in the caller's transaction, so call it before their commit.
+    """
+    pairs = [tuple(day) for day in days]
+    if not pairs:
+        return
+    db.session.execute(db.delete(AttendanceDaily).where(
+        db.tuple_(AttendanceDaily.user_id, AttendanceDaily.date).in_(pairs)
+    ))
+    db.session.execute(db.insert(AttendanceDaily).from_select(
+        ROLLUP_COLUMNS,
+        _rollup_select(db.tuple_(Attendance.user_id, Attendance.date).in_(pairs))
+    ))
+
+
+def rebuild_daily_rollup(first_day=None, last_day=None):
+    """Rebuild attendance_daily for a date range (everything by default); returns rows written."""
+    rollup_range, attendance_range = [], []
+    if first_day:
+        rollup_range.append(AttendanceDaily.date >= first_day)
+        attendance_range.append(Attendance.date >= first_day)
+    if last_day:
+        rollup_range.append(AttendanceDaily.date <= last_day)
+        attendance_range.append(Attendance.date <= last_day)
+
+    db.session.execute(db.delete(AttendanceDaily).where(*rollup_range))
+    result = db.session.execute(db.insert(AttendanceDaily).from_select(
+        ROLLUP_COLUMNS, _rollup_select(*attendance_range)
+    ))
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,136 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from models.models import db, Logs
+
+logger = logging.getLogger(__name__)
+
+
+class AuditSink:
+    """
+    Writes system_logs rows off the request path.
+
+    Entries go into a bounded queue and a background thread bulk-inserts them
+    every `flush_interval_ms` or `batch_size` rows, whichever comes first, in
+    its own transaction. When the queue is full the caller writes its entry
+    synchronously instead, so nothing is silently lost under backpressure.
+    """
+
+    def __init__(self, maxsize=1000, batch_size=100, flush_interval_ms=500, enabled=True):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.enabled = enabled
+        self.app = None
+
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'queued': 0, 'flushed': 0, 'sync_writes': 0, 'dropped': 0}
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('AUDIT_ASYNC', self.enabled)
+        self.maxsize = app.config.get('AUDIT_QUEUE_SIZE', self.maxsize)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', self.batch_size)
+        self.flush_interval_ms = app.config.get('AUDIT_FLUSH_INTERVAL_MS', self.flush_interval_ms)
+        app.extensions['audit_sink'] = self
+        atexit.register(self.shutdown)
+
+    def submit(self, **entry):
+        """Record one Logs row; `entry` holds its column values."""
+        if not self.enabled or self._stop.is_set():
+            self._write([entry], 'sync_writes')
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+            self._count('queued', 1)
+        except queue.Full:
+            self._write([entry], 'sync_writes')
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize() if self._queue else 0
+        stats['capacity'] = self.maxsize
+        return stats
+
+    def shutdown(self, timeout=5):
+        """Stop the flusher and write out whatever is still queued."""
+        self._stop.set()
+        if self._thread and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self._drain()
+
+    def _ensure_started(self):
+        # Threads do not survive fork(), so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.maxsize)
+            self._thread = threading.Thread(target=self._run, name='audit-sink', daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        interval = self.flush_interval_ms / 1000
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=interval)]
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write(batch, 'flushed')
+
+    def _drain(self):
+        if not self._queue:
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch, 'flushed')
+                batch = []
+        if batch:
+            self._write(batch, 'flushed')
+
+    def _write(self, entries, counter):
+        try:
+            with self.app.app_context():
+                # Own connection and transaction, never the request's session
+                with db.engine.begin() as conn:
+                    conn.execute(db.insert(Logs), entries)
+            self._count(counter, len(entries))
+        except Exception:
+            self._count('dropped', len(entries))
+            logger.exception("Failed to write %d audit log entries", len(entries))
+
+    def _count(self, key, n):
+        with self._stats_lock:
+            self._stats[key] += n
+
+
+audit_sink = AuditSink()
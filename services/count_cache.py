@@ -0,0 +1,47 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CountCache:
+    """
+    Short-lived cache of COUNT(*) results keyed by their filter values.
+
+    Exact totals over large system_logs ranges are expensive and are only
+    shown as "N entries", so a total up to `ttl` seconds old is acceptable.
+    At most `maxsize` filters are kept, least recently used first out.
+    """
+
+    def __init__(self, ttl=60, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._counts = OrderedDict()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('LOG_COUNT_CACHE_TTL', self.ttl)
+        app.extensions['count_cache'] = self
+
+    def get(self, key, count):
+        """Cached total for `key`, calling `count()` when it is missing or stale."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None and cached[1] > now:
+                self._counts.move_to_end(key)
+                return cached[0]
+
+        total = count()
+        with self._lock:
+            self._counts[key] = (total, now + self.ttl)
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+        return total
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+count_cache = CountCache()
@@ -0,0 +1,76 @@
+import csv
+import io
+from flask import Response, stream_with_context
+from models.models import db, User, Attendance
+from services.attendance_stats import shift_seconds
+from services.queries import keyset_rows
+
+# Rows fetched per query, and written per chunk sent
+BATCH_SIZE = 1000
+
+USER_COLUMNS = ['User ID', 'Last Name', 'First Name', 'Middle Initial']
+ATTENDANCE_COLUMNS = ['User ID', 'Last Name', 'First Name', 'Date', 'Clock In', 'Clock Out', 'Hours']
+
+
+def csv_chunks(header, rows, batch_size=BATCH_SIZE):
+    """CSV text for `header` and `rows`, `batch_size` lines per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for n, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if n % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def csv_response(filename, header, rows):
+    """
+    A streamed CSV download. Only one chunk is held in memory at a time;
+    the request context (and its database session) stays open until the
+    last row is sent.
+    """
+    return Response(
+        stream_with_context(csv_chunks(header, rows)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+# Exports
+
+def user_rows():
+    """Active GIA users by name."""
+    stmt = db.select(
+        User.user_id, User.last_name, User.first_name, User.middle_name
+    ).where(
+        User.role == "gia", User.status == "active"
+    )
+    keys = (User.last_name, User.first_name, User.user_id)
+
+    for user_id, last_name, first_name, middle_name in keyset_rows(stmt, keys, BATCH_SIZE):
+        yield user_id, last_name, first_name, middle_name[0].upper() if middle_name else ''
+
+
+def attendance_rows(first_day, last_day):
+    """Every shift from first_day to last_day, by user, date and slot; open shifts have no hours."""
+    stmt = db.select(
+        Attendance.user_id, User.last_name, User.first_name,
+        Attendance.date, Attendance.clock_in, Attendance.clock_out,
+        shift_seconds().label('seconds'), Attendance.slot
+    ).join(User, Attendance.user_id == User.user_id).where(
+        Attendance.date >= first_day,
+        Attendance.date <= last_day
+    )
+    keys = (Attendance.user_id, Attendance.date, Attendance.slot)  # unique_attendance_slot, no sort
+
+    for user_id, last_name, first_name, day, clock_in, clock_out, seconds, _ in keyset_rows(stmt, keys, BATCH_SIZE):
+        yield (
+            user_id, last_name, first_name,
+            day.strftime("%Y-%m-%d"),
+            clock_in.strftime("%I:%M %p") if clock_in else '',
+            clock_out.strftime("%I:%M %p") if clock_out else '',
+            f"{seconds / 3600:.2f}" if seconds is not None else ''
+        )
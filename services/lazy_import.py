@@ -0,0 +1,50 @@
+import importlib
+import sys
+import click
+
+
+class LazyModule:
+    """
+    Stands in for a module until one of its attributes is used, then
+    imports it and forwards to it. Keeps dependencies that only some code
+    paths need (Alembic for `flask db`, APScheduler once a request arrives,
+    waitress when serving) out of process start-up.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        # Only reached for names the proxy itself does not have
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    @property
+    def loaded(self):
+        return self._module is not None or self._name in sys.modules
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}{'' if self.loaded else ' (not imported)'}>"
+
+
+def lazy_import(name):
+    """A stand-in for `import name` that defers the import to first attribute access."""
+    return LazyModule(name)
+
+
+class LazyCommand(click.Command):
+    """
+    A CLI command (or group) that is only built when it is run: `load()`
+    returns the real command. `flask --help` and every other command never
+    import what it needs.
+    """
+
+    def __init__(self, name, load, help=None):
+        super().__init__(name, help=help)
+        self._load = load
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # click invokes the command of the context it gets back
+        return self._load().make_context(info_name, args, parent=parent, **extra)
@@ -0,0 +1,168 @@
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+
+Event = namedtuple('Event', ['id', 'type', 'data'])
+
+
+class Subscription:
+    """One connected client: a bounded queue of events the hub pushes to."""
+
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize=maxsize)
+        # Set when the client fell too far behind; it is told to reload
+        self.overflowed = False
+
+
+class LiveFeed:
+    """
+    In-process publish/subscribe hub behind the admin daily-logs stream.
+
+    Routes publish() after their commit. Every subscriber gets its own
+    bounded queue, and the last `replay_size` events are kept so a client
+    reconnecting with Last-Event-ID picks up where it left off. When that is
+    not possible (the id is too old, was issued before a restart or the
+    client could not keep up) it gets a 'reload' event and refetches the
+    snapshot instead.
+
+    Each process has its own hub, so a client only sees events published by
+    the process it is connected to. Pre-fork serving turns the hub off
+    (`enabled`); the stream then answers 503 and pages poll with `since`.
+    """
+
+    def __init__(self, replay_size=200, queue_size=100, heartbeat=15,
+                 max_subscribers=8, max_age=300):
+        self.replay_size = replay_size
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self.max_age = max_age
+
+        # Event ids are "<epoch>-<seq>"; a new epoch per process start makes
+        # ids from an earlier run unusable for replay
+        self._epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._recent = deque(maxlen=replay_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.enabled = True
+
+    def init_app(self, app):
+        self.replay_size = app.config.get('LIVE_FEED_REPLAY_SIZE', self.replay_size)
+        self.queue_size = app.config.get('LIVE_FEED_QUEUE_SIZE', self.queue_size)
+        self.heartbeat = app.config.get('LIVE_FEED_HEARTBEAT_SECS', self.heartbeat)
+        self.max_subscribers = app.config.get('LIVE_FEED_MAX_SUBSCRIBERS', self.max_subscribers)
+        self.max_age = app.config.get('LIVE_FEED_MAX_AGE_SECS', self.max_age)
+        self._recent = deque(self._recent, maxlen=self.replay_size)
+        app.extensions['live_feed'] = self
+
+    def publish(self, event_type, data):
+        """
+        Send an event to every subscriber. `data` may be a callable building
+        the payload; it is only called when someone is listening, and
+        nothing is published if it returns None.
+        """
+        if not self.enabled:
+            return None
+        if callable(data):
+            with self._lock:
+                if not self._subscribers:
+                    # Nothing to build or keep; a client reconnecting with an
+                    # older id gets 'reload', as if the buffer had wrapped
+                    self._seq += 1
+                    self._recent.clear()
+                    return None
+            data = data()
+            if data is None:
+                return None
+        with self._lock:
+            self._seq += 1
+            event = Event(f"{self._epoch}-{self._seq}", event_type, data)
+            self._recent.append(event)
+            for sub in self._subscribers:
+                if sub.overflowed:
+                    continue
+                try:
+                    sub.queue.put_nowait(event)
+                except queue.Full:
+                    sub.overflowed = True
+        return event
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a client. Returns (subscription, backlog) where backlog holds
+        the events it missed; subscription is None when no slot is free or
+        the hub is off.
+        """
+        with self._lock:
+            if not self.enabled or len(self._subscribers) >= self.max_subscribers:
+                return None, []
+            sub = Subscription(self.queue_size)
+            self._subscribers.add(sub)
+            return sub, self._missed(last_event_id)
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self._seq,
+                'buffered': len(self._recent),
+            }
+
+    def stream(self, sub, backlog):
+        """Server-sent event text for one subscription; unsubscribes when closed."""
+        try:
+            yield "retry: 3000\n\n"
+            for event in backlog:
+                yield self._format(event)
+
+            closes_at = time.monotonic() + self.max_age
+            while time.monotonic() < closes_at:
+                if sub.overflowed:
+                    yield self._format(Event(None, 'reload', {}))
+                    return
+                try:
+                    event = sub.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    # Keeps proxies from closing the idle connection and
+                    # lets the server notice clients that went away
+                    yield ": ping\n\n"
+                    continue
+                yield self._format(event)
+            # Ending the response frees this worker thread; the browser
+            # reconnects on its own with Last-Event-ID
+        finally:
+            self.unsubscribe(sub)
+
+    def _missed(self, last_event_id):
+        if not last_event_id:
+            return []
+
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self._epoch or not seq.isdigit():
+            return [Event(None, 'reload', {})]
+
+        seq = int(seq)
+        oldest = self._seq - len(self._recent) + 1
+        if seq + 1 < oldest:
+            return [Event(None, 'reload', {})]
+        return [e for e in self._recent if int(e.id.partition('-')[2]) > seq]
+
+    @staticmethod
+    def _format(event):
+        lines = []
+        if event.id:
+            lines.append(f"id: {event.id}")
+        lines.append(f"event: {event.type}")
+        lines.append(f"data: {json.dumps(event.data)}")
+        return "\n".join(lines) + "\n\n"
+
+
+live_feed = LiveFeed()
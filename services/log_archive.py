@@ -0,0 +1,238 @@
+import gzip
+import json
+import os
+import threading
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from models.models import db, Logs, User
+
+# Shaped like a Logs row with its user loaded, so serialize_logs() takes both
+ArchivedLog = namedtuple('ArchivedLog', ['id', 'user_id', 'action', 'timestamp', 'details', 'client_ip', 'user'])
+ArchivedUser = namedtuple('ArchivedUser', ['first_name', 'last_name', 'role'])
+
+MANIFEST = 'manifest.json'
+
+
+def _months_before(day, months):
+    month = day.year * 12 + day.month - 1 - months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+class LogArchive:
+    """
+    Moves system_logs rows past the retention window into gzipped JSONL
+    files, one per day: <dir>/<YYYY>/<MM>/<YYYY-MM-DD>.jsonl.gz.
+
+    Rows are copied and deleted `chunk_size` at a time, each delete in its own
+    short transaction, so the table is never locked for long. A chunk is
+    flushed to disk before its rows are deleted; if the process dies in
+    between, the next run archives those rows again and readers drop the
+    duplicate ids. Each row keeps the user's name and role as they were at
+    archive time, so it still renders after the user is deleted.
+
+    manifest.json records `archived_before`, the first timestamp still kept
+    in the table, `max_id`, the highest archived log id, and `days`, the
+    lowest and highest id in each day file. Queries reaching back before
+    that timestamp also read the archive, skipping day files whose ids are
+    outside the page being read. The manifest is re-read only when the
+    file changes.
+    """
+
+    def __init__(self, directory='./archive/system_logs', retention_months=12, chunk_size=1000):
+        self.directory = directory
+        self.retention_months = retention_months
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._cached_manifest = (None, {})
+
+    def init_app(self, app):
+        self.directory = app.config.get('LOG_ARCHIVE_DIR', self.directory)
+        self.retention_months = app.config.get('LOG_RETENTION_MONTHS', self.retention_months)
+        self.chunk_size = app.config.get('LOG_ARCHIVE_CHUNK_SIZE', self.chunk_size)
+        app.extensions['log_archive'] = self
+
+    # Writing
+
+    def cutoff(self, today=None):
+        """Logs before this datetime are outside the retention window."""
+        first = _months_before(today or date.today(), self.retention_months)
+        return datetime.combine(first, datetime.min.time())
+
+    def archive(self, cutoff=None):
+        """Archive and delete every log older than `cutoff`; returns rows moved."""
+        if cutoff is None:
+            if not self.retention_months:
+                return 0
+            cutoff = self.cutoff()
+
+        moved = 0
+        with self._lock:
+            # Readers switch to the archive for this range before any row
+            # leaves the table; until a chunk is deleted both copies exist
+            # and get_logs drops the duplicate ids
+            manifest = self._load_manifest()
+            changed = 'days' not in manifest
+            if changed:
+                # Archives written before the per-day index get one now
+                manifest['days'] = self._index_days()
+            if manifest.get('archived_before') is None or manifest['archived_before'] < cutoff.isoformat():
+                manifest['archived_before'] = cutoff.isoformat()
+                changed = True
+            if changed:
+                self._write_manifest(manifest)
+
+            while True:
+                rows = db.session.execute(
+                    db.select(Logs, User.first_name, User.last_name, User.role)
+                    .outerjoin(User, Logs.user_id == User.user_id)
+                    .where(Logs.timestamp < cutoff)
+                    .order_by(Logs.id)
+                    .limit(self.chunk_size)
+                ).all()
+                if not rows:
+                    break
+
+                days = manifest['days']
+                for day, (low, high) in self._append(rows).items():
+                    known = days.get(day)
+                    days[day] = [min(low, known[0]), max(high, known[1])] if known else [low, high]
+                ids = [row.Logs.id for row in rows]
+                manifest['max_id'] = max(manifest.get('max_id', 0), ids[-1])
+                self._write_manifest(manifest)
+
+                db.session.execute(db.delete(Logs).where(Logs.id.in_(ids)))
+                db.session.commit()
+                moved += len(rows)
+        return moved
+
+    def _append(self, rows):
+        """Append rows to their day files; returns {'YYYY-MM-DD': (lowest id, highest id)}."""
+        by_day = {}
+        for log, first_name, last_name, role in rows:
+            by_day.setdefault(log.timestamp.date(), []).append({
+                'id': log.id,
+                'user_id': log.user_id,
+                'action': log.action,
+                'timestamp': log.timestamp.isoformat(),
+                'details': log.details,
+                'client_ip': log.client_ip,
+                'user': {'first_name': first_name, 'last_name': last_name, 'role': role},
+            })
+
+        id_ranges = {}
+        for day, entries in by_day.items():
+            path = self._path(day)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Appending adds a gzip member; readers see one continuous stream
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            ids = [entry['id'] for entry in entries]
+            id_ranges[day.isoformat()] = (min(ids), max(ids))
+        return id_ranges
+
+    # Reading
+
+    def reaches(self, since, after_id=None):
+        """Whether a query from `since` (and above log id `after_id`) can find archived rows."""
+        manifest = self._manifest()
+        boundary = manifest.get('archived_before')
+        if boundary is None or since >= datetime.fromisoformat(boundary):
+            return False
+        return after_id is None or after_id < manifest.get('max_id', 0)
+
+    def read(self, since, until, where=None, newest_first=True, before_id=None, after_id=None):
+        """
+        Archived logs with since <= timestamp < until, matching `where` and
+        with ids between `after_id` and `before_id` (exclusive), newest
+        first (or oldest first), one day file at a time. Day files whose
+        ids all fall outside that range are not opened.
+        """
+        first, last = since.date(), (until - timedelta(microseconds=1)).date()
+        days = (last - first).days
+        order = range(days, -1, -1) if newest_first else range(days + 1)
+        # Without an index (nothing archived since it was added) read every day
+        id_ranges = self._manifest().get('days')
+
+        for offset in order:
+            day = first + timedelta(days=offset)
+            if id_ranges is not None:
+                low, high = id_ranges.get(day.isoformat(), (None, None))
+                if low is None or (before_id is not None and low >= before_id) \
+                        or (after_id is not None and high <= after_id):
+                    continue
+            entries = [
+                e for e in self._read_day(day)
+                if since <= e.timestamp < until
+                and (before_id is None or e.id < before_id)
+                and (after_id is None or e.id > after_id)
+                and (where is None or where(e))
+            ]
+            entries.sort(key=lambda e: e.id, reverse=newest_first)
+            yield from entries
+
+    def _read_day(self, day):
+        path = self._path(day)
+        if not os.path.exists(path):
+            return []
+        entries = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                raw = json.loads(line)
+                # A crash between writing and deleting archives a chunk twice
+                entries[raw['id']] = ArchivedLog(
+                    raw['id'], raw['user_id'], raw['action'],
+                    datetime.fromisoformat(raw['timestamp']),
+                    raw['details'], raw['client_ip'], ArchivedUser(**raw['user'])
+                )
+        return list(entries.values())
+
+    def _index_days(self):
+        """{'YYYY-MM-DD': [lowest id, highest id]} for every day file on disk."""
+        days = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.jsonl.gz'):
+                    day = date.fromisoformat(name[:-len('.jsonl.gz')])
+                    ids = [e.id for e in self._read_day(day)]
+                    if ids:
+                        days[day.isoformat()] = [min(ids), max(ids)]
+        return days
+
+    def _path(self, day):
+        return os.path.join(self.directory, f"{day:%Y}", f"{day:%m}", f"{day:%Y-%m-%d}.jsonl.gz")
+
+    def _manifest(self):
+        """The manifest for reading; parsed again only after the file changed. Do not modify."""
+        path = os.path.join(self.directory, MANIFEST)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return {}
+        # Every write replaces the file, so the inode changes even when the
+        # mtime does not
+        version = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached_version, manifest = self._cached_manifest
+        if version != cached_version:
+            manifest = self._load_manifest()
+            self._cached_manifest = (version, manifest)
+        return manifest
+
+    def _load_manifest(self):
+        path = os.path.join(self.directory, MANIFEST)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
+
+
+log_archive = LogArchive()
@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+slow_query_log = logging.getLogger('tickr.slow_query')
+
+# Upper bounds (seconds) of the request latency histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Endpoint:
+    """Running totals for one (endpoint, method) pair."""
+    __slots__ = ('buckets', 'count', 'seconds', 'statements', 'db_seconds', 'statuses')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.statuses = defaultdict(int)
+
+
+class RequestMetrics:
+    """
+    Per-endpoint latency histograms, SQL statement counts and DB time.
+
+    SQL is attributed to the request running on the current thread (waitress
+    serves one request per thread); statements from background threads, like
+    the audit sink, only count towards the slow-query log. Statements slower
+    than `slow_query_ms` are logged to the 'tickr.slow_query' logger without
+    their parameters.
+    """
+
+    def __init__(self, slow_query_ms=200, enabled=True):
+        self.slow_query_ms = slow_query_ms
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._endpoints = defaultdict(_Endpoint)
+        self._slow_queries = 0
+        self._collectors = []
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', self.enabled)
+        self.slow_query_ms = app.config.get('SLOW_QUERY_MS', self.slow_query_ms)
+        app.extensions['request_metrics'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._record_status)
+        app.teardown_request(self._end_request)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def add_collector(self, collect):
+        """Register a callable returning extra (name, type, help, samples) families."""
+        self._collectors.append(collect)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            endpoints = {
+                key: (list(e.buckets), e.count, e.seconds, e.statements, e.db_seconds, dict(e.statuses))
+                for key, e in self._endpoints.items()
+            }
+            slow_queries = self._slow_queries
+
+        requests, latency, statements, db_time = [], [], [], []
+        for (endpoint, method), (buckets, count, seconds, n_sql, db_seconds, statuses) in sorted(endpoints.items()):
+            labels = {'endpoint': endpoint, 'method': method}
+            for status, n in sorted(statuses.items()):
+                requests.append((dict(labels, status=str(status)), n))
+
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+                cumulative += n
+                latency.append(('_bucket', dict(labels, le=str(bound)), cumulative))
+            latency.append(('_sum', labels, seconds))
+            latency.append(('_count', labels, count))
+
+            statements.append((labels, n_sql))
+            db_time.append((labels, db_seconds))
+
+        families = [
+            ('tickr_http_requests_total', 'counter', 'Requests served.', requests),
+            ('tickr_http_request_duration_seconds', 'histogram', 'Request latency.', latency),
+            ('tickr_http_request_sql_statements_total', 'counter', 'SQL statements issued by requests.', statements),
+            ('tickr_http_request_db_seconds_total', 'counter', 'Time requests spent in SQL statements.', db_time),
+            ('tickr_slow_queries_total', 'counter', f'SQL statements slower than {self.slow_query_ms} ms.', [({}, slow_queries)]),
+        ]
+        for collect in self._collectors:
+            families.extend(collect())
+
+        lines = []
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample in samples:
+                suffix, labels, value = sample if len(sample) == 3 else ('', *sample)
+                lines.append(f"{name}{suffix}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _start_request(self):
+        # [started, statements, db seconds, status]; a request that raises
+        # never reaches after_request and counts as a 500
+        self._local.request = [time.perf_counter(), 0, 0.0, 500]
+
+    def _record_status(self, response):
+        current = getattr(self._local, 'request', None)
+        if current is not None:
+            current[3] = response.status_code
+        return response
+
+    def _end_request(self, exc=None):
+        current = getattr(self._local, 'request', None)
+        if current is None:
+            return
+        self._local.request = None
+        started, n_sql, db_seconds, status = current
+        elapsed = time.perf_counter() - started
+
+        rule = request.url_rule
+        key = (rule.endpoint if rule else 'unmatched', request.method)
+
+        with self._lock:
+            totals = self._endpoints[key]
+            totals.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            totals.count += 1
+            totals.seconds += elapsed
+            totals.statements += n_sql
+            totals.db_seconds += db_seconds
+            totals.statuses[status] += 1
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the statement's own context, so a statement that raises
+        # (and never reaches after_cursor_execute) leaves nothing behind
+        if context is not None:
+            context._metrics_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_metrics_start', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+
+        current = getattr(self._local, 'request', None)
+        if current is not None:
+            current[1] += 1
+            current[2] += elapsed
+
+        if elapsed * 1000 >= self.slow_query_ms:
+            with self._lock:
+                self._slow_queries += 1
+            rule = request.url_rule if current is not None else None
+            slow_query_log.warning(
+                "%.1f ms in %s: %s", elapsed * 1000,
+                rule.endpoint if rule else 'background', " ".join(statement.split())[:500]
+            )
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+request_metrics = RequestMetrics()
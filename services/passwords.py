@@ -0,0 +1,129 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when `max_pending` password checks are already running or queued."""
+
+
+class PasswordPool:
+    """
+    Process pool for password hashing and verification.
+
+    A hash takes tens of milliseconds of pure CPU and holds the GIL, so
+    doing it in a request thread stalls every other waitress thread,
+    clock-ins included. Here the work runs in up to `max_workers` separate
+    processes, started with 'spawn' so they never inherit the server's
+    threads or connections. The pool is created on first use in each
+    process; with `max_workers` 0 hashes are computed inline.
+
+    At most `max_pending` verifications run or wait at once; past that
+    verify() raises PasswordPoolBusy straight away instead of queueing.
+
+    New hashes use `method` (a werkzeug method string such as
+    "scrypt:32768:8:1" or "pbkdf2:sha256:1000000"). needs_rehash() tells
+    whether a stored hash was made with a different method or cost.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, method='scrypt:32768:8:1'):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.method = method
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._pending = None
+        self._method_prefix = None
+
+    def init_app(self, app):
+        self.max_workers = app.config.get('PASSWORD_POOL_WORKERS', self.max_workers)
+        self.max_pending = app.config.get('PASSWORD_VERIFY_MAX_PENDING', self.max_pending)
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self._pending = None
+        self._method_prefix = None
+        app.extensions['password_pool'] = self
+        atexit.register(self.shutdown)
+
+    @property
+    def workers(self):
+        if self.max_workers is None:
+            return min(4, os.cpu_count() or 1)
+        return self.max_workers
+
+    def hash(self, password):
+        """generate_password_hash() with the configured method."""
+        return self._call(partial(generate_password_hash, method=self.method), password)
+
+    def hash_many(self, passwords):
+        """generate_password_hash() for every password, in order."""
+        passwords = list(passwords)
+        generate = partial(generate_password_hash, method=self.method)
+        if not self.workers or len(passwords) < 2:
+            return [generate(p) for p in passwords]
+
+        # A few chunks per worker keeps them all busy without a round trip per hash
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._ensure_started().map(generate, passwords, chunksize=chunksize))
+
+    def verify(self, pwhash, password):
+        """check_password_hash() off the request thread; raises PasswordPoolBusy when full."""
+        pending = self._pending_slots()
+        if not pending.acquire(blocking=False):
+            raise PasswordPoolBusy()
+        try:
+            return self._call(check_password_hash, pwhash, password)
+        finally:
+            pending.release()
+
+    def needs_rehash(self, pwhash):
+        """Whether `pwhash` was made with another method or cost than the configured one."""
+        if self._method_prefix is None:
+            # werkzeug fills in default parameters ("pbkdf2" becomes
+            # "pbkdf2:sha256:<iterations>"), so take them from a real hash
+            self._method_prefix = self.hash('').split('$', 1)[0]
+        return pwhash.split('$', 1)[0] != self._method_prefix
+
+    def warm(self):
+        """Start the worker processes (and their imports) before the first login needs them."""
+        # One hash per worker: the executor spawns workers as work arrives
+        hashes = self.hash_many([''] * max(self.workers, 1))
+        self._method_prefix = hashes[0].split('$', 1)[0]
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _call(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        return self._ensure_started().submit(func, *args).result()
+
+    def _pending_slots(self):
+        if self._pending is None:
+            with self._lock:
+                if self._pending is None:
+                    limit = self.max_pending if self.max_pending is not None else max(self.workers, 1) * 2
+                    self._pending = threading.BoundedSemaphore(limit)
+        return self._pending
+
+    def _ensure_started(self):
+        # Like the audit sink, a forked worker process starts its own pool
+        if self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+
+password_pool = PasswordPool()
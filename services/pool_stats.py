@@ -0,0 +1,115 @@
+import threading
+import time
+from bisect import bisect_left
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds (seconds) of the checkout wait buckets; the last one is open
+WAIT_BUCKETS = (0.001, 0.005, 0.025, 0.1, 0.5, 2.5)
+
+
+class PoolTelemetry:
+    """
+    Counters for the SQLAlchemy connection pool.
+
+    Checkout time is how long a thread waited for a usable connection,
+    including queueing behind busy waitress threads, opening a new
+    connection and the pre-ping. In-use and overflow come from the pool
+    itself when stats() is called.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._stats = {
+            'checkouts': 0,
+            'checkout_timeouts': 0,
+            'connects': 0,
+            'invalidations': 0,
+            'peak_in_use': 0,
+            'checkout_wait_total_ms': 0.0,
+            'checkout_wait_max_ms': 0.0,
+        }
+        self._wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def init_app(self, app):
+        """Swap in the instrumented pool. Must run before db.init_app()."""
+        options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+        # In-memory SQLite needs its single-connection pool
+        if ':memory:' not in uri and uri != 'sqlite://':
+            options.setdefault('poolclass', InstrumentedQueuePool)
+        app.extensions['pool_telemetry'] = self
+
+    def record_wait(self, seconds, timed_out=False):
+        ms = seconds * 1000
+        with self._lock:
+            if timed_out:
+                self._stats['checkout_timeouts'] += 1
+            self._stats['checkout_wait_total_ms'] += ms
+            self._stats['checkout_wait_max_ms'] = max(self._stats['checkout_wait_max_ms'], ms)
+            self._wait_buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+    def stats(self, pool=None):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_use'] = self._in_use
+            buckets = list(self._wait_buckets)
+
+        # Cumulative, like a Prometheus histogram: checkouts that took <= bound
+        cumulative, total = {}, 0
+        for bound, n in zip(WAIT_BUCKETS + ('inf',), buckets):
+            total += n
+            cumulative[f"le_{bound}"] = total
+        stats['checkout_wait_buckets'] = cumulative
+        stats['checkout_wait_avg_ms'] = round(stats['checkout_wait_total_ms'] / total, 3) if total else 0.0
+        stats['checkout_wait_total_ms'] = round(stats['checkout_wait_total_ms'], 3)
+        stats['checkout_wait_max_ms'] = round(stats['checkout_wait_max_ms'], 3)
+
+        if isinstance(pool, QueuePool):
+            stats['pool'] = {
+                'size': pool.size(),
+                'idle': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout(),
+            }
+        return stats
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _checked_out(self, *args):
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._in_use += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._in_use)
+
+    def _checked_in(self, *args):
+        with self._lock:
+            self._in_use = max(self._in_use - 1, 0)
+
+
+pool_telemetry = PoolTelemetry()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout took."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_telemetry.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_telemetry.record_wait(time.perf_counter() - start)
+        return connection
+
+
+event.listen(InstrumentedQueuePool, 'checkout', pool_telemetry._checked_out)
+event.listen(InstrumentedQueuePool, 'checkin', pool_telemetry._checked_in)
+event.listen(InstrumentedQueuePool, 'connect', lambda *args: pool_telemetry._count('connects'))
+event.listen(InstrumentedQueuePool, 'invalidate', lambda *args: pool_telemetry._count('invalidations'))
@@ -0,0 +1,167 @@
+import re
+from models.models import db, Attendance, Logs, User
+
+# Statements behind the clock, status and admin endpoints. The routes run
+# these and services/query_plans.py EXPLAINs the same builders, so the
+# plan checks always see the SQL that is actually served.
+
+
+# Paging
+
+def _after(keys, values):
+    """`keys` sort after `values`, spelled out column by column so an index on them can be used."""
+    (key, *rest), (value, *more) = keys, values
+    if not rest:
+        return key > value
+    return db.or_(key > value, db.and_(key == value, _after(rest, more)))
+
+
+def keyset_rows(stmt, keys, batch_size):
+    """
+    Every row of `stmt` in `keys` order, `batch_size` per query, each query
+    resuming after the last row's keys. `keys` must be selected by `stmt`,
+    never NULL and unique together. Nothing is held open between queries,
+    and at most one batch is in memory even on drivers that buffer whole
+    results (mysqlconnector does, so yield_per would still load them all).
+    """
+    page = stmt.order_by(*keys).limit(batch_size)
+    last = None
+    while True:
+        rows = db.session.execute(page if last is None else page.where(_after(keys, last))).all()
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last = [rows[-1]._mapping[key] for key in keys]
+
+
+# Attendance
+
+def open_shift(user_id, day):
+    """The user's shift clocked in on `day` and not yet clocked out (clock-out)."""
+    return db.select(Attendance).where(
+        Attendance.user_id == user_id,
+        Attendance.clock_in.isnot(None),
+        Attendance.clock_out.is_(None),
+        Attendance.date == day,
+    ).order_by(Attendance.clock_in.desc()).limit(1)
+
+
+def last_record(user_id, day):
+    """The user's latest attendance row on `day` (status)."""
+    return db.select(Attendance).where(
+        Attendance.user_id == user_id,
+        Attendance.date == day
+    ).order_by(Attendance.id.desc()).limit(1)
+
+
+def latest_slot(user_id, day):
+    """The user's highest slot on `day`, i.e. the row a clock-in just added."""
+    return db.select(Attendance).where(
+        Attendance.user_id == user_id,
+        Attendance.date == day
+    ).order_by(Attendance.slot.desc()).limit(1)
+
+
+def month_records(user_id, first_day, last_day):
+    """The user's rows from first_day to last_day, newest first (GIA dashboard)."""
+    # Plain date range so the (user_id, date) index can be used
+    return db.select(Attendance).where(
+        Attendance.user_id == user_id,
+        Attendance.date >= first_day,
+        Attendance.date <= last_day,
+    ).order_by(Attendance.date.desc(), Attendance.id.desc())
+
+
+def daily_logs(day, changed_since=None):
+    """Active users' rows on `day` with their names, newest first; only rows changed since `changed_since` if given."""
+    stmt = db.select(Attendance).join(Attendance.user).options(
+        db.contains_eager(Attendance.user).load_only(User.user_id, User.first_name, User.last_name)
+    ).where(
+        Attendance.date == day,
+        User.status == "active"
+    )
+    if changed_since is not None:
+        stmt = stmt.where(Attendance.updated_at >= changed_since)
+    return stmt.order_by(Attendance.id.desc())
+
+
+def daily_change_stamp(day):
+    """Row count and latest updated_at on `day`, from the (date, updated_at) index."""
+    return db.select(
+        db.func.count(), db.func.max(Attendance.updated_at)
+    ).join(User).where(Attendance.date == day, User.status == "active")
+
+
+# System logs
+
+def log_filters(since, until, user_id=None, role=None, action=None, client_ip=None, keyword=None):
+    """WHERE criteria for the audit log view; each filter narrows the same indexed range read."""
+    filters = [
+        # Entries without a user (background jobs) are shown as "System"
+        db.or_(Logs.user_id.is_(None), Logs.user_id != 'superadmin'),
+        Logs.timestamp >= since,
+        Logs.timestamp < until
+    ]
+    if user_id:
+        filters.append(Logs.user_id == user_id)   # ix_system_logs_user_id_timestamp
+    if role:
+        filters.append(User.role == role)
+    if action:
+        filters.append(Logs.action == action)     # ix_system_logs_action_timestamp
+    if client_ip:
+        filters.append(Logs.client_ip == client_ip)
+    if keyword:
+        filters.append(details_search(keyword))
+    return filters
+
+
+def _fulltext_words(keyword):
+    """The terms MySQL's FULLTEXT index searches for, or [] to fall back to LIKE."""
+    if db.engine.dialect.name != 'mysql':
+        return []
+    # Shorter words are below innodb_ft_min_token_size and never indexed
+    return [w for w in re.findall(r'\w+', keyword) if len(w) >= 3]
+
+
+def details_search(keyword):
+    """
+    Condition for logs whose details contain `keyword`. On MySQL the
+    FULLTEXT index finds logs with words starting with each term; other
+    backends use LIKE over the date range.
+    """
+    words = _fulltext_words(keyword)
+    if not words:
+        return Logs.details.contains(keyword, autoescape=True)
+    return Logs.details.match(" ".join(f"+{w}*" for w in words))
+
+
+def details_matcher(keyword):
+    """details_search() as a predicate on a details string, for archived logs."""
+    words = [w.lower() for w in _fulltext_words(keyword)]
+    if not words:
+        needle = keyword.lower()
+        return lambda details: needle in (details or '').lower()
+
+    def matches(details):
+        tokens = re.findall(r'\w+', (details or '').lower())
+        return all(any(t.startswith(w) for t in tokens) for w in words)
+    return matches
+
+
+def logs_page(filters, limit, before=None, after=None):
+    """
+    One keyset page of logs with their user's name and role, if any: ids
+    below `before` newest first, or ids above `after` oldest first.
+    """
+    stmt = db.select(Logs).outerjoin(Logs.user).options(
+        db.contains_eager(Logs.user).load_only(User.first_name, User.last_name, User.role)
+    ).where(*filters)
+    if after is not None:
+        return stmt.where(Logs.id > after).order_by(Logs.id.asc()).limit(limit)
+    if before is not None:
+        stmt = stmt.where(Logs.id < before)
+    return stmt.order_by(Logs.id.desc()).limit(limit)
+
+
+def logs_count(filters):
+    return db.select(db.func.count()).select_from(Logs).outerjoin(Logs.user).where(*filters)
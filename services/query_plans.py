@@ -0,0 +1,77 @@
+import re
+from datetime import date, datetime, timedelta
+from models.models import db, Logs, User
+from services import queries
+from services.attendance_stats import user_period_totals
+
+# SQLite: "SCAN attendance" is a full scan, "SCAN attendance USING INDEX ..." is not
+_SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def hot_queries(user_id=None, log_cursor=None, day=None):
+    """
+    The statements behind clock-in/out, status and the admin screens, built
+    by the same functions the routes use. `user_id` and `log_cursor` default
+    to an active GIA and the newest log id in the database. Each one must be
+    answerable from an index.
+    """
+    day = day or date.today()
+    first_day = day.replace(day=1)
+    last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    since = datetime.combine(first_day, datetime.min.time())
+    until = since + timedelta(days=1)
+    if user_id is None:
+        user_id = db.session.scalar(
+            db.select(User.user_id).where(User.role == 'gia', User.status == 'active').limit(1)
+        ) or 'probe'
+    if log_cursor is None:
+        log_cursor = db.session.scalar(db.select(db.func.max(Logs.id))) or 1
+
+    page = 21  # get_logs' default per_page + 1
+    return {
+        'clock_out open shift': queries.open_shift(user_id, day),
+        'status last record': queries.last_record(user_id, day),
+        'clock_in latest slot': queries.latest_slot(user_id, day),
+        'gia month records': queries.month_records(user_id, first_day, last_day),
+        'daily logs': queries.daily_logs(day),
+        'daily logs delta': queries.daily_logs(day, changed_since=since),
+        'daily logs change stamp': queries.daily_change_stamp(day),
+        'month rollup': user_period_totals(user_id, first_day, last_day, day),
+        'system logs page': queries.logs_page(queries.log_filters(since, until), page),
+        'system logs older page': queries.logs_page(queries.log_filters(since, until), page, before=log_cursor),
+        'system logs newer page': queries.logs_page(queries.log_filters(since, until), page, after=log_cursor),
+        'system logs by user': queries.logs_page(queries.log_filters(since, until, user_id=user_id), page),
+        'system logs by action': queries.logs_page(queries.log_filters(since, until, action='Clock In'), page),
+    }
+
+
+def explain(stmt):
+    """
+    Run EXPLAIN for a statement; returns (plan lines, full-scanned tables).
+    Only MySQL and SQLite plans are understood.
+    """
+    dialect = db.engine.dialect
+    compiled = stmt.compile(dialect=dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    with db.engine.connect() as conn:
+        if dialect.name == 'mysql':
+            result = conn.exec_driver_sql(f"EXPLAIN {compiled}", params).mappings().all()
+            lines = [
+                f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}"
+                for row in result
+            ]
+            full_scans = [row['table'] for row in result if row['type'] == 'ALL']
+        else:
+            result = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+            lines = [row[-1] for row in result]
+            full_scans = [m.group(1) for m in map(_SQLITE_FULL_SCAN.match, lines) if m]
+
+    return lines, full_scans
+
+
+def check_hot_queries(**probe):
+    """EXPLAIN every hot query; returns {name: (plan lines, full-scanned tables)}."""
+    return {name: explain(stmt) for name, stmt in hot_queries(**probe).items()}
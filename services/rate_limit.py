@@ -0,0 +1,71 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """
+    Token buckets keyed by any hashable value.
+
+    Each key holds up to `burst` tokens and regains `rate_per_min` per
+    minute; every attempt takes one. At most `maxsize` keys are tracked,
+    least recently used first out, so a flood of new keys cannot grow it
+    without bound (an evicted key simply starts again with a full bucket).
+    """
+
+    def __init__(self, rate_per_min, burst, maxsize=10000):
+        self.rate = rate_per_min / 60
+        self.burst = burst
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key):
+        """Take a token for `key`; returns 0 if allowed, else seconds until the next token."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+
+        if allowed:
+            return 0
+        return math.ceil((1 - tokens) / self.rate) if self.rate else 60
+
+
+class LoginLimiter:
+    """
+    Admission control for password checks: one bucket per account and one
+    per client IP. A request is turned away when either is empty, before
+    any hashing work is queued.
+    """
+
+    def __init__(self, account_per_min=5, account_burst=5, ip_per_min=20, ip_burst=20):
+        self.accounts = TokenBucket(account_per_min, account_burst)
+        self.ips = TokenBucket(ip_per_min, ip_burst)
+
+    def init_app(self, app):
+        self.accounts = TokenBucket(
+            app.config.get('LOGIN_ACCOUNT_RATE_PER_MIN', 5),
+            app.config.get('LOGIN_ACCOUNT_BURST', 5)
+        )
+        self.ips = TokenBucket(
+            app.config.get('LOGIN_IP_RATE_PER_MIN', 20),
+            app.config.get('LOGIN_IP_BURST', 20)
+        )
+        app.extensions['login_limiter'] = self
+
+    def admit(self, account, ip):
+        """0 when the attempt may go ahead, else the Retry-After in seconds."""
+        # Both buckets are charged, so hammering one account also drains the IP
+        return max(self.accounts.take(account), self.ips.take(ip))
+
+
+login_limiter = LoginLimiter()
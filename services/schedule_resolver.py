@@ -0,0 +1,201 @@
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from datetime import time as dt_time
+from models.models import db, Schedule, User
+
+# Schedules are stored per block of days, not per weekday (Sunday has none)
+DAY_BLOCKS = {
+    0: 'mw', 2: 'mw',
+    1: 'tth', 3: 'tth',
+    4: 'fri',
+    5: 'sat',
+}
+
+# How far before a shift's start a clock-in still belongs to that shift when
+# looking up an existing record (clock-out, status)
+LOOKBACK_MINS = 60
+
+# 7:30 AM shifts get an extra 30 minutes of early-in on top of the setting
+EARLY_SHIFT_START = dt_time(7, 30)
+EARLY_SHIFT_BONUS_MINS = 30
+
+Shift = namedtuple('Shift', ['start', 'end', 'is_split'])
+
+
+def _micros(t):
+    """Microsecond of the day; the old clock rules compared full times."""
+    return ((t.hour * 60 + t.minute) * 60 + t.second) * 1_000_000 + t.microsecond
+
+
+_MINUTE = 60 * 1_000_000
+
+
+class _UserSchedule:
+    """One user's Schedule rows compiled into time-of-day windows."""
+
+    def __init__(self, rows, expires_at):
+        self.expires_at = expires_at
+        # block -> shifts in the order the clock rules check them
+        self.blocks = {}
+        # Blocks with a row starting at 7:30; its first shifts get the bonus
+        self._early_blocks = set()
+        self._windows = {}
+        self._lock = threading.Lock()
+
+        for row in rows:
+            shifts = self.blocks.setdefault(row.day, [])
+            if row.start_time and row.end_time:
+                shifts.append(Shift(row.start_time, row.end_time, False))
+            if row.is_split_shift and row.split_start_time and row.split_end_time:
+                shifts.append(Shift(row.split_start_time, row.split_end_time, True))
+            if row.start_time == EARLY_SHIFT_START:
+                self._early_blocks.add(row.day)
+
+    def windows(self, block, early_in):
+        """
+        Sorted, non-overlapping [lo, hi) microsecond intervals for `block`,
+        built once per early-in allowance. `early_in=None` means the lookback
+        rule.
+        """
+        key = (block, early_in)
+        compiled = self._windows.get(key)
+        if compiled is None:
+            with self._lock:
+                compiled = self._windows.get(key)
+                if compiled is None:
+                    compiled = self._compile(self.blocks.get(block, []), early_in, block in self._early_blocks)
+                    self._windows[key] = compiled
+        return compiled
+
+    def lookup(self, block, at, early_in):
+        """Shift whose window holds time `at`, or None."""
+        starts, windows = self.windows(block, early_in)
+        i = bisect_right(starts, _micros(at)) - 1
+        if i >= 0 and _micros(at) < windows[i][1]:
+            return windows[i][2]
+        return None
+
+    @staticmethod
+    def _compile(shifts, early_in, has_early_shift):
+        placed = []
+
+        for shift in shifts:
+            if early_in is None:
+                allowance = LOOKBACK_MINS
+            elif not shift.is_split and has_early_shift:
+                allowance = early_in + EARLY_SHIFT_BONUS_MINS
+            else:
+                allowance = early_in
+
+            # The end is inclusive, as in the old `<= end_time` checks. A window
+            # reaching back past midnight starts at midnight (the old checks
+            # wrapped to the previous evening and never matched)
+            pieces = [(max(_micros(shift.start) - allowance * _MINUTE, 0), _micros(shift.end) + 1)]
+
+            # Earlier shifts win where windows overlap, as the old loops did
+            for lo, hi, _ in placed:
+                clipped = []
+                for a, b in pieces:
+                    if b <= lo or a >= hi:
+                        clipped.append((a, b))
+                        continue
+                    if a < lo:
+                        clipped.append((a, lo))
+                    if b > hi:
+                        clipped.append((hi, b))
+                pieces = clipped
+
+            placed.extend((a, b, shift) for a, b in pieces if a < b)
+
+        placed.sort(key=lambda w: w[0])
+        return [w[0] for w in placed], placed
+
+
+class ScheduleResolver:
+    """
+    Answers "which shift does this time fall in" for clock-in, clock-out and
+    status without querying Schedule on every clock event.
+
+    Each user's rows are loaded once and compiled into sorted time-of-day
+    windows per block, so a lookup is a bisect. Callers that change schedules
+    must call invalidate(); the TTL covers changes made by other processes.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._users = {}
+        # Bumped on invalidation so a compile racing with it is not cached
+        self._generation = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('SCHEDULE_CACHE_TTL', self.ttl)
+        app.extensions['schedule_resolver'] = self
+
+    @staticmethod
+    def block_for(day):
+        """Schedule block ('mw', 'tth', 'fri', 'sat') for a date, None on Sundays."""
+        return DAY_BLOCKS.get(day.weekday())
+
+    def has_schedule(self, user_id, block):
+        return block in self._user(user_id).blocks
+
+    def clock_in_shift(self, user_id, block, at, early_in_mins):
+        """Shift a clock-in at time `at` counts towards, honouring early-in rules."""
+        return self._lookup(user_id, block, at, early_in_mins or 0)
+
+    def shift_for(self, user_id, block, at):
+        """Shift an existing clock-in at time `at` belongs to (1 hour lookback)."""
+        return self._lookup(user_id, block, at, None)
+
+    def invalidate(self, user_id=None):
+        """Drop one user's compiled schedule, or everyone's when no id is given."""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+    def preload(self):
+        """Compile every active GIA's schedule with one query; returns the number of users."""
+        generation = self._generation
+        rows = defaultdict(list)
+        for user_id, schedule in db.session.execute(
+            db.select(User.user_id, Schedule)
+            .outerjoin(Schedule, Schedule.user_id == User.user_id)
+            .where(User.role == 'gia', User.status == 'active')
+        ):
+            user_rows = rows[user_id]  # users without a schedule get an empty entry too
+            if schedule is not None:
+                user_rows.append(schedule)
+
+        expires_at = time.monotonic() + self.ttl
+        compiled = {user_id: _UserSchedule(user_rows, expires_at) for user_id, user_rows in rows.items()}
+        with self._lock:
+            if generation == self._generation:
+                self._users.update(compiled)
+        return len(compiled)
+
+    def _lookup(self, user_id, block, at, early_in):
+        if not block:
+            return None
+        return self._user(user_id).lookup(block, at, early_in)
+
+    def _user(self, user_id):
+        compiled = self._users.get(user_id)
+        if compiled is not None and time.monotonic() < compiled.expires_at:
+            return compiled
+
+        generation = self._generation
+        rows = Schedule.query.filter_by(user_id=user_id).all()
+        compiled = _UserSchedule(rows, time.monotonic() + self.ttl)
+        with self._lock:
+            if generation == self._generation:
+                self._users[user_id] = compiled
+        return compiled
+
+
+schedule_resolver = ScheduleResolver()
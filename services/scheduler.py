@@ -0,0 +1,185 @@
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models.models import db, JobLock, JobRun
+from services.lazy_import import lazy_import
+
+# Imported when the first request starts the scheduler, not at start-up
+apscheduler = lazy_import('apscheduler.schedulers.background')
+
+logger = logging.getLogger(__name__)
+
+Job = namedtuple('Job', ['id', 'func', 'interval', 'description'])
+
+
+class JobScheduler:
+    """
+    Runs registered housekeeping jobs on fixed intervals, off the request path.
+
+    Every process that serves requests starts its own scheduler on its first
+    request, so each run first takes the job's lease in job_locks. The lease
+    covers the run (at most `lock_lease` seconds, in case the process dies)
+    and is then held until shortly before the job's next slot, so a job runs
+    about once per interval however many processes there are. Every run is
+    recorded in job_runs with its duration and result; runs older than
+    `history_days` are deleted as new ones are recorded.
+    """
+
+    def __init__(self, enabled=True, lock_lease=600, history_days=30):
+        self.enabled = enabled
+        self.lock_lease = lock_lease
+        self.history_days = history_days
+        self.jobs = {}
+        self.app = None
+
+        self._scheduler = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('SCHEDULER_ENABLED', self.enabled)
+        self.lock_lease = app.config.get('SCHEDULER_LOCK_LEASE_SECS', self.lock_lease)
+        self.history_days = app.config.get('SCHEDULER_HISTORY_DAYS', self.history_days)
+        app.extensions['job_scheduler'] = self
+        if self.enabled:
+            app.before_request(self._ensure_started)
+        atexit.register(self.shutdown)
+
+    def job(self, job_id, description='', **interval):
+        """Register the decorated function to run every `interval` (timedelta arguments)."""
+        def register(func):
+            self.jobs[job_id] = Job(job_id, func, timedelta(**interval), description)
+            return func
+        return register
+
+    @property
+    def owner(self):
+        return f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+    def run(self, job_id):
+        """
+        Run a job now unless another process holds its lease. Returns the
+        recorded JobRun, or None when the job was skipped.
+        """
+        job = self.jobs[job_id]
+        with self.app.app_context():
+            started = datetime.now()
+            if not self._acquire(job, started):
+                return None
+
+            clock = time.perf_counter()
+            status, result, error = 'ok', None, None
+            try:
+                result = job.func()
+            except Exception as e:
+                db.session.rollback()
+                status, error = 'error', f"{type(e).__name__}: {e}"
+                logger.exception("Scheduled job %s failed", job_id)
+
+            run = JobRun(
+                job_id=job_id,
+                owner=self.owner,
+                started_at=started,
+                duration_ms=round((time.perf_counter() - clock) * 1000),
+                status=status,
+                result=None if result is None else str(result)[:255],
+                error=error
+            )
+            self._finish(job, run)
+            return run
+
+    def history(self, job_id=None, limit=50):
+        """Latest recorded runs, newest first."""
+        stmt = db.select(JobRun).order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(limit)
+        if job_id is not None:
+            stmt = stmt.where(JobRun.job_id == job_id)
+        return db.session.scalars(stmt).all()
+
+    def status(self):
+        """Every registered job with its interval, lease and next run in this process."""
+        leases = {lock.job_id: lock for lock in db.session.scalars(db.select(JobLock))}
+        jobs = []
+        for job in self.jobs.values():
+            scheduled = self._scheduler.get_job(job.id) if self._scheduler else None
+            lease = leases.get(job.id)
+            jobs.append({
+                'id': job.id,
+                'description': job.description,
+                'interval_seconds': int(job.interval.total_seconds()),
+                'next_run': scheduled.next_run_time.strftime("%Y-%m-%d %H:%M:%S") if scheduled and scheduled.next_run_time else None,
+                'locked_until': lease.locked_until.strftime("%Y-%m-%d %H:%M:%S") if lease else None,
+                'lock_owner': lease.owner if lease else None
+            })
+        return jobs
+
+    def shutdown(self):
+        if self._scheduler is not None and self._pid == os.getpid():
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+
+    def _ensure_started(self):
+        # Like the audit sink: threads do not survive fork(), so each worker
+        # process starts its own scheduler
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            scheduler = apscheduler.BackgroundScheduler(daemon=True, job_defaults={'coalesce': True, 'max_instances': 1})
+            for job in self.jobs.values():
+                scheduler.add_job(
+                    self.run, 'interval', args=[job.id], id=job.id,
+                    seconds=job.interval.total_seconds(), misfire_grace_time=None
+                )
+            scheduler.start()
+            self._scheduler = scheduler
+            self._pid = os.getpid()
+
+    def _acquire(self, job, now):
+        until = now + timedelta(seconds=self.lock_lease)
+        with db.engine.begin() as conn:
+            taken = conn.execute(
+                db.update(JobLock)
+                .where(JobLock.job_id == job.id, JobLock.locked_until <= now)
+                .values(owner=self.owner, locked_until=until)
+            ).rowcount
+            if taken:
+                return True
+            if conn.execute(db.select(JobLock.job_id).where(JobLock.job_id == job.id)).first():
+                return False
+
+        # First run anywhere; a concurrent first run loses on the primary key
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(db.insert(JobLock).values(job_id=job.id, owner=self.owner, locked_until=until))
+            return True
+        except IntegrityError:
+            return False
+
+    def _finish(self, job, run):
+        # Keep the lease until shortly before the next slot, so processes
+        # whose timers fire later in the same interval skip it
+        next_slot = max(run.started_at + job.interval * 0.9, datetime.now())
+        with db.engine.begin() as conn:
+            conn.execute(
+                db.update(JobLock)
+                .where(JobLock.job_id == job.id, JobLock.owner == self.owner)
+                .values(locked_until=next_slot)
+            )
+            conn.execute(db.insert(JobRun).values(
+                job_id=run.job_id, owner=run.owner, started_at=run.started_at,
+                duration_ms=run.duration_ms, status=run.status, result=run.result, error=run.error
+            ))
+            conn.execute(db.delete(JobRun).where(
+                JobRun.started_at < run.started_at - timedelta(days=self.history_days)
+            ))
+
+
+job_scheduler = JobScheduler()
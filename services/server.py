@@ -0,0 +1,205 @@
+import atexit
+import logging
+import os
+import signal
+import socket
+import time
+from sqlalchemy.pool import QueuePool
+from models.models import db
+from services.lazy_import import lazy_import
+from services.settings_cache import settings_cache
+from services.schedule_resolver import schedule_resolver
+from services.passwords import password_pool
+from services.live_feed import live_feed
+
+waitress = lazy_import('waitress')
+
+logger = logging.getLogger(__name__)
+
+# A worker that dies sooner than this after starting is restarted after a pause
+MIN_WORKER_UPTIME = 5
+
+
+class _Stop(Exception):
+    pass
+
+
+def _raise_stop(signum, frame):
+    raise _Stop()
+
+
+def warmup(app, caches=True, connections=True):
+    """
+    Do the first-request work before any request arrives: compile every
+    template, load the settings snapshot and every active GIA's schedule
+    (`caches`), open the pool's connections and start the password workers
+    (`connections`). Returns the milliseconds each step took.
+    """
+    timings = {}
+
+    def step(name, func):
+        start = time.perf_counter()
+        func()
+        timings[name] = round((time.perf_counter() - start) * 1000)
+
+    with app.app_context():
+        if caches:
+            step('templates', lambda: [app.jinja_env.get_template(name)
+                                       for name in app.jinja_env.list_templates(extensions=['html'])])
+            step('settings', settings_cache.refresh)
+            step('schedules', schedule_resolver.preload)
+            db.session.remove()
+        if connections:
+            step('db_pool', lambda: prime_pool(db.engine))
+            step('password_pool', password_pool.warm)
+
+    logger.info("Warmup done: %s", ", ".join(f"{name} {ms} ms" for name, ms in timings.items()))
+    return timings
+
+
+def prime_pool(engine):
+    """Open the pool's `pool_size` connections up front, each checked with a round trip."""
+    size = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+    held = []
+    try:
+        for _ in range(size):
+            conn = engine.connect()
+            held.append(conn)
+            conn.exec_driver_sql('SELECT 1')
+    finally:
+        for conn in held:
+            conn.close()
+
+
+def serve(app, host='0.0.0.0', port=5001, workers=1, threads=8, connection_limit=100,
+          channel_timeout=120, backlog=1024, warm=True):
+    """
+    Serve `app` with waitress until SIGTERM or SIGINT.
+
+    With `workers` above 1 (Linux and other systems with fork()), the
+    socket is bound once and that many forked processes accept from it,
+    each with its own `threads`, connection pool and background threads.
+    Templates, settings and schedules are loaded before the fork so the
+    workers share them; each worker opens its own connections afterwards.
+    A worker that exits unexpectedly is replaced. The live feed hub is
+    per-process, so it is turned off and the daily-logs page polls instead.
+    """
+    options = dict(threads=threads, connection_limit=connection_limit,
+                   channel_timeout=channel_timeout, backlog=backlog)
+
+    if workers <= 1:
+        if warm:
+            warmup(app)
+        server = waitress.create_server(app, host=host, port=port, **options)
+        logger.info("Serving on http://%s:%s with %d threads", host, port, threads)
+        _run(server)
+        return
+
+    if not hasattr(os, 'fork'):
+        raise RuntimeError("Pre-fork mode needs os.fork(); run with one worker on this platform.")
+
+    sock = socket.create_server((host, port), backlog=backlog)
+    # A change published in one worker would never reach streams held by another
+    live_feed.enabled = False
+    if warm:
+        warmup(app, connections=False)
+    with app.app_context():
+        db.engine.dispose()  # no connection may be shared across the fork
+
+    logger.info("Serving on http://%s:%s with %d workers x %d threads", host, port, workers, threads)
+    _Supervisor(app, sock, workers, options, warm).run()
+
+
+def _run(server):
+    # waitress stops its loop on SystemExit, then gives running requests up
+    # to 5 seconds; returning normally lets atexit drain the audit sink
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        server.run()
+    finally:
+        server.close()
+
+
+class _Supervisor:
+    """Forks the workers, replaces any that die and stops them all on SIGTERM/SIGINT."""
+
+    def __init__(self, app, sock, workers, options, warm, stop_timeout=30):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.options = options
+        self.warm = warm
+        self.stop_timeout = stop_timeout
+        self.children = {}  # pid -> start time
+
+    def run(self):
+        signal.signal(signal.SIGTERM, _raise_stop)
+        signal.signal(signal.SIGINT, _raise_stop)
+        try:
+            for _ in range(self.workers):
+                self._spawn()
+            while True:
+                pid, status = os.wait()
+                started = self.children.pop(pid, None)
+                if started is None:
+                    continue
+                logger.warning("Worker %d exited with %d, starting another", pid, os.waitstatus_to_exitcode(status))
+                if time.monotonic() - started < MIN_WORKER_UPTIME:
+                    time.sleep(1)
+                self._spawn()
+        except _Stop:
+            self._stop()
+        finally:
+            self.sock.close()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return
+
+        # Worker: never return into the supervisor's frames
+        code = 0
+        try:
+            self._work()
+        except BaseException:
+            logger.exception("Worker %d failed", os.getpid())
+            code = 1
+        finally:
+            atexit._run_exitfuncs()  # audit sink drain, pool shutdown
+            os._exit(code)
+
+    def _work(self):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        with self.app.app_context():
+            # Forget the parent's pool without closing its sockets
+            db.engine.dispose(close=False)
+        if self.warm:
+            warmup(self.app, caches=False)
+        server = waitress.create_server(self.app, sockets=[self.sock], **self.options)
+        _run(server)
+
+    def _stop(self):
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for pid in self.children:
+            os.kill(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.stop_timeout
+        while self.children and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                self.children.pop(pid, None)
+            else:
+                time.sleep(0.1)
+
+        for pid in self.children:
+            logger.warning("Worker %d did not stop in %ds, killing it", pid, self.stop_timeout)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.children.clear()
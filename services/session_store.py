@@ -0,0 +1,264 @@
+import os
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import session as current_session
+from flask.json.tag import TaggedJSONSerializer
+from flask_login import user_logged_in
+from flask.sessions import SecureCookieSessionInterface, SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from models.models import db, SessionRecord
+
+BACKENDS = ('cookie', 'database', 'memory', 'filesystem')
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session whose data lives on the server; the cookie only carries `sid`."""
+
+    def __init__(self, initial=None, sid=None, expiry=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        # When the stored copy expires, None for a session not stored yet
+        self.expiry = expiry
+        self.modified = False
+
+
+class ServerSideSessionInterface(SessionInterface, ABC):
+    """
+    Shared cookie handling for the server-side stores.
+
+    A session that was only read is written back (and its cookie re-sent) at
+    most once every `touch_interval` seconds to slide its expiry, instead of
+    on every request.
+    """
+
+    def __init__(self, touch_interval=60):
+        self.touch_interval = touch_interval
+        self.serializer = TaggedJSONSerializer()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            stored = self.load(sid)
+            if stored is not None:
+                data, expiry = stored
+                return ServerSession(data, sid, expiry)
+        return ServerSession(sid=secrets.token_urlsafe(32))
+
+    def regenerate(self, session):
+        """Move `session` to a new sid and drop the stored copy under the old one."""
+        if session.expiry is not None:
+            self.delete(session.sid)
+            session.expiry = None
+        session.sid = secrets.token_urlsafe(32)
+        session.modified = True
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session:
+            if session.modified:
+                if session.expiry is not None:
+                    self.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+                response.vary.add("Cookie")
+            return
+
+        now = datetime.now()
+        lifetime = app.permanent_session_lifetime
+        recently_touched = (
+            session.expiry is not None
+            and session.expiry - now > lifetime - timedelta(seconds=self.touch_interval)
+        )
+        if not session.modified and recently_touched:
+            return
+
+        self.store(session.sid, dict(session), now + lifetime)
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        response.vary.add("Cookie")
+
+    @abstractmethod
+    def load(self, sid):
+        """(data, expiry) for a live session, None if unknown or expired."""
+
+    @abstractmethod
+    def store(self, sid, data, expiry):
+        """Create or replace the session stored under `sid`."""
+
+    @abstractmethod
+    def delete(self, sid):
+        """Remove the session stored under `sid`, if any."""
+
+
+class DatabaseSessionInterface(ServerSideSessionInterface):
+    """
+    Sessions in the `sessions` table, shared by every process and node.
+
+    Expired rows are deleted `purge_batch_size` at a time through the expiry
+    index, at most once per `purge_interval` seconds per process, so no
+    single request pays for a large cleanup. With `purge_interval` None
+    requests never purge; the purge-sessions job does it instead.
+    """
+
+    def __init__(self, touch_interval=60, purge_interval=300, purge_batch_size=500):
+        super().__init__(touch_interval)
+        self.purge_interval = purge_interval
+        self.purge_batch_size = purge_batch_size
+        self._next_purge = 0.0
+        self._purge_lock = threading.Lock()
+
+    def load(self, sid):
+        # Own connection, so session I/O never joins the request's transaction
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                db.select(SessionRecord.data, SessionRecord.expiry).where(
+                    SessionRecord.session_id == sid,
+                    SessionRecord.expiry > datetime.now()
+                )
+            ).first()
+        if row is None:
+            return None
+        return self.serializer.loads(row.data.decode()), row.expiry
+
+    def store(self, sid, data, expiry):
+        values = {'data': self.serializer.dumps(data).encode(), 'expiry': expiry}
+        with db.engine.begin() as conn:
+            updated = conn.execute(
+                db.update(SessionRecord).where(SessionRecord.session_id == sid).values(values)
+            )
+            if updated.rowcount == 0:
+                conn.execute(db.insert(SessionRecord).values(session_id=sid, **values))
+        self._maybe_purge()
+
+    def delete(self, sid):
+        with db.engine.begin() as conn:
+            conn.execute(db.delete(SessionRecord).where(SessionRecord.session_id == sid))
+
+    def purge_expired(self, max_batches=None):
+        """Delete expired sessions in batches; returns how many were removed."""
+        removed = batches = 0
+        while max_batches is None or batches < max_batches:
+            with db.engine.begin() as conn:
+                expired = conn.execute(
+                    db.select(SessionRecord.session_id)
+                    .where(SessionRecord.expiry <= datetime.now())
+                    .limit(self.purge_batch_size)
+                ).scalars().all()
+                if expired:
+                    conn.execute(db.delete(SessionRecord).where(SessionRecord.session_id.in_(expired)))
+            removed += len(expired)
+            batches += 1
+            if len(expired) < self.purge_batch_size:
+                break
+        return removed
+
+    def _maybe_purge(self):
+        if self.purge_interval is None:
+            return
+        if time.monotonic() < self._next_purge or not self._purge_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_purge = time.monotonic() + self.purge_interval
+            self.purge_expired(max_batches=1)
+        finally:
+            self._purge_lock.release()
+
+
+class MemorySessionInterface(ServerSideSessionInterface):
+    """
+    Sessions in a bounded in-process LRU. Only for single-process
+    deployments: other processes cannot see them and a restart logs
+    everyone out.
+    """
+
+    def __init__(self, touch_interval=60, max_entries=10000):
+        super().__init__(touch_interval)
+        self.max_entries = max_entries
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        with self._lock:
+            stored = self._sessions.get(sid)
+            if stored is None:
+                return None
+            if stored[1] <= datetime.now():
+                del self._sessions[sid]
+                return None
+            self._sessions.move_to_end(sid)
+            return dict(stored[0]), stored[1]
+
+    def store(self, sid, data, expiry):
+        with self._lock:
+            self._sessions[sid] = (data, expiry)
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+
+def _regenerate_on_login(app, **extra):
+    # A sid planted in the browser before login must not become a logged-in one
+    app.session_interface.regenerate(current_session)
+
+
+def init_session_store(app):
+    """Install the session backend named by SESSION_BACKEND."""
+    backend = app.config.get('SESSION_BACKEND', 'filesystem')
+    touch_interval = app.config.get('SESSION_TOUCH_INTERVAL_SECS', 60)
+
+    if backend == 'cookie':
+        # Signed with SECRET_KEY; nothing stored server-side
+        interface = SecureCookieSessionInterface()
+    elif backend == 'database':
+        interface = DatabaseSessionInterface(
+            touch_interval,
+            # The scheduler's purge-sessions job takes over from requests
+            None if app.config.get('SCHEDULER_ENABLED') else app.config.get('SESSION_PURGE_INTERVAL_SECS', 300),
+            app.config.get('SESSION_PURGE_BATCH_SIZE', 500),
+        )
+    elif backend == 'memory':
+        interface = MemorySessionInterface(
+            touch_interval,
+            app.config.get('SESSION_MEMORY_MAX_ENTRIES', 10000),
+        )
+    elif backend == 'filesystem':
+        # The previous Flask-Session setup, kept for existing deployments
+        from flask_session import Session
+        app.config['SESSION_TYPE'] = 'filesystem'
+        app.config.setdefault('SESSION_FILE_DIR', "./flask_session")
+        os.makedirs(app.config['SESSION_FILE_DIR'], exist_ok=True)
+        Session(app)
+        interface = app.session_interface
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+    app.session_interface = interface
+    app.extensions['session_store'] = interface
+    # Server-side stores (Flask-Session's included) key the session by sid
+    if hasattr(interface, 'regenerate'):
+        user_logged_in.connect(_regenerate_on_login, app)
+    return interface
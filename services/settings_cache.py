@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import namedtuple
+from models.models import GlobalSettings
+
+# Read-only copy of the global_settings row. Built from the table columns so
+# new settings show up here without touching this module.
+SettingsSnapshot = namedtuple(
+    'SettingsSnapshot',
+    [column.name for column in GlobalSettings.__table__.columns]
+)
+
+
+def snapshot_of(settings):
+    """Copy a GlobalSettings row into an immutable SettingsSnapshot."""
+    if settings is None:
+        return None
+    return SettingsSnapshot(*(getattr(settings, field) for field in SettingsSnapshot._fields))
+
+
+class SettingsCache:
+    """
+    Process-wide cache of the GlobalSettings row.
+
+    Readers get an immutable snapshot, so it can be shared between waitress
+    threads without copying. Writers call refresh() after committing so the
+    change is visible at once in this process; the TTL bounds how long other
+    processes keep serving the old values.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._expires_at = 0.0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('SETTINGS_CACHE_TTL', self.ttl)
+        app.extensions['settings_cache'] = self
+
+    def get(self):
+        if time.monotonic() < self._expires_at:
+            return self._snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            if time.monotonic() < self._expires_at:
+                return self._snapshot
+            return self._load(GlobalSettings.query.first())
+
+    def refresh(self, settings=None):
+        """Reload the snapshot, from `settings` if given or from the database."""
+        with self._lock:
+            if settings is None:
+                settings = GlobalSettings.query.first()
+            return self._load(settings)
+
+    def invalidate(self):
+        with self._lock:
+            self._expires_at = 0.0
+
+    def _load(self, settings):
+        self._snapshot = snapshot_of(settings)
+        self._expires_at = time.monotonic() + self.ttl
+        return self._snapshot
+
+
+settings_cache = SettingsCache()
+
+
+def cached_settings():
+    """Current GlobalSettings snapshot, or None when no settings row exists."""
+    return settings_cache.get()
@@ -5,15 +5,20 @@ function initAuditLogs() {
     addInteractiveEffects();
 }
 
-let currentPage = 1;
 const perPage = 8;
+let pageNumber = 1;
+let totalEntries = null;
 
-function loadLogs(page = 1) {
-    currentPage = page;
+// cursor: '' for the newest page, 'before=<id>' for older, 'after=<id>' for newer
+function loadLogs(cursor = '', page = 1) {
+    pageNumber = page;
     const fromDate = document.getElementById("fromDate").value;
     const toDate = document.getElementById("toDate").value;
 
-    fetch(`/api/get-logs?from=${fromDate}&to=${toDate}&page=${page}&per_page=${perPage}`)
+    // The total is only needed once per date range; the server caches it too
+    const wantTotal = cursor === '' ? '&total=1' : '';
+
+    fetch(`/api/get-logs?from=${fromDate}&to=${toDate}&per_page=${perPage}&${filterParams()}&${cursor}${wantTotal}`)
         .then(res => {
             if (!res.ok) throw new Error(`Server responded with ${res.status}`);
             return res.json();
@@ -50,21 +55,18 @@ function loadLogs(page = 1) {
                 tbody.appendChild(tr);
             });
 
-            renderPagination(data.page, data.pages, data.total);
+            if (data.total !== null) totalEntries = data.total;
+            renderPagination(data.prev_cursor, data.next_cursor, data.logs.length);
         });
 }
 
 // Setup filter functionality
 function setupFilters() {
-    const fromDate = document.getElementById('fromDate');
-    const toDate = document.getElementById('toDate');
     const userFilter = document.getElementById('userFilter');
     const actionFilter = document.getElementById('actionFilter');
     const resetButton = document.getElementById('resetFilters');
     
-    // Auto-filter when any filter changes
-    fromDate.addEventListener('change', applyFilters);
-    toDate.addEventListener('change', applyFilters);
+    // Auto-filter when any filter changes (dates reload on their own, below)
     userFilter.addEventListener('change', applyFilters);
     actionFilter.addEventListener('change', applyFilters);
     
@@ -82,81 +84,36 @@ function setupFilters() {
     });
 }
 
-// Apply filters to the audit logs
-function applyFilters() {
-    const fromDate = document.getElementById('fromDate').value;
-    const toDate = document.getElementById('toDate').value;
-    const userFilter = document.getElementById('userFilter').value;
-    const actionFilter = document.getElementById('actionFilter').value;
-    const searchTerm = document.getElementById('searchLogs').value.toLowerCase();
-    
-    const rows = document.querySelectorAll('#auditLogsTableBody tr');
-    let visibleCount = 0;
-    
-    rows.forEach(row => {
-        const timestamp = row.querySelector('.timestamp .fw-medium').textContent;
-        const user = row.querySelector('.user-info .fw-medium').textContent.toLowerCase();
-        const userRole = row.querySelector('.user-info .text-muted').textContent.toLowerCase();
-        const action = row.querySelector('.action-badge').textContent.toLowerCase();
-        // const affectedData = row.querySelector('.affected-data .fw-medium').textContent.toLowerCase();
-        const details = row.querySelector('.details-text').textContent.toLowerCase();
-        
-        // Date filtering (simplified for demo)
-        let matchesDate = true;
-        if (fromDate || toDate) {
-            // In real implementation, would parse and compare dates
-            matchesDate = true;
-        }
-        
-        // User filtering
-        const matchesUser = !userFilter || 
-            user.includes(userFilter.toLowerCase()) || 
-            userRole.includes(userFilter.toLowerCase());
-        
-        // Action filtering
-        const matchesAction = !actionFilter || action === actionFilter;
-        
-        // Search filtering
-        const matchesSearch = !searchTerm || 
-            user.includes(searchTerm) ||
-            userRole.includes(searchTerm) ||
-            action.includes(searchTerm) ||
-            // affectedData.includes(searchTerm) ||
-            details.includes(searchTerm);
-        
-        if (matchesDate && matchesUser && matchesAction && matchesSearch) {
-            row.style.display = '';
-            visibleCount++;
-        } else {
-            row.style.display = 'none';
-        }
+// Filters are applied by the server, so paging and totals cover every match
+function filterParams() {
+    const params = new URLSearchParams();
+    const filters = {
+        role: document.getElementById('userFilter').value,
+        action: document.getElementById('actionFilter').value,
+        q: document.getElementById('searchLogs').value.trim()
+    };
+    Object.entries(filters).forEach(([key, value]) => {
+        if (value) params.set(key, value);
     });
-    
-    // Update showing info
-    const showingInfo = document.querySelector('.showing-info');
-    showingInfo.textContent = `Showing 1-${visibleCount} of 1,247 audit log entries`;
-    
-    console.log(`Applied filters - showing ${visibleCount} entries`);
+    return params.toString();
+}
+
+// Apply filters to the audit logs, starting again from the newest page
+function applyFilters() {
+    loadLogs();
 }
 
 // Reset all filters
 function resetFilters() {
-    document.getElementById('fromDate').value = '2025-01-01';
-    document.getElementById('toDate').value = '2025-01-15';
+    const fromDate = document.getElementById('fromDate');
+    const toDate = document.getElementById('toDate');
+    fromDate.value = fromDate.defaultValue;
+    toDate.value = toDate.defaultValue;
     document.getElementById('userFilter').value = '';
     document.getElementById('actionFilter').value = '';
     document.getElementById('searchLogs').value = '';
     
-    // Show all rows
-    const rows = document.querySelectorAll('#auditLogsTableBody tr');
-    rows.forEach(row => {
-        row.style.display = '';
-    });
-    
-    // Reset showing info
-    const showingInfo = document.querySelector('.showing-info');
-    showingInfo.textContent = 'Showing 1-8 of 1,247 audit log entries';
-    
+    loadLogs();
     console.log('Filters reset');
 }
 
@@ -164,11 +121,13 @@ function resetFilters() {
 function setupSearch() {
     const searchInput = document.getElementById('searchLogs');
     
+    let searchTimer = null;
     searchInput.addEventListener('input', function() {
         const searchTerm = this.value.trim().toLowerCase();
         
-        // Apply filters automatically
-        applyFilters();
+        // Apply filters once typing pauses, not on every keystroke
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(applyFilters, 300);
         
         // Visual feedback
         if (searchTerm.length > 0) {
@@ -182,6 +141,7 @@ function setupSearch() {
     // Search on Enter key
     searchInput.addEventListener('keypress', function(e) {
         if (e.key === 'Enter') {
+            clearTimeout(searchTimer);
             applyFilters();
         }
     });
@@ -322,43 +282,40 @@ toDate = document.getElementById("toDate");
     }
 });
 
-function renderPagination(current, totalPages, totalItems) {
+function renderPagination(prevCursor, nextCursor, count) {
     const container = document.querySelector(".pagination");
     const showingInfo = document.querySelector(".showing-info");
 
-    showingInfo.textContent = `Showing ${((current-1)*perPage+1)}-${Math.min(current*perPage, totalItems)} of ${totalItems} audit log entries`;
+    const first = (pageNumber - 1) * perPage + 1;
+    const of = totalEntries !== null ? ` of ${totalEntries}` : '';
+    showingInfo.textContent = count
+        ? `Showing ${first}-${first + count - 1}${of} audit log entries`
+        : 'No audit log entries';
 
     container.innerHTML = '';
 
-    // Previous
+    // Previous (newer entries)
     const prevLi = document.createElement('li');
-    prevLi.className = `page-item ${current === 1 ? 'disabled' : ''}`;
+    prevLi.className = `page-item ${prevCursor === null ? 'disabled' : ''}`;
     prevLi.innerHTML = `<a class="page-link" href="#">Previous</a>`;
     prevLi.addEventListener('click', e => {
         e.preventDefault();
-        if (current > 1) loadLogs(current - 1);
+        if (prevCursor !== null) loadLogs(`after=${prevCursor}`, pageNumber - 1);
     });
     container.appendChild(prevLi);
 
-    // Page numbers (you can limit the number of visible pages if needed)
-    for (let i = 1; i <= totalPages; i++) {
-        const li = document.createElement('li');
-        li.className = `page-item ${i === current ? 'active' : ''}`;
-        li.innerHTML = `<a class="page-link" href="#">${i}</a>`;
-        li.addEventListener('click', e => {
-            e.preventDefault();
-            loadLogs(i);
-        });
-        container.appendChild(li);
-    }
+    const currentLi = document.createElement('li');
+    currentLi.className = 'page-item active';
+    currentLi.innerHTML = `<span class="page-link">${pageNumber}</span>`;
+    container.appendChild(currentLi);
 
-    // Next
+    // Next (older entries)
     const nextLi = document.createElement('li');
-    nextLi.className = `page-item ${current === totalPages ? 'disabled' : ''}`;
+    nextLi.className = `page-item ${nextCursor === null ? 'disabled' : ''}`;
     nextLi.innerHTML = `<a class="page-link" href="#">Next</a>`;
     nextLi.addEventListener('click', e => {
         e.preventDefault();
-        if (current < totalPages) loadLogs(current + 1);
+        if (nextCursor !== null) loadLogs(`before=${nextCursor}`, pageNumber + 1);
     });
     container.appendChild(nextLi);
 }
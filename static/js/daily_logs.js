@@ -13,6 +13,7 @@ function loadLogs() {
     fetch(`/api/get-daily-logs?today=${dateFilter}`)
         .then(res => {
             if (!res.ok) showAlert('error', res.status);
+            syncCursor = res.headers.get('X-Sync-Cursor');
             return res.json();
         })
         .then(logs => {
@@ -20,59 +21,141 @@ function loadLogs() {
             tbody.innerHTML = '';
 
             logs.forEach(record => {
-                const tr = document.createElement("tr");
-
-                tr.innerHTML = `
-                        <td class="ps-4">
-                            <div class="d-flex align-items-center">
-                                <div class="user-avatar me-3">${record.name_initial}</div>
-                                <div>
-                                    <div class="user-name">${record.full_name}</div>
-                                    <div class="user-email">${record.user_id}</div>
-                                </div>
-                            </div>
-                        </td>
-                        <!-- <td>
-                            <span class="department-badge engineering">Engineering</span>
-                        </td> -->
-                        <td>
-                            <div class="time-log">
-                                <div class="time-display text-center">${record.clock_in}</div>
-                                <!-- <small class="text-muted">On time</small>-->
-                            </div>
-                        </td>
-                        <td>
-                            <div class="time-log">
-                                <div class="time-display text-center">${record.clock_out}</div>
-                                <!-- <small class="text-muted">Regular time</small>-->
-                            </div>
-                        </td>
-                        <td>
-                            <div class="total-hours">
-                                <div class="hours-display text-center">${record.total_hours} hrs</div>
-                                <!-- <small class="text-success">Complete</small> -->
-                            </div>
-                        </td>
-                        <!-- <td>
-                            <span class="status-badge completed">Completed</span>
-                        </td> -->
-                        <td>
-                            <div class="action-buttons d-flex justify-content-center">
-                                <button class="btn btn-sm btn-outline-primary" data-log-id="${record.log_id}" title="View Details" hidden>
-                                    <i class="fas fa-eye"></i>
-                                </button>
-                                <button class="btn btn-sm btn-outline-warning" data-log-id="${record.log_id}" title="Edit Log">
-                                    <i class="fas fa-edit"></i>
-                                </button>
-                            </div>
-                        </td>
-                    `;
-
-                tbody.appendChild(tr);
+                tbody.appendChild(buildLogRow(record));
             })
+            updateLastUpdated();
         })
 }
 
+// Delta sync for the polling fallback: fetch only rows changed since the
+// last cursor. Full snapshots are revalidated by the browser with their
+// ETag, so reloading an unchanged day costs a 304.
+let syncCursor = null;
+
+function syncLogs() {
+    if (!syncCursor) return loadLogs();
+
+    dateFilter = document.getElementById("dateFilter").value
+
+    fetch(`/api/get-daily-logs?today=${dateFilter}&since=${encodeURIComponent(syncCursor)}`)
+        .then(res => {
+            if (!res.ok) throw new Error(res.status);
+            const total = Number(res.headers.get('X-Total-Count'));
+            syncCursor = res.headers.get('X-Sync-Cursor') || syncCursor;
+            return res.json().then(logs => ({ logs, total }));
+        })
+        .then(({ logs, total }) => {
+            logs.forEach(applyLogEvent);
+
+            // Rows were removed (or missed); start over from a full snapshot
+            if (document.querySelectorAll('#logsTableBody tr').length !== total) {
+                loadLogs();
+            }
+            updateLastUpdated();
+        })
+        .catch(() => loadLogs());
+}
+
+function buildLogRow(record) {
+    const tr = document.createElement("tr");
+    tr.dataset.logId = record.log_id;
+
+    tr.innerHTML = `
+        <td class="ps-4">
+            <div class="d-flex align-items-center">
+                <div class="user-avatar me-3">${record.name_initial}</div>
+                <div>
+                    <div class="user-name">${record.full_name}</div>
+                    <div class="user-email">${record.user_id}</div>
+                </div>
+            </div>
+        </td>
+        <!-- <td>
+            <span class="department-badge engineering">Engineering</span>
+        </td> -->
+        <td>
+            <div class="time-log">
+                <div class="time-display text-center">${record.clock_in}</div>
+                <!-- <small class="text-muted">On time</small>-->
+            </div>
+        </td>
+        <td>
+            <div class="time-log">
+                <div class="time-display text-center">${record.clock_out}</div>
+                <!-- <small class="text-muted">Regular time</small>-->
+            </div>
+        </td>
+        <td>
+            <div class="total-hours">
+                <div class="hours-display text-center">${record.total_hours} hrs</div>
+                <!-- <small class="text-success">Complete</small> -->
+            </div>
+        </td>
+        <!-- <td>
+            <span class="status-badge completed">Completed</span>
+        </td> -->
+        <td>
+            <div class="action-buttons d-flex justify-content-center">
+                <button class="btn btn-sm btn-outline-primary" data-log-id="${record.log_id}" title="View Details" hidden>
+                    <i class="fas fa-eye"></i>
+                </button>
+                <button class="btn btn-sm btn-outline-warning" data-log-id="${record.log_id}" title="Edit Log">
+                    <i class="fas fa-edit"></i>
+                </button>
+            </div>
+        </td>
+    `;
+
+    return tr;
+}
+
+// Apply one pushed record: replace its row, or add it at the top (newest first)
+function applyLogEvent(record) {
+    if (record.date !== document.getElementById("dateFilter").value) return;
+
+    const tbody = document.getElementById('logsTableBody');
+    const row = buildLogRow(record);
+    const existing = tbody.querySelector(`tr[data-log-id="${record.log_id}"]`);
+
+    if (existing) {
+        existing.replaceWith(row);
+    } else {
+        tbody.prepend(row);
+    }
+    filterLogs();
+    updateLastUpdated();
+}
+
+// Live feed: the table is loaded once and then only receives pushed changes.
+// The browser reconnects on its own (sending Last-Event-ID); if the stream
+// is refused outright, fall back to polling.
+let liveFeed = null;
+
+function connectLiveFeed(onUnavailable) {
+    liveFeed = new EventSource('/api/daily-logs/stream');
+
+    ['clock-in', 'clock-out', 'log-added', 'log-updated'].forEach(type => {
+        liveFeed.addEventListener(type, e => applyLogEvent(JSON.parse(e.data)));
+    });
+
+    // Missed too much to replay, reload the snapshot
+    liveFeed.addEventListener('reload', () => loadLogs());
+
+    liveFeed.onerror = () => {
+        if (liveFeed.readyState === EventSource.CLOSED) {
+            liveFeed = null;
+            onUnavailable();
+        }
+    };
+}
+
+function disconnectLiveFeed() {
+    if (liveFeed) {
+        liveFeed.close();
+        liveFeed = null;
+    }
+}
+
 const tbody = document.getElementById('logsTableBody');
 tbody.addEventListener('click', e => {
     const viewBtn = e.target.closest('.btn-outline-primary');
@@ -209,18 +292,26 @@ function setupAutoRefresh() {
     const refreshBtn = document.getElementById('refreshLogs');
     let refreshInterval;
 
-    function startAutoRefresh() {
-        if (autoRefreshToggle.checked) {
+    function startPolling() {
+        if (autoRefreshToggle.checked && !refreshInterval) {
             refreshInterval = setInterval(() => {
-                refreshLogs();
+                syncLogs();
                 filterLogs();
             }, 30000); // Refresh every 30 seconds
         }
     }
 
+    function startAutoRefresh() {
+        if (autoRefreshToggle.checked) {
+            connectLiveFeed(startPolling);
+        }
+    }
+
     function stopAutoRefresh() {
+        disconnectLiveFeed();
         if (refreshInterval) {
             clearInterval(refreshInterval);
+            refreshInterval = null;
         }
     }
 
@@ -333,19 +424,18 @@ function setupTableInteractions() {
         });
     });
 
-    // Export button
+    // Export button: the selected date's whole month, streamed as CSV
     const exportBtn = document.querySelector('.btn-outline-primary');
     if (exportBtn && exportBtn.textContent.includes('Export')) {
         exportBtn.addEventListener('click', function () {
-            this.innerHTML = '<i class="fas fa-spinner fa-spin me-1"></i>Exporting...';
-            this.disabled = true;
-
-            setTimeout(() => {
-                this.innerHTML = '<i class="fas fa-download me-1"></i>Export';
-                this.disabled = false;
-                showAlert('success', 'Logs exported successfuly');
-                console.log('Logs exported');
-            }, 2000);
+            const month = document.getElementById('dateFilter').value.slice(0, 7);
+
+            const link = document.createElement('a');
+            link.href = `/api/export-attendance?month=${encodeURIComponent(month)}`;
+            link.download = '';
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
         });
     }
 }
@@ -445,7 +535,8 @@ document.addEventListener('visibilitychange', function () {
         console.log('Page hidden - pausing auto-refresh');
     } else {
         console.log('Page visible - resuming auto-refresh');
-        if (autoRefreshToggle.checked) {
+        // The live feed keeps the table current; only the polling fallback needs a refresh
+        if (autoRefreshToggle.checked && !liveFeed) {
             refreshLogs();
         }
     }
@@ -88,6 +88,7 @@ function loadSettings() {
             document.getElementById('unitHeadName').value = settings.unit_head || 'Not Set';
             document.getElementById('defaultStartTime').value = settings.def_start || '';
             document.getElementById('defaultEndTime').value = settings.def_end || '';
+            document.getElementById('autoClockOutHours').value = settings.auto_clock_out_hours || '0';
             document.getElementById('enableStrictMode').checked = settings.strict;
             document.getElementById('strictModeEndDate').value = settings.strict_duration || '';
             // document.getElementById('allowEarlyIn').checked;
@@ -160,6 +161,7 @@ function saveSettings() {
             allowOvertime: document.getElementById('allowOvertime').checked,
             defaultStartTime: document.getElementById('defaultStartTime').value,
             defaultEndTime: document.getElementById('defaultEndTime').value,
+            autoClockOutHours: document.getElementById('autoClockOutHours').value,
             // gracePeriod: document.getElementById('gracePeriod').value,
             // breakDuration: document.getElementById('breakDuration').value
         };
@@ -182,6 +184,7 @@ function saveSettings() {
 
                     updateSummary();
                 } else {
+                    showAlert('error', data.error);
                     console.error('Error adding user:', data.error);
                 }
             });
@@ -346,6 +346,41 @@ document.getElementById('saveNewUser').addEventListener('click', function () {
         });
 });
 
+// Bulk import: CSV or JSON with userId, firstName, lastName, middleInitial, role
+document.getElementById('importUsersBtn').addEventListener('click', () => {
+    document.getElementById('importUsersFile').click();
+});
+
+document.getElementById('importUsersFile').addEventListener('change', function () {
+    const file = this.files[0];
+    if (!file) return;
+
+    const button = document.getElementById('importUsersBtn');
+    button.innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i>Importing...';
+    button.disabled = true;
+
+    const form = new FormData();
+    form.append('file', file);
+
+    fetch('/api/import-users', { method: 'POST', body: form })
+        .then(res => res.json())
+        .then(data => {
+            if (data.success) {
+                showAlert('success', `Imported ${data.created} users.`);
+                loadUsers();
+            } else {
+                const details = (data.errors || []).slice(0, 5).map(e => `row ${e.row}: ${e.error}`).join('; ');
+                showAlert('danger', `${data.error}${details ? ` (${details})` : ''}`);
+            }
+        })
+        .catch(err => console.error('Import failed:', err))
+        .finally(() => {
+            button.innerHTML = '<i class="fas fa-file-import me-2"></i>Import';
+            button.disabled = false;
+            this.value = '';
+        });
+});
+
 function setupPagination() {
     document.querySelectorAll('.pagination .page-link').forEach(link => {
         link.addEventListener('click', function (e) {
@@ -1,19 +1,106 @@
 from datetime import datetime, timedelta
-from models.models import db, Attendance, GlobalSettings
+from flask import current_app
+from models.models import db, Attendance, GlobalSettings, Logs
+from services.attendance_stats import shift_end_after, refresh_daily_rollups
+from services.audit import audit_sink
+from services.live_feed import live_feed
+from services.log_archive import log_archive
+from services.scheduler import job_scheduler
+from services.session_store import DatabaseSessionInterface
+from services.settings_cache import settings_cache, cached_settings
+
+# Jobs registered here run on job_scheduler, see services/scheduler.py
+
+@job_scheduler.job('expire-open-mode', "Turn strict mode back on when open mode expires", minutes=10)
+def expire_open_mode():
+    """Re-enable strict mode once the open-mode end date has passed."""
+    # Decide from the cached snapshot so the row is only touched on expiry
+    cached = cached_settings()
+    if not cached or cached.strict_duration is None:
+        return False
+
+    today = datetime.now().date()
+    if cached.enable_strict_schedule or today < cached.strict_duration:
+        return False
 
-def auto_clock_out():
     settings = GlobalSettings.query.first()
-    if not settings or not settings.auto_clock_out_hours:
-        return
+    expired = (
+        settings is not None and settings.strict_duration is not None
+        and not settings.enable_strict_schedule and today >= settings.strict_duration
+    )
+    if expired:
+        settings.enable_strict_schedule = True
+        settings.strict_duration = None
+
+        entry = Logs(
+            user_id="admin",
+            action="Update",
+            details=f"SYSTEM: Open mode expired on {today}, strict mode reactivated.",
+            timestamp=datetime.now(),
+        )
+        db.session.add(entry)
+        db.session.commit()
+
+    settings_cache.refresh(settings)
+    return expired
+
+@job_scheduler.job('auto-clock-out', "Close shifts left open past the auto clock-out limit", minutes=15)
+def auto_clock_out(now=None):
+    """
+    Close every shift left open longer than the auto_clock_out_hours
+    setting, ending it that many hours after its clock-in. One UPDATE covers
+    all of them, however many there are. Returns how many shifts were closed.
+    """
+    settings = GlobalSettings.get()
+    hours = settings.auto_clock_out_hours if settings else 0
+    if not hours:
+        return 0
+
+    now = now or datetime.now()
+    threshold = now - timedelta(hours=hours)
+    stale = [
+        Attendance.clock_in.isnot(None),
+        Attendance.clock_out.is_(None),
+        # date + clock_in before the threshold, as a range on the date index
+        db.or_(
+            Attendance.date < threshold.date(),
+            db.and_(Attendance.date == threshold.date(), Attendance.clock_in <= threshold.time())
+        )
+    ]
+
+    days = db.session.execute(
+        db.select(Attendance.user_id, Attendance.date).where(*stale).distinct()
+    ).all()
+    if not days:
+        return 0
 
-    threshold_time = datetime.now() - timedelta(hours=settings.auto_clock_out_hours)
+    closed = db.session.execute(
+        db.update(Attendance).where(*stale).values(clock_out=shift_end_after(hours)),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    refresh_daily_rollups(days)
+    db.session.commit()
 
-    active_attendance = Attendance.query.filter(Attendance.clock_out.is_(None)).all()
+    audit_sink.submit(
+        action="Clock Out",
+        details=f"Auto clock-out closed {closed} shift(s) left open for more than {hours} hours.",
+        user_id=None,
+        timestamp=now,
+        client_ip=None
+    )
+    # Open dashboards refetch the day instead of replaying each row
+    live_feed.publish('reload', {})
+    return closed
 
-    for record in active_attendance:
-        if record.clock_in < threshold_time:
-            record.clock_out = threshold_time
-            db.session.commit()
-            print(f"Auto Clocked-Out: User {record.user_id}")
+@job_scheduler.job('archive-logs', "Move system logs past the retention window to the archive", hours=24)
+def archive_logs():
+    """Archive logs older than LOG_RETENTION_MONTHS; returns rows moved."""
+    return log_archive.archive()
 
-# Run this as a scheduled task (Celery, APScheduler, or Cron)
+@job_scheduler.job('purge-sessions', "Delete expired rows from the sessions table", minutes=30)
+def purge_sessions():
+    """Delete expired database sessions; only the 'database' backend stores any."""
+    interface = current_app.session_interface
+    if not isinstance(interface, DatabaseSessionInterface):
+        return None
+    return interface.purge_expired()
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# The app reads its configuration at import time
+_workdir = tempfile.mkdtemp(prefix='tickr-tests-')
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{os.path.join(_workdir, 'test.db')}",
+    'SECRET_KEY': 'test',
+    'SESSION_BACKEND': 'cookie',
+    'AUDIT_ASYNC': 'false',
+    'SCHEDULER_ENABLED': 'false',
+    'PASSWORD_POOL_WORKERS': '0',
+    'METRICS_ENABLED': 'false',
+    'LOG_ARCHIVE_DIR': os.path.join(_workdir, 'archive'),
+})
+
+from app import app as flask_app  # noqa: E402
+from datetime import time  # noqa: E402
+from models.models import db, User, Schedule, GlobalSettings  # noqa: E402
+from services.settings_cache import settings_cache  # noqa: E402
+from services.schedule_resolver import schedule_resolver  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_workdir, ignore_errors=True)
+
+
+@pytest.fixture
+def app():
+    """A fresh schema with settings and an admin. No app context is left
+    pushed, so each request gets its own session and `g`, as when served."""
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(GlobalSettings(id=1, enable_strict_schedule=False))
+        db.session.add(User(user_id='admin', first_name='Test', last_name='Admin',
+                            password='-', role='admin', status='active'))
+        db.session.commit()
+    # Process-wide caches would otherwise carry one test's rows into the next
+    settings_cache.invalidate()
+    schedule_resolver.invalidate()
+    return flask_app
+
+
+@pytest.fixture
+def admin_client(app):
+    return login_as(app.test_client(), 'admin')
+
+
+@pytest.fixture
+def gia_client(app):
+    """Logged in as 'gia1', scheduled all day on every block."""
+    with app.app_context():
+        db.session.add(User(user_id='gia1', first_name='Gia', last_name='One', password='-', role='gia'))
+        db.session.add_all([
+            Schedule(user_id='gia1', day=block, start_time=time(0, 0), end_time=time(23, 59), is_split_shift=False)
+            for block in ('mw', 'tth', 'fri', 'sat')
+        ])
+        db.session.commit()
+    return login_as(app.test_client(), 'gia1')
+
+
+def login_as(client, user_id):
+    with client.session_transaction() as session:
+        session['_user_id'] = user_id
+        session['_fresh'] = True
+    return client
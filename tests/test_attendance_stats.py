@@ -0,0 +1,131 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from models.models import db, Attendance
+from services.attendance_stats import daily_shift_pairs, day_shift_summary, rebuild_daily_rollup, user_period_summary
+
+# Day -> (clock_in, clock_out) in the order they were recorded
+SHIFTS = {
+    date(2026, 1, 5): [(time(8), time(12, 15))],
+    date(2026, 1, 6): [(time(7, 30), time(11, 45)), (time(13), time(17))],
+    date(2026, 1, 7): [(time(8), time(10)), (time(10, 30), time(15, 15)), (time(16), time(18, 30))],
+}
+OVERNIGHT = {date(2026, 1, 8): [(time(22), time(2))]}
+
+
+# The Python loops the DTR, gia-data and the dashboard ran before the SQL
+def old_dtr_shifts(records):
+    days = {}
+    for record in records:
+        slot = days.setdefault(record.date, {"shift1": {"in": None, "out": None}, "shift2": {"in": None, "out": None}})
+        cin = datetime.combine(record.date, record.clock_in)
+        cout = datetime.combine(record.date, record.clock_out)
+        if not slot["shift1"]["in"]:
+            slot["shift1"]["in"], slot["shift1"]["out"] = cin, cout
+        else:
+            slot["shift2"]["in"], slot["shift2"]["out"] = cin, cout
+    return days
+
+
+def old_dtr_total_hours(days):
+    total_seconds = 0
+    for shifts in days.values():
+        for shift in ("shift1", "shift2"):
+            t_in, t_out = shifts[shift]["in"], shifts[shift]["out"]
+            if not t_in or not t_out:
+                continue
+            if t_out < t_in:
+                t_out += timedelta(days=1)
+            total_seconds += (t_out - t_in).total_seconds()
+    return round(total_seconds / 3600, 2)
+
+
+def old_gia_totals(records, today):
+    sum_hours = today_hours = 0.0
+    active_dates = set()
+    for record in records:
+        t_hours = round((datetime.combine(record.date, record.clock_out)
+                         - datetime.combine(record.date, record.clock_in)).total_seconds() / 3600, 2)
+        sum_hours += t_hours
+        if t_hours > 0:
+            active_dates.add(record.date)
+        if record.date == today:
+            today_hours += t_hours
+    return round(sum_hours, 2), round(today_hours, 2), len(active_dates)
+
+
+def old_dashboard(records):
+    worked = overtime = compliant = 0
+    for record in records:
+        duration = datetime.combine(record.date, record.clock_out) - datetime.combine(record.date, record.clock_in)
+        worked += duration.total_seconds()
+        if duration > timedelta(hours=4):
+            overtime += (duration - timedelta(hours=4)).total_seconds()
+        if duration <= timedelta(hours=4):
+            compliant += 1
+    return len(records), worked, overtime, compliant
+
+
+@pytest.fixture
+def records(app):
+    with app.app_context():
+        db.session.execute(db.insert(Attendance), [
+            {'user_id': 'admin', 'date': day, 'slot': slot, 'clock_in': cin, 'clock_out': cout}
+            for day, shifts in (SHIFTS | OVERNIGHT).items()
+            for slot, (cin, cout) in enumerate(shifts, start=1)
+        ])
+        db.session.commit()
+        rebuild_daily_rollup()
+        return db.session.scalars(db.select(Attendance).order_by(Attendance.id)).all()
+
+
+def on(records, days):
+    return [r for r in records if r.date in days]
+
+
+def test_shift_pairs_match_old_dtr(app, records):
+    old = old_dtr_shifts(records)
+
+    with app.app_context():
+        rows = db.session.execute(daily_shift_pairs(date(2026, 1, 1), date(2026, 1, 31), user_id='admin')).all()
+
+    assert {r.date: (r.in1, r.out1, r.in2, r.out2) for r in rows} == {
+        day: tuple(s[k].time() if s[k] else None for s in (slots['shift1'], slots['shift2']) for k in ('in', 'out'))
+        for day, slots in old.items()
+    }
+    # The DTR already wrapped an overnight shift
+    assert round(sum(r.worked_seconds for r in rows) / 3600, 2) == old_dtr_total_hours(old)
+
+
+def test_period_totals_match_old_gia_data(app, records):
+    today = date(2026, 1, 7)
+    total, today_hours, active_days = old_gia_totals(on(records, SHIFTS), today)
+
+    with app.app_context():
+        new = user_period_summary('admin', date(2026, 1, 5), date(2026, 1, 7), today)
+
+    assert (round(new.total_seconds / 3600, 2), round(new.today_seconds / 3600, 2), new.active_days) == \
+        (total, today_hours, active_days)
+
+
+@pytest.mark.parametrize('day', SHIFTS)
+def test_day_summary_matches_old_dashboard(app, records, day):
+    shifts, worked, overtime, compliant = old_dashboard(on(records, {day}))
+
+    with app.app_context():
+        new = day_shift_summary(day)
+
+    assert (new.shifts, new.worked_seconds, new.overtime_seconds, new.compliant_shifts) == \
+        (shifts, worked, overtime, compliant)
+
+
+def test_overnight_shift_wraps_past_midnight(app, records):
+    day = date(2026, 1, 8)
+    overnight = on(records, {day})
+    # gia-data and the dashboard used to count 22:00-02:00 as -20 hours
+    assert old_gia_totals(overnight, day)[0] == -20.0
+
+    with app.app_context():
+        assert user_period_summary('admin', day, day, day).total_seconds == 4 * 3600
+        assert day_shift_summary(day).worked_seconds == 4 * 3600
@@ -0,0 +1,23 @@
+from datetime import date, datetime
+
+from models.models import db, Logs, User
+
+
+def test_system_entries_listed_and_superadmin_hidden(app, admin_client):
+    with app.app_context():
+        db.session.add(User(user_id='superadmin', first_name='Super', last_name='Admin', password='-', role='superadmin'))
+        db.session.add_all([
+            Logs(user_id=None, action='Clock Out', details='Auto clock-out closed 2 shift(s).', timestamp=datetime.now()),
+            Logs(user_id='superadmin', action='Login', details='Superadmin logged in.', timestamp=datetime.now()),
+            Logs(user_id='admin', action='Login', details='Admin logged in.', timestamp=datetime.now()),
+        ])
+        db.session.commit()
+    today = date.today().isoformat()
+
+    response = admin_client.get(f"/api/get-logs?from={today}&to={today}&total=1")
+
+    body = response.get_json()
+    assert [(log['full_name'], log['action']) for log in body['logs']] == [
+        ('Test Admin', 'Login'), ('System', 'Clock Out')
+    ]
+    assert body['total'] == 2
@@ -0,0 +1,8 @@
+from routes.gia import get_client_ip
+
+
+def test_forwarding_headers_ignored_without_trusted_proxy(app):
+    forged = {'X-Forwarded-For': '10.9.9.9', 'CF-Connecting-IP': '10.9.9.9'}
+
+    with app.test_request_context('/', headers=forged, environ_base={'REMOTE_ADDR': '203.0.113.5'}):
+        assert get_client_ip() == '203.0.113.5'
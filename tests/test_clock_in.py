@@ -0,0 +1,61 @@
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from models.models import db, Attendance
+
+
+def clock_in(client):
+    return client.post('/api/clock-in', json={'user_id': 'gia1'})
+
+
+def clock_out(client):
+    return client.post('/api/clock-out', json={'user_id': 'gia1'})
+
+
+def test_third_clock_in_rejected(app, gia_client):
+    for _ in range(2):
+        assert clock_in(gia_client).status_code == 200
+        assert clock_out(gia_client).status_code == 200
+
+    response = clock_in(gia_client)
+
+    assert response.status_code == 400
+    assert 'daily limit' in response.get_json()['error']
+    with app.app_context():
+        assert sorted(db.session.scalars(db.select(Attendance.slot))) == [1, 2]
+
+
+def test_duplicate_slot_returns_409(app, gia_client, monkeypatch):
+    assert clock_in(gia_client).status_code == 200
+    # The other tap took the slot between this one's SELECT and INSERT
+    monkeypatch.setattr(Attendance, 'insert_next_slot', staticmethod(
+        lambda user_id, date, max_slots=None, **values:
+            db.insert(Attendance).values(user_id=user_id, date=date, slot=1, **values)
+    ))
+
+    response = clock_in(gia_client)
+
+    assert response.status_code == 409
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count()).select_from(Attendance)) == 1
+
+
+class Deadlock(Exception):
+    errno = 1213
+
+
+def test_deadlock_returns_409(app, gia_client):
+    with app.app_context():
+        engine = db.engine
+
+    def deadlock(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO attendance'):
+            raise OperationalError(statement, parameters, Deadlock('Deadlock found when trying to get lock'))
+
+    event.listen(engine, 'before_cursor_execute', deadlock)
+    try:
+        response = clock_in(gia_client)
+    finally:
+        event.remove(engine, 'before_cursor_execute', deadlock)
+
+    assert response.status_code == 409
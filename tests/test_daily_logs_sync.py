@@ -0,0 +1,21 @@
+from datetime import date, time
+
+from models.models import db, Attendance, User
+
+
+def test_changes_within_a_second_get_new_etag(app, admin_client):
+    with app.app_context():
+        db.session.add(User(user_id='gia1', first_name='Gia', last_name='One', password='-', role='gia'))
+        db.session.add(Attendance(user_id='gia1', date=date.today(), clock_in=time(8)))
+        db.session.commit()
+    url = f"/api/get-daily-logs?today={date.today().isoformat()}"
+
+    first = admin_client.get(url)
+    with app.app_context():
+        db.session.execute(db.update(Attendance).values(clock_out=time(12)))
+        db.session.commit()
+    second = admin_client.get(url, headers={'If-None-Match': first.headers['ETag']})
+
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.headers['X-Sync-Cursor'] > first.headers['X-Sync-Cursor']
@@ -0,0 +1,65 @@
+from models.models import db, Attendance, AttendanceDaily
+from services.attendance_stats import rebuild_daily_rollup
+
+
+def rollup():
+    return db.session.execute(
+        db.select(AttendanceDaily.user_id, AttendanceDaily.date, AttendanceDaily.first_in,
+                  AttendanceDaily.last_out, AttendanceDaily.shift_count, AttendanceDaily.worked_seconds)
+        .order_by(AttendanceDaily.user_id, AttendanceDaily.date)
+    ).all()
+
+
+def assert_rollup_matches_rebuild(app):
+    with app.app_context():
+        kept = rollup()
+        rebuild_daily_rollup()
+        assert kept == rollup()
+        return kept
+
+
+def test_rollup_matches_rebuild_after_each_write(app, gia_client, admin_client):
+    gia_client.post('/api/clock-in', json={'user_id': 'gia1'})
+    assert gia_client.post('/api/clock-out', json={'user_id': 'gia1'}).status_code == 200
+    assert len(assert_rollup_matches_rebuild(app)) == 1
+
+    for clock_in, clock_out in (('08:00', '12:00'), ('13:00', '17:30'), ('18:00', None)):
+        response = admin_client.post('/api/add-log', json={
+            'userId': 'gia1', 'date': '2026-01-05', 'clockIn': clock_in, 'clockOut': clock_out,
+        })
+        assert response.status_code == 200
+    rows = assert_rollup_matches_rebuild(app)
+    assert [r.shift_count for r in rows if str(r.date) == '2026-01-05'] == [2]
+
+    with app.app_context():
+        open_id = db.session.scalar(db.select(Attendance.id).where(Attendance.clock_out.is_(None), Attendance.slot == 3))
+    assert admin_client.post(f'/api/update-log/{open_id}', json={'clockOut': '19:15'}).status_code == 200
+    rows = assert_rollup_matches_rebuild(app)
+    assert [r.shift_count for r in rows if str(r.date) == '2026-01-05'] == [3]
+
+
+def test_add_log_rejects_malformed_time(app, admin_client):
+    response = admin_client.post('/api/add-log', json={
+        'userId': 'admin', 'date': '2026-01-05', 'clockIn': '8 am', 'clockOut': '',
+    })
+
+    assert response.status_code == 400
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count()).select_from(Attendance)) == 0
+
+
+def test_add_log_slot_conflict_returns_409(app, admin_client, monkeypatch):
+    payload = {'userId': 'admin', 'date': '2026-01-05', 'clockIn': '08:00', 'clockOut': '12:00'}
+    assert admin_client.post('/api/add-log', json=payload).status_code == 200
+    # A concurrent write took the slot between this one's SELECT and INSERT
+    monkeypatch.setattr(Attendance, 'insert_next_slot', staticmethod(
+        lambda user_id, date, max_slots=None, **values:
+            db.insert(Attendance).values(user_id=user_id, date=date, slot=1, **values)
+    ))
+
+    response = admin_client.post('/api/add-log', json=payload)
+
+    assert response.status_code == 409
+    assert 'IntegrityError' not in response.get_json()['error']
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count()).select_from(Attendance)) == 1
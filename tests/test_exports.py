@@ -0,0 +1,52 @@
+import csv
+import io
+from datetime import date, time
+
+import routes.admin
+import services.csv_export
+from models.models import db, Attendance, User
+
+# Shared surnames and first names, so pages break inside runs of equal names
+NAMES = [('Cruz', 'Ana'), ('Cruz', 'Ana'), ('Cruz', 'Ben'), ('Abad', 'Ana'), ('Cruz', 'Ana'), ('Diaz', 'Eve'), ('Abad', 'Ana')]
+
+
+def seed(app):
+    with app.app_context():
+        for n, (last_name, first_name) in enumerate(NAMES):
+            user_id = f"gia{n}"
+            db.session.add(User(user_id=user_id, first_name=first_name, last_name=last_name, password='-', role='gia'))
+            for day in (1, 2):
+                for slot, (start, end) in enumerate([(8, 12), (13, 17)], 1):
+                    db.session.add(Attendance(user_id=user_id, date=date(2026, 3, day), slot=slot,
+                                              clock_in=time(start), clock_out=time(end)))
+        db.session.commit()
+
+
+def test_exports_page_without_gaps_or_repeats(app, admin_client, monkeypatch):
+    seed(app)
+    monkeypatch.setattr(services.csv_export, 'BATCH_SIZE', 3)
+
+    users = list(csv.reader(io.StringIO(admin_client.get('/api/export-users').get_data(as_text=True))))[1:]
+    shifts = list(csv.reader(io.StringIO(admin_client.get('/api/export-attendance?month=2026-03').get_data(as_text=True))))[1:]
+
+    assert [row[0] for row in users] == [
+        f"gia{n}" for n, _ in sorted(enumerate(NAMES), key=lambda item: (item[1], f"gia{item[0]}"))
+    ]
+    assert [(row[0], row[3], row[4]) for row in shifts] == [
+        (f"gia{n}", f"2026-03-0{day}", clock_in)
+        for n in range(len(NAMES)) for day in (1, 2) for clock_in in ('08:00 AM', '01:00 PM')
+    ]
+
+
+def test_dtr_report_lists_every_user_once(app, admin_client, monkeypatch):
+    seed(app)
+    monkeypatch.setattr(routes.admin, 'DTR_BATCH_SIZE', 2)
+
+    with app.app_context():
+        entries = list(routes.admin._dtr_entries(date(2026, 3, 1), date(2026, 3, 31)))
+
+    assert [entry['user'].user_id for entry in entries] == [
+        f"gia{n}" for n, _ in sorted(enumerate(NAMES), key=lambda item: (item[1][0], f"gia{item[0]}"))
+    ]
+    assert all(entry['total_hours'] == 16 for entry in entries)
+    assert admin_client.get('/admin/export?month=2026-03').status_code == 200
@@ -0,0 +1,81 @@
+from werkzeug.security import check_password_hash
+
+import routes.api
+from models.models import db, User
+
+
+def user_ids(app):
+    with app.app_context():
+        return sorted(db.session.scalars(db.select(User.user_id)))
+
+
+def test_import_csv_creates_users(app, admin_client):
+    body = (
+        "User ID,First Name,Last Name,Middle Initial,Role,Password\n"
+        "gia1,Gia,One,r,,secret1\n"
+        "adm2,Ad,Two,,Admin,\n"
+    )
+
+    response = admin_client.post('/api/import-users', data=body, content_type='text/csv')
+
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True, 'created': 2}
+    with app.app_context():
+        gia, adm = (db.session.scalar(db.select(User).filter_by(user_id=u)) for u in ('gia1', 'adm2'))
+        assert (gia.role, gia.middle_name, gia.status) == ('gia', 'R', 'active')
+        assert adm.role == 'admin' and adm.middle_name is None
+        assert check_password_hash(gia.password, 'secret1')
+        assert check_password_hash(adm.password, routes.api.DEFAULT_PASSWORD)
+
+
+def test_invalid_rows_reject_the_whole_import(app, admin_client):
+    response = admin_client.post('/api/import-users', json=[
+        {'userId': 'ok1', 'firstName': 'Ok', 'lastName': 'One'},
+        {'userId': 'bad2', 'firstName': 'No Surname'},
+        {'userId': 'bad3', 'firstName': 'Bad', 'lastName': 'Role', 'role': 'owner'},
+        {'userId': 'ok1', 'firstName': 'Twice', 'lastName': 'Listed'},
+        {'userId': 'admin', 'firstName': 'Taken', 'lastName': 'Already'},
+        'not a user',
+    ])
+
+    assert response.status_code == 400
+    assert [(e['row'], e['error']) for e in response.get_json()['errors']] == [
+        (2, 'Missing last_name'),
+        (3, "Unknown role 'owner'"),
+        (4, 'Duplicate user ID ok1 in the import'),
+        (5, 'User ID admin already exists'),
+        (6, 'Expected an object with user fields'),
+    ]
+    assert user_ids(app) == ['admin']
+
+
+def test_empty_or_unreadable_import_is_rejected(app, admin_client):
+    assert admin_client.post('/api/import-users', json=[]).status_code == 400
+    assert admin_client.post('/api/import-users', data='{', content_type='application/json').status_code == 400
+    assert user_ids(app) == ['admin']
+
+
+def test_id_taken_during_import_returns_409(app, admin_client, monkeypatch):
+    hash_default = routes.api.password_pool.hash
+
+    # Another admin creates gia2 while this import is hashing passwords
+    def hash_while_racing(password):
+        with db.engine.begin() as conn:
+            conn.execute(db.insert(User).values(user_id='gia2', first_name='Raced', last_name='In', password='-', role='gia'))
+        return hash_default(password)
+    monkeypatch.setattr(routes.api.password_pool, 'hash', hash_while_racing)
+
+    response = admin_client.post('/api/import-users', json={'users': [
+        {'userId': 'gia1', 'firstName': 'Gia', 'lastName': 'One'},
+        {'userId': 'gia2', 'firstName': 'Gia', 'lastName': 'Two'},
+    ]})
+
+    assert response.status_code == 409
+    assert user_ids(app) == ['admin', 'gia2']
+
+
+def test_import_requires_admin(app, gia_client):
+    response = gia_client.post('/api/import-users', json=[{'userId': 'x', 'firstName': 'X', 'lastName': 'Y'}])
+
+    assert response.status_code == 403
+    assert user_ids(app) == ['admin', 'gia1']
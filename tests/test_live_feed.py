@@ -0,0 +1,38 @@
+from services.live_feed import LiveFeed
+
+
+def test_payload_only_built_for_subscribers():
+    feed = LiveFeed()
+    calls = []
+
+    def load():
+        calls.append(1)
+        return {'log_id': 1}
+
+    assert feed.publish('clock-in', load) is None
+    assert calls == []
+
+    sub, _ = feed.subscribe()
+    event = feed.publish('clock-in', load)
+    assert calls == [1]
+    assert sub.queue.get_nowait() == event
+
+
+def test_reconnect_after_unheard_event_reloads():
+    feed = LiveFeed()
+    sub, _ = feed.subscribe()
+    seen = feed.publish('clock-in', {'log_id': 1})
+    feed.unsubscribe(sub)
+
+    feed.publish('clock-out', lambda: {'log_id': 1})
+
+    _, backlog = feed.subscribe(seen.id)
+    assert [e.type for e in backlog] == ['reload']
+
+
+def test_disabled_feed_refuses_streams():
+    feed = LiveFeed()
+    feed.enabled = False
+
+    assert feed.subscribe() == (None, [])
+    assert feed.publish('clock-in', {'log_id': 1}) is None
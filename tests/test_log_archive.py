@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from models.models import db, Logs
+from services.log_archive import log_archive
+
+START = datetime(2020, 1, 1, 9)
+DAYS = 5
+PER_DAY = 4
+
+
+def archive_days(app):
+    with app.app_context():
+        db.session.add_all([
+            Logs(user_id='admin', action='Login', details=f"Entry {d}-{n}",
+                 timestamp=START + timedelta(days=d, minutes=n))
+            for d in range(DAYS) for n in range(PER_DAY)
+        ])
+        db.session.commit()
+        return log_archive.archive(START + timedelta(days=DAYS))
+
+
+def test_read_skips_day_files_outside_the_page(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(log_archive, 'directory', str(tmp_path))
+    assert archive_days(app) == DAYS * PER_DAY
+    opened = []
+    read_day = log_archive._read_day
+    monkeypatch.setattr(log_archive, '_read_day', lambda day: opened.append(day) or read_day(day))
+
+    # Ids 1-4 are on the first day, 5-8 on the second
+    page = list(log_archive.read(START, START + timedelta(days=DAYS), before_id=6))
+
+    assert [e.id for e in page] == [5, 4, 3, 2, 1]
+    assert opened == [START.date() + timedelta(days=1), START.date()]
+
+
+def test_manifest_parsed_once_until_it_changes(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(log_archive, 'directory', str(tmp_path))
+    archive_days(app)
+    loads = []
+    load = log_archive._load_manifest
+    monkeypatch.setattr(log_archive, '_load_manifest', lambda: loads.append(1) or load())
+
+    for _ in range(3):
+        assert log_archive.reaches(START)
+    assert len(loads) == 1
+
+    log_archive._write_manifest({**load(), 'max_id': 100})
+    assert log_archive.reaches(START, after_id=50)
+    assert len(loads) == 2
+
+
+def test_index_rebuilt_for_older_archives(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(log_archive, 'directory', str(tmp_path))
+    archive_days(app)
+    manifest = log_archive._load_manifest()
+    index = manifest.pop('days')
+    log_archive._write_manifest(manifest)
+
+    with app.app_context():
+        log_archive.archive(START + timedelta(days=DAYS))
+
+    assert log_archive._load_manifest()['days'] == index
+
+
+def test_get_logs_pages_through_the_archive(app, admin_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(log_archive, 'directory', str(tmp_path))
+    archive_days(app)
+    url = f"/api/get-logs?from={START:%Y-%m-%d}&to={START + timedelta(days=DAYS - 1):%Y-%m-%d}&per_page=7"
+
+    ids, before = [], ''
+    while True:
+        body = admin_client.get(url + before).get_json()
+        ids += [log['details'] for log in body['logs']]
+        if body['next_cursor'] is None:
+            break
+        before = f"&before={body['next_cursor']}"
+
+    assert ids == [f"Entry {d}-{n}" for d in reversed(range(DAYS)) for n in reversed(range(PER_DAY))]
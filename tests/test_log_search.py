@@ -0,0 +1,25 @@
+import pytest
+
+from models.models import db
+from services import queries
+
+DETAILS = "User Gia Dela Cruz clocked in for first shift."
+
+
+@pytest.mark.parametrize('keyword, expected', [
+    ('clock', True),        # word prefix
+    ('CLOCKED shift', True),
+    ('locked', False),      # inside a word: FULLTEXT does not find it
+    ('clock night', False), # every term must match
+    ('in', True),           # too short to be indexed: substring
+])
+def test_archive_matches_mysql_fulltext(app, monkeypatch, keyword, expected):
+    with app.app_context():
+        monkeypatch.setattr(db.engine.dialect, 'name', 'mysql')
+        assert queries.details_matcher(keyword)(DETAILS) is expected
+
+
+def test_archive_matches_substring_elsewhere(app):
+    with app.app_context():
+        assert queries.details_matcher('locked')(DETAILS) is True
+        assert queries.details_matcher('night')(DETAILS) is False
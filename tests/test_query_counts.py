@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import event
+
+from models.models import db, Attendance, Logs, User
+from services.count_cache import count_cache
+
+
+def add_users(app, start, stop):
+    today = date.today()
+    with app.app_context():
+        for n in range(start, stop):
+            user_id = f"gia{n:03d}"
+            db.session.add(User(user_id=user_id, first_name='Gia', last_name=f"{n:03d}", password='-', role='gia'))
+            db.session.add(Attendance(user_id=user_id, date=today, clock_in=time(8), clock_out=time(12)))
+            db.session.add(Logs(user_id=user_id, action='Clock In', details=f"User Gia {n:03d} clocked in.",
+                                timestamp=datetime.combine(today, time(8)) + timedelta(seconds=n)))
+        db.session.commit()
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def statements_per_endpoint(app, client):
+    today = date.today().isoformat()
+    urls = {
+        'get_logs': f"/api/get-logs?from={today}&to={today}&per_page=100",
+        'get_logs total': f"/api/get-logs?from={today}&to={today}&per_page=100&total=1",
+        'get_daily_logs': f"/api/get-daily-logs?today={today}",
+    }
+    with app.app_context():
+        engine = db.engine
+    counts = {}
+    for name, url in urls.items():
+        count_cache.clear()
+        with count_statements(engine) as statements:
+            response = client.get(url)
+        assert response.status_code == 200
+        counts[name] = len(statements)
+    return counts
+
+
+def test_statements_do_not_grow_with_rows(app, admin_client):
+    add_users(app, 0, 5)
+    statements_per_endpoint(app, admin_client)  # first-request work: settings, compiled caches
+    few = statements_per_endpoint(app, admin_client)
+
+    add_users(app, 5, 50)
+    many = statements_per_endpoint(app, admin_client)
+
+    assert many == few
@@ -0,0 +1,47 @@
+from datetime import date, datetime, time, timedelta
+
+from models.models import db, Attendance, AttendanceDaily, Logs, User
+from services.query_plans import check_hot_queries
+
+USERS = 500
+DAYS = 30
+# Each GIA works one day in WORK_EVERY, so a day has USERS / WORK_EVERY rows
+WORK_EVERY = 5
+
+
+def seed():
+    today = date.today()
+    db.session.execute(db.insert(User), [
+        {'user_id': f"gia{n:04d}", 'first_name': 'Gia', 'last_name': f"{n:04d}",
+         'password': '-', 'role': 'gia', 'status': 'active' if n % 10 else 'inactive'}
+        for n in range(USERS)
+    ])
+    shifts = [(f"gia{n:04d}", today - timedelta(days=d))
+              for n in range(USERS) for d in range(DAYS) if (n + d) % WORK_EVERY == 0]
+    db.session.execute(db.insert(Attendance), [
+        {'user_id': user_id, 'date': day, 'clock_in': time(8), 'clock_out': time(12), 'slot': 1}
+        for user_id, day in shifts
+    ])
+    db.session.execute(db.insert(AttendanceDaily), [
+        {'user_id': user_id, 'date': day, 'first_in': time(8), 'last_out': time(12),
+         'shift_count': 1, 'worked_seconds': 4 * 3600}
+        for user_id, day in shifts
+    ])
+    start = datetime.combine(today - timedelta(days=DAYS), time())
+    db.session.execute(db.insert(Logs), [
+        {'user_id': f"gia{n % USERS:04d}", 'action': 'Clock In' if n % 2 else 'Clock Out',
+         'timestamp': start + timedelta(minutes=5 * n), 'details': f"entry {n}", 'client_ip': '127.0.0.1'}
+        for n in range(USERS * DAYS)
+    ])
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        seed()
+        results = check_hot_queries()
+
+    full_scans = {name: plan for name, (plan, scanned) in results.items() if scanned}
+    assert not full_scans
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+import services.rate_limit
+from models.models import db, User
+from services.rate_limit import TokenBucket, login_limiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock the buckets read, moved with `clock(seconds)`."""
+    now = [1000.0]
+    monkeypatch.setattr(services.rate_limit, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+
+    def advance(seconds):
+        now[0] += seconds
+    return advance
+
+
+def test_bucket_allows_a_burst_then_refills(clock):
+    bucket = TokenBucket(rate_per_min=60, burst=3)
+
+    assert [bucket.take('a') for _ in range(3)] == [0, 0, 0]
+    assert bucket.take('a') == 1
+
+    clock(0.5)
+    assert bucket.take('a') == 1
+    clock(0.5)
+    assert bucket.take('a') == 0
+    assert bucket.take('a') == 1
+
+
+def test_idle_bucket_refills_only_to_its_burst(clock):
+    bucket = TokenBucket(rate_per_min=6, burst=2)
+    bucket.take('a')
+    bucket.take('a')
+
+    clock(3600)
+
+    assert [bucket.take('a') for _ in range(3)] == [0, 0, 10]
+
+
+def test_keys_have_their_own_buckets_and_are_bounded(clock):
+    bucket = TokenBucket(rate_per_min=1, burst=1, maxsize=2)
+    assert bucket.take('a') == 0
+    assert bucket.take('b') == 0
+    assert bucket.take('a') == 60
+
+    # 'b' is least recently used and makes room for 'c'
+    bucket.take('c')
+    assert len(bucket._buckets) == 2
+    assert bucket.take('b') == 0
+
+
+@pytest.fixture
+def limiter(app, monkeypatch, clock):
+    monkeypatch.setattr(login_limiter, 'accounts', TokenBucket(rate_per_min=1, burst=2))
+    monkeypatch.setattr(login_limiter, 'ips', TokenBucket(rate_per_min=1, burst=5))
+    with app.app_context():
+        db.session.execute(db.update(User).where(User.user_id == 'admin')
+                           .values(password=generate_password_hash('right', method='pbkdf2:sha256:1000')))
+        db.session.commit()
+    return login_limiter
+
+
+def login(client, admin_id, password):
+    return client.post('/auth/login', json={'adminId': admin_id, 'password': password})
+
+
+def test_login_returns_429_once_the_account_bucket_is_empty(app, limiter, clock):
+    client = app.test_client()
+    assert [login(client, 'admin', 'wrong').status_code for _ in range(2)] == [401, 401]
+
+    # Even the right password is not checked until a token comes back
+    response = login(client, 'admin', 'right')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '60'
+
+    clock(60)
+    assert login(client, 'admin', 'right').status_code == 200
+
+
+def test_unknown_accounts_drain_the_ip_bucket(app, limiter):
+    client = app.test_client()
+    statuses = [login(client, f'nobody{n}', 'guess').status_code for n in range(6)]
+
+    assert statuses == [401] * 5 + [429]
+    assert login(client, 'admin', 'right').status_code == 429
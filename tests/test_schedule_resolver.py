@@ -0,0 +1,105 @@
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from services.schedule_resolver import _UserSchedule
+
+DAY = date(2026, 1, 5)
+
+
+def row(start, end, split_start=None, split_end=None, day='mw'):
+    return SimpleNamespace(
+        day=day, start_time=start, end_time=end,
+        is_split_shift=bool(split_start), split_start_time=split_start, split_end_time=split_end,
+    )
+
+
+def shifted(t, **delta):
+    return (datetime.combine(DAY, t) + timedelta(**delta)).time()
+
+
+# The loops clock_in and clock_out/status ran before the resolver
+def old_clock_in(rows, now, early_in):
+    special_early_in = early_in
+    if any(s.start_time == time(7, 30) for s in rows):
+        special_early_in += 30
+    for sched in rows:
+        if sched.start_time and sched.end_time:
+            earliest_in = shifted(sched.start_time, minutes=-special_early_in)
+            if earliest_in <= now <= sched.end_time:
+                return sched.start_time, False
+        if sched.is_split_shift and sched.split_start_time and sched.split_end_time:
+            earliest_in = shifted(sched.split_start_time, minutes=-early_in)
+            if earliest_in <= now <= sched.split_end_time:
+                return sched.split_start_time, True
+    return None
+
+
+def old_shift_end(rows, clock_in):
+    for sched in rows:
+        if sched.start_time and sched.end_time:
+            if shifted(sched.start_time, hours=-1) <= clock_in <= sched.end_time:
+                return sched.end_time
+        if sched.is_split_shift and sched.split_start_time and sched.split_end_time:
+            if shifted(sched.split_start_time, hours=-1) <= clock_in <= sched.split_end_time:
+                return sched.split_end_time
+    return None
+
+
+SCHEDULES = {
+    'single': [row(time(8), time(17))],
+    'split': [row(time(8), time(12), time(13), time(17))],
+    'early': [row(time(7, 30), time(11, 30), time(12, 30), time(16, 30))],
+    # Only the first shift's start counts for the 7:30 bonus
+    'split_at_730': [row(time(5), time(7), time(7, 30), time(11))],
+    'overlapping': [row(time(8), time(12), time(12, 10), time(15))],
+    'two_rows': [row(time(8), time(10)), row(time(10), time(14), time(14, 20), time(18))],
+}
+
+
+def edges(rows, early_in):
+    """Times on and one second either side of every window edge."""
+    points = set()
+    for sched in rows:
+        for start, end in ((sched.start_time, sched.end_time), (sched.split_start_time, sched.split_end_time)):
+            if not start:
+                continue
+            for lead in (early_in, early_in + 30, 60):
+                points.add(shifted(start, minutes=-lead))
+            points.update((start, end))
+    probes = set()
+    for t in points:
+        probes.update(shifted(t, seconds=s) for s in (-1, 0, 1, 59))
+        probes.add(shifted(t, microseconds=500_000))
+    return sorted(probes)
+
+
+@pytest.mark.parametrize('name', SCHEDULES)
+@pytest.mark.parametrize('early_in', [0, 15])
+def test_clock_in_window_matches_old_rule(name, early_in):
+    rows = SCHEDULES[name]
+    compiled = _UserSchedule(rows, expires_at=None)
+
+    for now in edges(rows, early_in):
+        shift = compiled.lookup('mw', now, early_in)
+        got = (shift.start, shift.is_split) if shift else None
+        assert got == old_clock_in(rows, now, early_in), now
+
+
+@pytest.mark.parametrize('name', SCHEDULES)
+def test_lookback_window_matches_old_rule(name):
+    rows = SCHEDULES[name]
+    compiled = _UserSchedule(rows, expires_at=None)
+
+    for clock_in in edges(rows, 0):
+        shift = compiled.lookup('mw', clock_in, None)
+        assert (shift.end if shift else None) == old_shift_end(rows, clock_in), clock_in
+
+
+def test_window_before_midnight_starts_at_midnight():
+    # The old rule wrapped to 23:40 the previous evening and never matched
+    compiled = _UserSchedule([row(time(0, 10), time(4))], expires_at=None)
+
+    assert compiled.lookup('mw', time(0, 0), 15).start == time(0, 10)
+    assert compiled.lookup('mw', time(23, 59), 15) is None
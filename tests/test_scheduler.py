@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from models.models import db, JobLock, JobRun
+from services.scheduler import JobScheduler
+
+
+class Process(JobScheduler):
+    """The scheduler as one serving process sees it."""
+
+    def __init__(self, app, owner, calls, **kwargs):
+        super().__init__(**kwargs)
+        self.app = app
+        self._owner = owner
+
+        @self.job('tidy', hours=1)
+        def tidy():
+            calls.append(owner)
+            return len(calls)
+
+        @self.job('broken', hours=1)
+        def broken():
+            calls.append(owner)
+            raise RuntimeError('disk full')
+
+    @property
+    def owner(self):
+        return self._owner
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def first(app, calls):
+    return Process(app, 'host:1', calls)
+
+
+@pytest.fixture
+def second(app, calls):
+    return Process(app, 'host:2', calls)
+
+
+def lease(app, job_id='tidy'):
+    with app.app_context():
+        return db.session.get(JobLock, job_id)
+
+
+def expire(app, job_id='tidy'):
+    with app.app_context():
+        db.session.execute(db.update(JobLock).where(JobLock.job_id == job_id)
+                           .values(locked_until=datetime.now() - timedelta(seconds=1)))
+        db.session.commit()
+
+
+def test_only_one_owner_runs_a_job_per_interval(app, first, second, calls):
+    run = first.run('tidy')
+
+    assert run.status == 'ok' and run.result == '1'
+    assert second.run('tidy') is None
+    assert first.run('tidy') is None
+    assert calls == ['host:1']
+    # Held until shortly before the next slot
+    held = lease(app)
+    assert held.owner == 'host:1'
+    assert held.locked_until >= run.started_at + timedelta(minutes=54)
+
+
+def test_lease_covers_the_run(app, first, second, calls):
+    seen = []
+    first.jobs['tidy'] = first.jobs['tidy']._replace(func=lambda: seen.append((lease(app), second.run('tidy'))))
+
+    first.run('tidy')
+
+    (held, other), = seen
+    assert held.owner == 'host:1'
+    assert held.locked_until > datetime.now() + timedelta(seconds=first.lock_lease - 60)
+    assert other is None and calls == []
+
+
+def test_expired_lease_is_taken_over(app, first, second, calls):
+    first.run('tidy')
+    expire(app)
+
+    run = second.run('tidy')
+
+    assert run is not None and run.owner == 'host:2'
+    assert lease(app).owner == 'host:2'
+    assert calls == ['host:1', 'host:2']
+
+
+def test_owner_renews_its_own_expired_lease(app, first, calls):
+    first.run('tidy')
+    expire(app)
+
+    assert first.run('tidy') is not None
+    assert lease(app).locked_until > datetime.now()
+    assert calls == ['host:1', 'host:1']
+
+
+def test_concurrent_first_run_loses_on_primary_key(app, first, second, calls):
+    raced = []
+
+    # host:1 inserts the lease between host:2's check and its insert
+    def race(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO job_locks') and not raced:
+            raced.append(True)
+            first.run('tidy')
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', race)
+    try:
+        assert second.run('tidy') is None
+    finally:
+        event.remove(engine, 'before_cursor_execute', race)
+
+    assert raced and calls == ['host:1']
+    assert lease(app).owner == 'host:1'
+
+
+def test_runs_are_recorded_with_errors_and_pruned(app, first):
+    with app.app_context():
+        db.session.add(JobRun(job_id='tidy', owner='host:9', started_at=datetime.now() - timedelta(days=31),
+                              duration_ms=5, status='ok'))
+        db.session.commit()
+
+    first.run('tidy')
+    failed = first.run('broken')
+
+    assert failed.status == 'error' and failed.error == 'RuntimeError: disk full'
+    with app.app_context():
+        history = first.history()
+        assert [(r.job_id, r.status) for r in history] == [('broken', 'error'), ('tidy', 'ok')]
+        assert all(r.owner == 'host:1' and r.duration_ms >= 0 for r in history)
+        assert {job['id']: job['lock_owner'] for job in first.status()} == {'tidy': 'host:1', 'broken': 'host:1'}
@@ -0,0 +1,171 @@
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+import cachelib.file
+import pytest
+from flask import Flask, request, session
+from flask_login import LoginManager, UserMixin, login_user
+from itsdangerous import TimestampSigner
+
+import services.session_store as session_store
+from models.models import db, SessionRecord
+from services.session_store import BACKENDS, init_session_store
+
+SERVER_SIDE = tuple(b for b in BACKENDS if b != 'cookie')
+LIFETIME = timedelta(minutes=10)
+
+
+class _User(UserMixin):
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+def build_app(backend, tmp_path, **config):
+    app = Flask(__name__)
+    app.config.update(
+        SECRET_KEY='test',
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'sessions.db'}",
+        SESSION_BACKEND=backend,
+        SESSION_FILE_DIR=str(tmp_path / 'flask_session'),
+        SCHEDULER_ENABLED=False,
+        PERMANENT_SESSION_LIFETIME=LIFETIME,
+        **config,
+    )
+    db.init_app(app)
+    with pytest.warns(DeprecationWarning) if backend == 'filesystem' else nullcontext():
+        init_session_store(app)
+    with app.app_context():
+        SessionRecord.__table__.create(db.engine, checkfirst=True)
+
+    login_manager = LoginManager(app)
+    login_manager.user_loader(_User)
+
+    @app.route('/set')
+    def set_value():
+        session['value'] = request.args['v']
+        return 'ok'
+
+    @app.route('/get')
+    def get_value():
+        return session.get('value', '')
+
+    @app.route('/login')
+    def login():
+        login_user(_User('admin'))
+        return 'ok'
+
+    return app
+
+
+def sid(client, app):
+    cookie = client.get_cookie(app.config.get('SESSION_COOKIE_NAME', 'session'))
+    return cookie.value if cookie else None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Moves every session store's idea of "now" forward by `clock(seconds)`."""
+    offset = [0]
+
+    class _datetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(seconds=offset[0])
+
+    monkeypatch.setattr(session_store, 'datetime', _datetime)
+    monkeypatch.setattr(cachelib.file, 'time', lambda: time.time() + offset[0])
+    monkeypatch.setattr(TimestampSigner, 'get_timestamp', lambda self: int(time.time() + offset[0]))
+
+    def advance(seconds):
+        offset[0] += seconds
+    return advance
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_round_trip(backend, tmp_path):
+    app = build_app(backend, tmp_path)
+    client = app.test_client()
+
+    client.get('/set?v=kept')
+
+    assert client.get('/get').text == 'kept'
+    # A new browser does not see it
+    assert app.test_client().get('/get').text == ''
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_expired_session_is_not_loaded(backend, tmp_path, clock):
+    app = build_app(backend, tmp_path)
+    client = app.test_client()
+    client.get('/set?v=kept')
+
+    clock(LIFETIME.total_seconds() + 1)
+
+    assert client.get('/get').text == ''
+
+
+@pytest.mark.parametrize('backend', SERVER_SIDE)
+def test_login_moves_session_to_new_sid(backend, tmp_path):
+    app = build_app(backend, tmp_path)
+    client = app.test_client()
+    client.get('/set?v=kept')
+    planted = sid(client, app)
+
+    client.get('/login')
+
+    assert sid(client, app) not in (None, planted)
+    assert client.get('/get').text == 'kept'
+    # The sid known before login no longer opens the session
+    attacker = app.test_client()
+    attacker.set_cookie(app.config.get('SESSION_COOKIE_NAME', 'session'), planted)
+    assert attacker.get('/get').text == ''
+
+
+def test_database_purge_removes_only_expired(tmp_path, clock):
+    app = build_app('database', tmp_path)
+    interface = app.session_interface
+    for n in range(3):
+        app.test_client().get(f'/set?v={n}')
+    clock(LIFETIME.total_seconds() + 1)
+    live = app.test_client()
+    live.get('/set?v=live')
+
+    with app.app_context():
+        interface.purge_batch_size = 2
+        assert interface.purge_expired() == 3
+        assert db.session.scalar(db.select(db.func.count()).select_from(SessionRecord)) == 1
+    assert live.get('/get').text == 'live'
+
+
+def test_memory_store_drops_expired_and_least_recent(tmp_path, clock):
+    app = build_app('memory', tmp_path, SESSION_MEMORY_MAX_ENTRIES=2)
+    interface = app.session_interface
+    first, second, third = (app.test_client() for _ in range(3))
+    first.get('/set?v=1')
+    second.get('/set?v=2')
+    third.get('/set?v=3')
+
+    assert len(interface._sessions) == 2
+    assert first.get('/get').text == ''
+
+    clock(LIFETIME.total_seconds() + 1)
+    assert second.get('/get').text == ''
+    assert sid(second, app) not in interface._sessions
+
+
+def test_filesystem_prunes_expired_files(tmp_path, clock):
+    app = build_app('filesystem', tmp_path)
+    cache = app.session_interface.cache
+    cache._threshold = 2
+    for n in range(2):
+        app.test_client().get(f'/set?v={n}')
+    clock(LIFETIME.total_seconds() + 1)
+
+    # Going over the threshold removes the expired files first
+    live = [app.test_client() for _ in range(2)]
+    for n, client in enumerate(live):
+        client.get(f'/set?v=new{n}')
+
+    assert cache._file_count <= 2
+    assert [client.get('/get').text for client in live] == ['new0', 'new1']
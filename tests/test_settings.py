@@ -0,0 +1,18 @@
+import pytest
+
+from models.models import db, GlobalSettings
+
+SETTINGS = {
+    'unitHeadName': 'Unit Head', 'enableStrictMode': False, 'earlyInMinutes': 5,
+    'allowEarlyOut': True, 'allowOvertime': False,
+}
+
+
+@pytest.mark.parametrize('hours', [-1, 24, 'eight', [8]])
+def test_auto_clock_out_hours_out_of_range(app, admin_client, hours):
+    response = admin_client.post('/api/update-settings', json={**SETTINGS, 'autoClockOutHours': hours})
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    with app.app_context():
+        assert db.session.get(GlobalSettings, 1).auto_clock_out_hours == 0